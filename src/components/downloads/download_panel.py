@@ -25,10 +25,7 @@ class DownloadPanel(QWidget):
     
     def filter_downloads(self, search_text: str):
         """Filter downloads based on search text."""
-        for row in range(self.download_table.rowCount()):
-            item = self.download_table.item(row, 0)  # Name column
-            should_show = not search_text or search_text.lower() in item.text().lower()
-            self.download_table.setRowHidden(row, not should_show)
+        self.download_table.filter_downloads(search_text)
     
     def add_download(self, download):
         """Add a new download to the table."""
@@ -1,16 +1,21 @@
 from PyQt6.QtWidgets import QLineEdit, QFrame, QHBoxLayout, QLabel
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.QtGui import QIcon, QColor
-from src.theme.styles import Styles
 from src.utils.icon_provider import IconProvider
 from src.theme.colors import Colors
 
 class SearchContainer(QFrame):
     searchTextChanged = pyqtSignal(str)  # Signal for search text changes
     
+    SEARCH_DELAY = 150  # ms of typing pause before searching
+    
     def __init__(self, is_dark=True, parent=None):
         super().__init__(parent)
         self._is_dark = is_dark
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.SEARCH_DELAY)
+        self._search_timer.timeout.connect(self._emit_search)
         self.setup_ui()
     
     def setup_ui(self):
@@ -26,7 +31,7 @@ class SearchContainer(QFrame):
         
         # Create search bar
         self.search_bar = SearchBar(self._is_dark, self)
-        self.search_bar.textChanged.connect(self.searchTextChanged.emit)
+        self.search_bar.textChanged.connect(lambda _: self._search_timer.start())
         layout.addWidget(self.search_bar)
         
         # Set fixed height
@@ -35,9 +40,10 @@ class SearchContainer(QFrame):
         
         self.apply_theme()
     
+    def _emit_search(self):
+        self.searchTextChanged.emit(self.search_bar.text())
+    
     def apply_theme(self):
-        styles = Styles.get_styles(self._is_dark)
-        self.setStyleSheet(styles["SEARCH"])
         self.update_icon()
         
     def update_theme(self, is_dark):
@@ -55,6 +61,6 @@ class SearchBar(QLineEdit):
         self.setup_ui()
     
     def setup_ui(self):
-        self.setPlaceholderText("Search downloads...")
+        self.setPlaceholderText("Search downloads... (host:, status:, category:)")
         self.setClearButtonEnabled(True)
         self.setAttribute(Qt.WidgetAttribute.WA_TranslucentBackground)
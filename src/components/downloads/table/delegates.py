@@ -0,0 +1,112 @@
+from PyQt6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem
+from PyQt6.QtCore import Qt, QRect, QRectF, QEvent, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QPainter, QColor, QIcon
+from typing import List, Tuple
+from src.theme.colors import Colors
+from src.utils.icon_provider import IconProvider
+from ....models.download import Download, DownloadStatus
+from .download_table_model import DownloadTableModel
+
+def paint_background(painter: QPainter, option: QStyleOptionViewItem):
+    """Draw the cell's selection and hover background."""
+    style = option.widget.style() if option.widget else None
+    if style:
+        style.drawPrimitive(QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, option.widget)
+
+class ProgressBarDelegate(QStyledItemDelegate):
+    """Paint a thin rounded progress bar instead of embedding a QProgressBar per row."""
+    
+    BAR_HEIGHT = 6
+    MARGIN = 8
+    
+    def __init__(self, is_dark=True, parent=None):
+        super().__init__(parent)
+        self.is_dark = is_dark
+    
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        paint_background(painter, option)
+        
+        colors = Colors.Dark if self.is_dark else Colors.Light
+        progress = max(0.0, min(float(index.data(DownloadTableModel.ProgressRole) or 0), 100.0))
+        rect = option.rect.adjusted(self.MARGIN, 0, -self.MARGIN, 0)
+        bar = QRectF(rect.x(), rect.center().y() - self.BAR_HEIGHT / 2,
+                     rect.width(), self.BAR_HEIGHT)
+        radius = self.BAR_HEIGHT / 2
+        
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(colors.SURFACE_LIGHT))
+        painter.drawRoundedRect(bar, radius, radius)
+        if progress > 0:
+            painter.setBrush(QColor(colors.PRIMARY))
+            painter.drawRoundedRect(QRectF(bar.x(), bar.y(), bar.width() * progress / 100,
+                                           bar.height()), radius, radius)
+        painter.restore()
+    
+    def update_theme(self, is_dark: bool):
+        self.is_dark = is_dark
+
+class ActionsDelegate(QStyledItemDelegate):
+    """Paint start/pause and stop buttons and turn clicks on them into actions."""
+    
+    # (action, download_id)
+    action_triggered = pyqtSignal(str, str)
+    
+    BUTTON_SIZE = 24
+    ICON_SIZE = 16
+    SPACING = 4
+    
+    def __init__(self, is_dark=True, parent=None):
+        super().__init__(parent)
+        self.is_dark = is_dark
+    
+    def buttons(self, download: Download) -> List[Tuple[str, str, bool]]:
+        """Get (action, icon name, enabled) for each button, mirroring the old widgets."""
+        finished = download.status == DownloadStatus.COMPLETED
+        primary = "pause" if download.status == DownloadStatus.DOWNLOADING else "resume"
+        return [
+            (primary, primary, not finished),
+            ("stop", "stop", not finished)
+        ]
+    
+    def button_rects(self, rect: QRect, count: int) -> List[QRect]:
+        """Lay the buttons out centred in the cell."""
+        width = count * self.BUTTON_SIZE + (count - 1) * self.SPACING
+        x = rect.x() + (rect.width() - width) // 2
+        y = rect.y() + (rect.height() - self.BUTTON_SIZE) // 2
+        return [
+            QRect(x + i * (self.BUTTON_SIZE + self.SPACING), y, self.BUTTON_SIZE, self.BUTTON_SIZE)
+            for i in range(count)
+        ]
+    
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        paint_background(painter, option)
+        download = index.data(DownloadTableModel.DownloadRole)
+        if download is None:
+            return
+        
+        buttons = self.buttons(download)
+        for (action, icon_name, enabled), rect in zip(buttons, self.button_rects(option.rect, len(buttons))):
+            icon_rect = QRect(0, 0, self.ICON_SIZE, self.ICON_SIZE)
+            icon_rect.moveCenter(rect.center())
+            mode = QIcon.Mode.Normal if enabled else QIcon.Mode.Disabled
+            IconProvider.get_icon(icon_name, self.is_dark).paint(painter, icon_rect, Qt.AlignmentFlag.AlignCenter, mode)
+    
+    def editorEvent(self, event: QEvent, model, option: QStyleOptionViewItem, index: QModelIndex) -> bool:
+        if event.type() != QEvent.Type.MouseButtonRelease or event.button() != Qt.MouseButton.LeftButton:
+            return super().editorEvent(event, model, option, index)
+        download = index.data(DownloadTableModel.DownloadRole)
+        if download is None:
+            return False
+        
+        buttons = self.buttons(download)
+        position = event.position().toPoint()
+        for (action, _, enabled), rect in zip(buttons, self.button_rects(option.rect, len(buttons))):
+            if enabled and rect.contains(position):
+                self.action_triggered.emit(action, download.id)
+                return True
+        return False
+    
+    def update_theme(self, is_dark: bool):
+        self.is_dark = is_dark
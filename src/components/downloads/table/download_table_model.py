@@ -0,0 +1,237 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from itertools import compress
+from typing import Any, Dict, List, Optional, Set
+import os
+from ....models.download import Download
+
+def format_size(size: Optional[float]) -> str:
+    """Format size in bytes to human readable string."""
+    if size is None:
+        return "Unknown"
+    
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+def format_speed(speed: float) -> str:
+    """Format speed in bytes/second to human readable string."""
+    if not speed:
+        return ""
+    return f"{format_size(speed)}/s"
+
+def format_time(seconds: float) -> str:
+    """Format time in seconds to human readable string."""
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    elif seconds < 3600:
+        return f"{int(seconds/60)}m {int(seconds%60)}s"
+    else:
+        hours = int(seconds/3600)
+        minutes = int((seconds%3600)/60)
+        return f"{hours}h {minutes}m"
+
+class DownloadTableModel(QAbstractTableModel):
+    """Table model over a flat list of downloads.
+    
+    Cells are computed on demand from the Download objects, so views only
+    pay for the rows they actually paint. Rows are found through an id->row
+    index, and updates are collected and announced at most once per frame as
+    dataChanged ranges. A filter, given as a set of download IDs, limits the
+    rows to those downloads without dropping the others from the model.
+    """
+    
+    COLUMNS = ["Name", "Status", "Progress", "Speed", "Size", "Remaining", "Actions"]
+    NAME, STATUS, PROGRESS, SPEED, SIZE, REMAINING, ACTIONS = range(7)
+    
+    DownloadRole = Qt.ItemDataRole.UserRole + 1
+    ProgressRole = Qt.ItemDataRole.UserRole + 2
+    
+    UPDATE_INTERVAL = 33  # ms, about 30 repaints per second
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._all: Dict[str, Download] = {}  # Every download, in display order
+        self._downloads: List[Download] = []  # Rows that pass the filter
+        self._filter: Optional[Set[str]] = None
+        self._rows: Dict[str, int] = {}
+        self._dirty_rows: Set[int] = set()
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(self.UPDATE_INTERVAL)
+        self._update_timer.timeout.connect(self.flush_updates)
+    
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._downloads)
+    
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+    
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+    
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid():
+            return None
+        download = self._downloads[index.row()]
+        column = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display(download, column)
+        if role == Qt.ItemDataRole.UserRole:
+            return download.id
+        if role == self.ProgressRole:
+            return download.progress
+        if role == self.DownloadRole:
+            return download
+        if role == Qt.ItemDataRole.ToolTipRole and column == self.NAME:
+            return download.url
+        return None
+    
+    def _display(self, download: Download, column: int) -> Optional[str]:
+        if column == self.NAME:
+            return os.path.basename(download.save_path)
+        if column == self.STATUS:
+            return download.status.value.title()
+        if column == self.SPEED:
+            return format_speed(download.speed)
+        if column == self.SIZE:
+            return format_size(download.total_size)
+        if column == self.REMAINING:
+            if download.speed > 0 and download.total_size:
+                return format_time((download.total_size - download.downloaded_size) / download.speed)
+            return ""
+        return None
+    
+    def download_at(self, row: int) -> Download:
+        """Get the download shown in a row."""
+        return self._downloads[row]
+    
+    def all_downloads(self) -> List[Download]:
+        """Get every download, including those the filter hides."""
+        return list(self._all.values())
+    
+    def find_row(self, download_id: str) -> Optional[int]:
+        """Find the row index for a download ID."""
+        return self._rows.get(download_id)
+    
+    def add_downloads(self, downloads: List[Download]):
+        """Append downloads in a single insert notification."""
+        for download in downloads:
+            self._all[download.id] = download
+        if self._filter is not None:
+            downloads = [download for download in downloads if download.id in self._filter]
+        if not downloads:
+            return
+        first = len(self._downloads)
+        self.beginInsertRows(QModelIndex(), first, first + len(downloads) - 1)
+        self._downloads.extend(downloads)
+        for row, download in enumerate(downloads, first):
+            self._rows[download.id] = row
+        self.endInsertRows()
+    
+    def update_download(self, download: Download):
+        """Replace a download's data; its row is repainted on the next frame."""
+        if download.id in self._all:
+            self._all[download.id] = download
+        row = self._rows.get(download.id)
+        if row is None:
+            return
+        self._downloads[row] = download
+        self._dirty_rows.add(row)
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+    
+    def flush_updates(self):
+        """Announce pending row updates as contiguous dataChanged ranges."""
+        self._update_timer.stop()
+        rows = sorted(self._dirty_rows)
+        self._dirty_rows.clear()
+        last_column = len(self.COLUMNS) - 1
+        start = 0
+        for i in range(1, len(rows) + 1):
+            if i == len(rows) or rows[i] != rows[i - 1] + 1:
+                self.dataChanged.emit(self.index(rows[start], 0), self.index(rows[i - 1], last_column))
+                start = i
+    
+    def remove_download(self, download_id: str):
+        """Remove a download's row."""
+        self._all.pop(download_id, None)
+        row = self._rows.get(download_id)
+        if row is None:
+            return
+        self.flush_updates()
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._downloads[row]
+        del self._rows[download_id]
+        self._reindex(row)
+        self.endRemoveRows()
+    
+    def sort(self, column: int, order: Qt.SortOrder = Qt.SortOrder.AscendingOrder):
+        """Sort rows by a column, keeping the index and persistent indexes in sync."""
+        key = self._sort_key(column)
+        if key is None:
+            return
+        reverse = order == Qt.SortOrder.DescendingOrder
+        self.flush_updates()
+        self.layoutAboutToBeChanged.emit()
+        previous = list(self._downloads)
+        self._downloads.sort(key=key, reverse=reverse)
+        self._all = {download.id: download
+                     for download in sorted(self._all.values(), key=key, reverse=reverse)}
+        self._reindex()
+        self._remap_persistent(previous)
+        self.layoutChanged.emit()
+    
+    def set_filter(self, download_ids: Optional[Set[str]]):
+        """Show only the given downloads, or all of them for None."""
+        if download_ids is None and self._filter is None:
+            return
+        self.flush_updates()
+        self.layoutAboutToBeChanged.emit()
+        previous = self._downloads
+        self._filter = download_ids
+        if download_ids is None:
+            self._downloads = list(self._all.values())
+        else:
+            self._downloads = list(compress(self._all.values(), map(download_ids.__contains__, self._all)))
+        self._reindex()
+        self._remap_persistent(previous)
+        self.layoutChanged.emit()
+    
+    def _remap_persistent(self, previous: List[Download]):
+        """Keep selection and current index on the same downloads after rows moved."""
+        persistent = self.persistentIndexList()
+        moved = []
+        for index in persistent:
+            row = self._rows.get(previous[index.row()].id)
+            moved.append(self.index(row, index.column()) if row is not None else QModelIndex())
+        self.changePersistentIndexList(persistent, moved)
+    
+    def _sort_key(self, column: int):
+        if column == self.NAME:
+            return lambda d: os.path.basename(d.save_path).lower()
+        if column == self.STATUS:
+            return lambda d: d.status.value
+        if column == self.PROGRESS:
+            return lambda d: d.progress
+        if column == self.SPEED:
+            return lambda d: d.speed
+        if column == self.SIZE:
+            return lambda d: d.total_size or 0
+        if column == self.REMAINING:
+            return lambda d: ((d.total_size - d.downloaded_size) / d.speed
+                              if d.speed > 0 and d.total_size else float("inf"))
+        return None
+    
+    def _reindex(self, first: int = 0):
+        """Rebuild the id->row index from `first` on."""
+        if first == 0:
+            self._rows = {download.id: row for row, download in enumerate(self._downloads)}
+            return
+        for row in range(first, len(self._downloads)):
+            self._rows[self._downloads[row].id] = row
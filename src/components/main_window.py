@@ -1,30 +1,29 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout
 from qframelesswindow import FramelessMainWindow, StandardTitleBar
 from src.components.window.title_bar import TitleBar
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from src.components.toolbar.action_toolbar import ActionToolbar
 from src.components.downloads.download_table import DownloadTableWidget
 from src.components.downloads.search_bar import SearchContainer
 from src.components.navigation.navigation_panel import NavigationPanel
 from src.theme.styles import Styles
-from src.core.download_manager import DownloadManager
-from src.settings.manager import SettingsManager
-import os
+from src.utils.async_helper import AsyncHelper
+from src.utils.icon_provider import IconProvider
 from src.utils.logger import Logger
+from functools import cached_property
 
 class MainWindow(FramelessMainWindow):
+    first_paint = pyqtSignal()
+    
     def __init__(self):
         super().__init__()
         self._is_dark = True
+        self._painted = False
         self.setWindowTitle("Pasargadae")
         self.setMinimumSize(1000, 600)
         
-        # Initialize managers
-        self.settings_manager = SettingsManager(
-            os.path.join(os.path.expanduser("~"), ".pasargadae", "settings.json")
-        )
-        self.download_manager = DownloadManager(self.settings_manager.get_all_settings())
-        Logger.debug("Managers initialized in MainWindow")
+        # Managers are created on first use, after the window has painted
+        self.async_helper = AsyncHelper(self)
         
         # Create main container
         self.container = QWidget()
@@ -84,29 +83,64 @@ class MainWindow(FramelessMainWindow):
         # Apply theme
         self.apply_theme(self._is_dark)
     
+    @cached_property
+    def settings_manager(self):
+        from src.settings.manager import SettingsManager, DEFAULT_SETTINGS_FILE
+        return SettingsManager(DEFAULT_SETTINGS_FILE)
+    
+    @cached_property
+    def download_manager(self):
+        # aiohttp, pydantic and the engine make up most of the import time
+        from src.core.download_manager import DownloadManager
+        download_manager = DownloadManager(self.settings_manager.get_all_settings())
+        self.async_helper.run_async(download_manager.start())
+        Logger.debug("Managers initialized in MainWindow")
+        return download_manager
+    
+    def start_services(self):
+        """Create the managers if nothing has needed them yet."""
+        self.download_manager
+    
+    async def shutdown(self):
+        """Stop the download engine, if it was ever started."""
+        if "download_manager" in self.__dict__:
+            await self.download_manager.shutdown()
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            # Emitted once this frame is out, not from inside the paint
+            QTimer.singleShot(0, self.first_paint.emit)
+    
     def filter_downloads(self, search_text: str):
         """Filter downloads based on search text."""
-        for row in range(self.download_table.rowCount()):
-            item = self.download_table.item(row, 0)  # Name column
-            should_show = not search_text or search_text.lower() in item.text().lower()
-            self.download_table.setRowHidden(row, not should_show)
+        self.download_table.filter_downloads(search_text)
     
     def on_theme_changed(self, is_dark):
         self._is_dark = is_dark
+        IconProvider.set_theme(is_dark)
         self.apply_theme(is_dark)
     
     def apply_theme(self, is_dark):
-        styles = Styles.get_styles(is_dark)
-        self.setStyleSheet(styles["WINDOW"])
+        Styles.apply(is_dark)
         self.toolbar.update_theme(is_dark)
         self.navigation_panel.update_theme(is_dark)
         self.search_bar.update_theme(is_dark)
         self.download_table.update_theme(is_dark)
     
+    def update_settings(self, settings: dict):
+        """Apply settings saved from the settings modal."""
+        self.download_manager.update_settings(settings)
+    
     def add_download(self, download):
         """Add a new download."""
         self.download_table.add_download(download)
     
+    def add_downloads(self, downloads):
+        """Add a batch of downloads."""
+        self.download_table.add_downloads(downloads)
+    
     def update_download(self, download):
         """Update an existing download."""
         self.download_table.update_download(download)
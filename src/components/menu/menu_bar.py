@@ -1,13 +1,11 @@
 from PyQt6.QtWidgets import QMenuBar, QMenu
 from PyQt6.QtCore import Qt
-from src.theme.styles import Styles
 
 class MenuBar(QMenuBar):
     def __init__(self, parent=None):
         super().__init__(parent)
         self._is_dark = True
         self.setup_menus()
-        self.apply_theme()  # Apply theme on initialization
     
     def setup_menus(self):
         # File menu
@@ -46,18 +44,7 @@ class MenuBar(QMenuBar):
         help_menu.addAction("About")
         self.addMenu(help_menu)
     
-    def apply_theme(self):
-        """Apply theme styles"""
-        styles = Styles.get_styles(self._is_dark)
-        self.setStyleSheet(styles["MENU"])
-        
-        # Apply styles to submenus
-        for action in self.actions():
-            menu = action.menu()
-            if menu:
-                menu.setStyleSheet(styles["MENU"])
-    
     def update_theme(self, is_dark):
         """Update theme for menu and all submenus"""
+        # Menus are styled by the application stylesheet
         self._is_dark = is_dark
-        self.apply_theme()
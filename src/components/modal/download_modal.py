@@ -8,16 +8,13 @@ from PyQt6.QtGui import QIcon
 from .modal_window import ModalWindow
 from src.utils.icon_provider import IconProvider
 from src.core.download_manager import DownloadManager
+from src.models.download import file_category
 from src.settings.manager import SettingsManager
 from src.utils.async_helper import AsyncHelper
 from src.utils.logger import Logger
 from src.settings.schema import FileCategoryManagement
 from src.models.download import Download, DownloadStatus
-from pySmartDL import SmartDL
 import os
-import mimetypes
-from urllib.parse import urlparse
-import asyncio
 
 class DownloadInfoWidget(QWidget):
     def __init__(self, is_dark=True, parent=None):
@@ -162,20 +159,7 @@ class DownloadModal(ModalWindow):
     def _get_file_category(self, mime_type: str) -> str:
         """Determine file category based on MIME type."""
         Logger.debug(f"Getting category for MIME type: {mime_type}")
-        if mime_type.startswith('video/'):
-            return "video"
-        elif mime_type.startswith('audio/'):
-            return "audio"
-        elif mime_type.startswith('image/'):
-            return "image"
-        elif mime_type.startswith('text/'):
-            return "documents"
-        elif mime_type in ['application/zip', 'application/x-rar-compressed', 'application/x-7z-compressed']:
-            return "documents"
-        elif mime_type in ['application/pdf', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-            return "documents"
-        else:
-            return "other"
+        return file_category(mime_type)
     
     def _get_category_display_name(self, category: str) -> str:
         """Get display name for category."""
@@ -273,40 +257,12 @@ class DownloadModal(ModalWindow):
         
         Logger.info(f"Previewing download for URL: {url}")
         try:
-            # Initialize SmartDL to get file info
-            temp_file = os.path.join(self.download_manager.temp_directory, "preview_temp")
-            Logger.debug(f"Using temp file: {temp_file}")
-            
-            # Create SmartDL object
-            obj = SmartDL(url, temp_file, progress_bar=False)
-            Logger.debug("SmartDL object created")
-            
-            # Start download in non-blocking mode to get info
-            obj.start(blocking=False)
-            Logger.debug("SmartDL started in non-blocking mode")
-            
-            # Wait briefly for file info
-            await asyncio.sleep(1)
-            
-            # Get file info
-            file_name = os.path.basename(urlparse(url).path) or "unnamed_file"
-            file_size = obj.get_dl_size()
-            Logger.debug(f"File info: name={file_name}, size={file_size}")
-            
-            # Stop the download since we only needed info
-            obj.stop()
-            Logger.debug("SmartDL stopped")
-            
-            # Clean up temp file if it was created
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                Logger.debug("Temp file removed")
-            
-            # Determine MIME type
-            mime_type, _ = mimetypes.guess_type(file_name)
-            if not mime_type:
-                mime_type = 'application/octet-stream'
-            Logger.debug(f"MIME type: {mime_type}")
+            # One HEAD (or Range 0-0) request gives the file info
+            probe = await self.download_manager.probe_url(url)
+            file_name = probe.file_name
+            file_size = probe.total_size
+            mime_type = probe.mime_type
+            Logger.debug(f"File info: name={file_name}, size={file_size}, type={mime_type}")
             
             # Get category
             category = self._get_file_category(mime_type)
@@ -323,7 +279,7 @@ class DownloadModal(ModalWindow):
             result = {
                 'action': 'preview',
                 'file_name': file_name,
-                'size': self._format_size(file_size),
+                'size': self._format_size(file_size) if file_size is not None else "Unknown",
                 'category': self._get_category_display_name(category)
             }
             Logger.debug(f"Preview completed: {result}")
@@ -419,20 +375,7 @@ class DownloadModal(ModalWindow):
     def _get_file_category(self, mime_type: str) -> str:
         """Determine file category based on MIME type."""
         Logger.debug(f"Getting category for MIME type: {mime_type}")
-        if mime_type.startswith('video/'):
-            return "video"
-        elif mime_type.startswith('audio/'):
-            return "audio"
-        elif mime_type.startswith('image/'):
-            return "image"
-        elif mime_type.startswith('text/'):
-            return "documents"
-        elif mime_type in ['application/zip', 'application/x-rar-compressed', 'application/x-7z-compressed']:
-            return "documents"
-        elif mime_type in ['application/pdf', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-            return "documents"
-        else:
-            return "other"
+        return file_category(mime_type)
     
     def _get_category_display_name(self, category: str) -> str:
         """Get display name for category."""
@@ -530,40 +473,12 @@ class DownloadModal(ModalWindow):
         
         Logger.info(f"Previewing download for URL: {url}")
         try:
-            # Initialize SmartDL to get file info
-            temp_file = os.path.join(self.download_manager.temp_directory, "preview_temp")
-            Logger.debug(f"Using temp file: {temp_file}")
-            
-            # Create SmartDL object
-            obj = SmartDL(url, temp_file, progress_bar=False)
-            Logger.debug("SmartDL object created")
-            
-            # Start download in non-blocking mode to get info
-            obj.start(blocking=False)
-            Logger.debug("SmartDL started in non-blocking mode")
-            
-            # Wait briefly for file info
-            await asyncio.sleep(1)
-            
-            # Get file info
-            file_name = os.path.basename(urlparse(url).path) or "unnamed_file"
-            file_size = obj.get_dl_size()
-            Logger.debug(f"File info: name={file_name}, size={file_size}")
-            
-            # Stop the download since we only needed info
-            obj.stop()
-            Logger.debug("SmartDL stopped")
-            
-            # Clean up temp file if it was created
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
-                Logger.debug("Temp file removed")
-            
-            # Determine MIME type
-            mime_type, _ = mimetypes.guess_type(file_name)
-            if not mime_type:
-                mime_type = 'application/octet-stream'
-            Logger.debug(f"MIME type: {mime_type}")
+            # One HEAD (or Range 0-0) request gives the file info
+            probe = await self.download_manager.probe_url(url)
+            file_name = probe.file_name
+            file_size = probe.total_size
+            mime_type = probe.mime_type
+            Logger.debug(f"File info: name={file_name}, size={file_size}, type={mime_type}")
             
             # Get category
             category = self._get_file_category(mime_type)
@@ -580,7 +495,7 @@ class DownloadModal(ModalWindow):
             result = {
                 'action': 'preview',
                 'file_name': file_name,
-                'size': self._format_size(file_size),
+                'size': self._format_size(file_size) if file_size is not None else "Unknown",
                 'category': self._get_category_display_name(category)
             }
             Logger.debug(f"Preview completed: {result}")
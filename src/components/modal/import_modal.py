@@ -0,0 +1,128 @@
+from PyQt6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+    QPlainTextEdit, QPushButton, QApplication, QComboBox,
+    QFileDialog
+)
+from .modal_window import ModalWindow
+from src.core.url_import import extract_urls, read_url_file, dedupe_urls
+from src.utils.async_helper import AsyncHelper
+from src.utils.logger import Logger
+
+class ImportModal(ModalWindow):
+    def __init__(self, parent=None, download_manager=None):
+        Logger.debug("Initializing ImportModal")
+        super().__init__(
+            parent=parent,
+            title="Import URLs",
+            width=600,
+            height=450
+        )
+        self.download_manager = download_manager
+        
+        # Create async helper
+        self.async_helper = AsyncHelper(self)
+        self.async_helper.finished.connect(self._on_import_finished)
+        self.async_helper.error.connect(self._on_import_error)
+        
+        # Create content widget
+        content = QWidget()
+        layout = QVBoxLayout(content)
+        layout.setSpacing(10)
+        
+        # URL list
+        self.url_input = QPlainTextEdit()
+        self.url_input.setPlaceholderText("Paste links here, one per line, or load them from a file")
+        layout.addWidget(self.url_input)
+        
+        # Sources and queue
+        source_layout = QHBoxLayout()
+        self.file_btn = QPushButton("From File...")
+        self.paste_btn = QPushButton("Paste")
+        self.queue_combo = QComboBox()
+        self.queue_combo.addItem("Regular", "regular")
+        self.queue_combo.addItem("High Priority", "high_priority")
+        source_layout.addWidget(self.file_btn)
+        source_layout.addWidget(self.paste_btn)
+        source_layout.addStretch()
+        source_layout.addWidget(QLabel("Queue:"))
+        source_layout.addWidget(self.queue_combo)
+        layout.addLayout(source_layout)
+        
+        # Status
+        self.status_label = QLabel()
+        self.status_label.setStyleSheet("color: #9BA1A6;")  # Secondary text color
+        layout.addWidget(self.status_label)
+        
+        # Set the content
+        self.set_content(content)
+        
+        # Add action buttons
+        self.add_action_button("Cancel", self.close)
+        self.import_btn = self.add_action_button("Import", self._import_clicked, primary=True)
+        self.import_btn.setEnabled(False)
+        
+        # Connect signals
+        self.url_input.textChanged.connect(self._on_text_changed)
+        self.file_btn.clicked.connect(self._load_file)
+        self.paste_btn.clicked.connect(self._paste_clipboard)
+        
+        Logger.debug("ImportModal initialized")
+    
+    def _urls(self):
+        return dedupe_urls(extract_urls(self.url_input.toPlainText()))
+    
+    def _on_text_changed(self):
+        count = len(self._urls())
+        self.status_label.setText(f"{count} unique URLs found")
+        self.import_btn.setEnabled(count > 0)
+    
+    def _load_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import URL List", "", "Text Files (*.txt);;All Files (*)"
+        )
+        if not path:
+            return
+        Logger.info(f"Loading URL list from {path}")
+        try:
+            urls = read_url_file(path)
+        except OSError as e:
+            Logger.error(f"Could not read URL list: {e}")
+            self.status_label.setText(f"Error: {str(e)}")
+            return
+        self._append_urls(urls)
+    
+    def _paste_clipboard(self):
+        self._append_urls(extract_urls(QApplication.clipboard().text()))
+    
+    def _append_urls(self, urls):
+        # Set the text once so the URL count is computed a single time
+        existing = self.url_input.toPlainText().rstrip()
+        text = "\n".join(urls)
+        self.url_input.setPlainText(f"{existing}\n{text}" if existing else text)
+    
+    def _import_clicked(self):
+        urls = self._urls()
+        Logger.info(f"Importing {len(urls)} URLs")
+        self.import_btn.setEnabled(False)
+        self.url_input.setReadOnly(True)
+        self.async_helper.run_async(self.download_manager.add_downloads(
+            urls,
+            queue=self.queue_combo.currentData(),
+            progress_callback=self._on_probe_progress
+        ))
+    
+    def _on_probe_progress(self, done: int, total: int):
+        self.status_label.setText(f"Checking links... {done}/{total}")
+    
+    def _on_import_finished(self, downloads):
+        Logger.info(f"Imported {len(downloads)} downloads")
+        main_window = self.parent()
+        if main_window and hasattr(main_window, "add_downloads"):
+            main_window.add_downloads(downloads)
+        self.close()
+    
+    def _on_import_error(self, error):
+        Logger.error(f"Import failed: {error}")
+        self.status_label.setText(f"Error: {str(error)}")
+        self.import_btn.setEnabled(True)
+        self.url_input.setReadOnly(False)
@@ -2,7 +2,6 @@ from PyQt6.QtWidgets import QVBoxLayout, QHBoxLayout, QWidget, QLabel
 from PyQt6.QtCore import Qt, QEventLoop, pyqtSignal, QPoint
 from qframelesswindow import FramelessWindow, StandardTitleBar
 from src.theme.colors import Colors
-from src.theme.styles import Styles
 from src.utils.icon_provider import IconProvider
 from src.components.window.window_controls import WindowControls
 
@@ -102,8 +101,6 @@ class ModalTitleBar(StandardTitleBar):
     
     def apply_theme(self, is_dark):
         self._is_dark = is_dark
-        styles = Styles.get_styles(is_dark)
-        self.setStyleSheet(styles["WINDOW"])
         self.update_logo()
         self.customize_buttons(is_dark)
 
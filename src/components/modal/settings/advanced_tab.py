@@ -93,6 +93,40 @@ class AdvancedSettingsTab(SettingsTab):
             "Download files in multiple chunks for better performance"
         )
         
+        # Adaptive Concurrency Section
+        adaptive_section = self.add_section("Adaptive Concurrency")
+        
+        self.adaptive_toggle = QCheckBox("Tune downloads and chunks to measured speed")
+        self.adaptive_toggle.setChecked(
+            self.get_nested_setting("adaptive_concurrency", default=False)
+        )
+        adaptive_section.addWidget(self.adaptive_toggle)
+        
+        self.adaptive_max_downloads = QSpinBox()
+        self.adaptive_max_downloads.setRange(1, 32)
+        self.adaptive_max_downloads.setValue(
+            self.get_nested_setting("adaptive_max_downloads", default=16)
+        )
+        self.add_field(
+            adaptive_section,
+            "Max Active Downloads:",
+            self.adaptive_max_downloads,
+            "Upper bound for active downloads while tuning"
+        )
+        
+        self.adaptive_max_segments = QSpinBox()
+        self.adaptive_max_segments.setRange(1, 32)
+        self.adaptive_max_segments.setSuffix(" chunks")
+        self.adaptive_max_segments.setValue(
+            self.get_nested_setting("adaptive_max_segments", default=16)
+        )
+        self.add_field(
+            adaptive_section,
+            "Max Chunks per Download:",
+            self.adaptive_max_segments,
+            "Upper bound for chunks per download while tuning"
+        )
+        
         # Retry Settings Section
         retry_section = self.add_section("Retry Settings")
         
@@ -188,6 +222,9 @@ class AdvancedSettingsTab(SettingsTab):
         self.set_nested_setting(self.resume_toggle.isChecked(), "resume_capability")
         self.set_nested_setting(chunk_enabled, "chunk_downloading")
         self.set_nested_setting(chunk_count, "chunk_count")
+        self.set_nested_setting(self.adaptive_toggle.isChecked(), "adaptive_concurrency")
+        self.set_nested_setting(self.adaptive_max_downloads.value(), "adaptive_max_downloads")
+        self.set_nested_setting(self.adaptive_max_segments.value(), "adaptive_max_segments")
         self.set_nested_setting(self.retry_limit.value(), "retry_limit")
         self.set_nested_setting(self.conn_timeout.value(), "timeout_seconds")
         self.set_nested_setting(self.attempt_timeout.value(), "attempt_timeout")
@@ -98,6 +98,46 @@ class ConnectionSettingsTab(SettingsTab):
             "Maximum number of downloads running at once"
         )
         
+        # Per-host politeness limits; 0 turns a limit off
+        self.max_downloads_per_host = QSpinBox()
+        self.max_downloads_per_host.setRange(0, 10)
+        self.max_downloads_per_host.setSpecialValueText("Unlimited")
+        self.max_downloads_per_host.setValue(
+            self.get_nested_setting("max_downloads_per_host", default=2)
+        )
+        self.add_field(
+            connection_section,
+            "Max Downloads per Server:",
+            self.max_downloads_per_host,
+            "Maximum number of downloads running at once from one server"
+        )
+        
+        self.max_downloads_per_domain = QSpinBox()
+        self.max_downloads_per_domain.setRange(0, 10)
+        self.max_downloads_per_domain.setSpecialValueText("Unlimited")
+        self.max_downloads_per_domain.setValue(
+            self.get_nested_setting("max_downloads_per_domain", default=4)
+        )
+        self.add_field(
+            connection_section,
+            "Max Downloads per Site:",
+            self.max_downloads_per_domain,
+            "Maximum number of downloads running at once from all servers of one site"
+        )
+        
+        self.max_connections_per_domain = QSpinBox()
+        self.max_connections_per_domain.setRange(0, 64)
+        self.max_connections_per_domain.setSpecialValueText("Unlimited")
+        self.max_connections_per_domain.setValue(
+            self.get_nested_setting("max_connections_per_domain", default=16)
+        )
+        self.add_field(
+            connection_section,
+            "Max Connections per Site:",
+            self.max_connections_per_domain,
+            "Maximum number of connections open to all servers of one site"
+        )
+        
         # Proxy Settings Section
         proxy_section = self.add_section("Proxy Settings")
         
@@ -179,6 +219,18 @@ class ConnectionSettingsTab(SettingsTab):
             self.max_downloads.value(),
             "max_active_downloads"
         )
+        self.set_nested_setting(
+            self.max_downloads_per_host.value(),
+            "max_downloads_per_host"
+        )
+        self.set_nested_setting(
+            self.max_downloads_per_domain.value(),
+            "max_downloads_per_domain"
+        )
+        self.set_nested_setting(
+            self.max_connections_per_domain.value(),
+            "max_connections_per_domain"
+        )
         
         # Save proxy settings
         proxy_settings = {
@@ -50,8 +50,19 @@ class QueueCard(QWidget):
         self.limit_spin.setRange(1, 10)
         self.limit_spin.setValue(queue_settings["limit_active_downloads"])
         
+        speed_label = QLabel("Speed Share:")
+        self.speed_spin = QSpinBox()
+        self.speed_spin.setRange(0, 100000)
+        self.speed_spin.setSuffix(" KB/s")
+        self.speed_spin.setSpecialValueText("Unlimited")
+        self.speed_spin.setToolTip("Share of the global speed limit; idle queues lend theirs")
+        speed_limit = queue_settings.get("speed_limit") or "0 KB/s"
+        self.speed_spin.setValue(int(speed_limit.split()[0]))
+        
         limit_layout.addWidget(limit_label)
         limit_layout.addWidget(self.limit_spin)
+        limit_layout.addWidget(speed_label)
+        limit_layout.addWidget(self.speed_spin)
         limit_layout.addStretch()
         
         layout.addWidget(limit_widget)
@@ -70,7 +81,9 @@ class QueueCard(QWidget):
             "Hibernate",
             "Disconnect Internet"
         ])
-        self.action_combo.setCurrentText(queue_settings["post_download_action"].title())
+        # Actions saved without the user choosing them, e.g. by older defaults, show as None
+        if queue_settings.get("post_download_action_confirmed"):
+            self.action_combo.setCurrentText(queue_settings["post_download_action"].title())
         
         action_layout.addWidget(action_label)
         action_layout.addWidget(self.action_combo)
@@ -101,7 +114,9 @@ class QueueCard(QWidget):
             "start_time": self.start_time.time().toString("HH:mm"),
             "stop_time": self.stop_time.time().toString("HH:mm"),
             "limit_active_downloads": self.limit_spin.value(),
-            "post_download_action": self.action_combo.currentText().lower()
+            "post_download_action": self.action_combo.currentText().lower(),
+            "post_download_action_confirmed": self.action_combo.currentText() != "None",
+            "speed_limit": f"{self.speed_spin.value()} KB/s" if self.speed_spin.value() else ""
         }
 
 class SchedulerSettingsTab(SettingsTab):
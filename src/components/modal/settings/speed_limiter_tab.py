@@ -148,10 +148,12 @@ class SpeedLimiterTab(SettingsTab):
         self.set_nested_setting(self.enable_limiter.isChecked(), "enabled")
         self.set_nested_setting(f"{self.speed_limit.value()} KB/s", "max_speed")
         
-        time_specific = {
+        # Keep the window's days and speed, which this tab does not edit
+        time_specific = dict(self.get_nested_setting("time_specific_limiter", default={}))
+        time_specific.update({
             "start_time": self.start_time.time().toString("HH:mm"),
             "end_time": self.end_time.time().toString("HH:mm")
-        }
+        })
         self.set_nested_setting(time_specific, "time_specific_limiter")
         
         self.set_nested_setting(self.schedule_grid.get_schedule(), "schedule")
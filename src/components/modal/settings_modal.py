@@ -3,25 +3,29 @@ from PyQt6.QtWidgets import (
     QScrollArea, QPushButton, QMessageBox
 )
 from PyQt6.QtCore import Qt
+from importlib import import_module
 import os
 
 from .modal_window import ModalWindow
-from .settings.general_tab import GeneralSettingsTab
-from .settings.download_tab import DownloadSettingsTab
-from .settings.connection_tab import ConnectionSettingsTab
-from .settings.scheduler_tab import SchedulerSettingsTab
-from .settings.speed_limiter_tab import SpeedLimiterTab
-from .settings.filters_tab import FiltersTab
-from .settings.browser_tab import BrowserTab
-from .settings.advanced_tab import AdvancedSettingsTab
-from .settings.notifications_tab import NotificationsTab
-from .settings.security_tab import SecurityTab
-from .settings.logging_tab import LoggingTab
-from .settings.integrity_tab import IntegrityTab
 
 from src.settings.manager import SettingsManager
 
 class SettingsModal(ModalWindow):
+    # (title, module in .settings, class); each tab is imported and built when first shown
+    TABS = [
+        ("General", "general_tab", "GeneralSettingsTab"),
+        ("Downloads", "download_tab", "DownloadSettingsTab"),
+        ("Connection", "connection_tab", "ConnectionSettingsTab"),
+        ("Speed", "speed_limiter_tab", "SpeedLimiterTab"),
+        ("Filters", "filters_tab", "FiltersTab"),
+        ("Browser", "browser_tab", "BrowserTab"),
+        ("Advanced", "advanced_tab", "AdvancedSettingsTab"),
+        ("Notifications", "notifications_tab", "NotificationsTab"),
+        ("Security", "security_tab", "SecurityTab"),
+        ("Logging", "logging_tab", "LoggingTab"),
+        ("Integrity", "integrity_tab", "IntegrityTab")
+    ]
+    
     def __init__(self, parent=None):
         super().__init__(parent, title="Settings", width=800, height=600)
         self._is_dark = getattr(parent, '_is_dark', True)
@@ -63,23 +67,12 @@ class SettingsModal(ModalWindow):
         scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
-        # Add tabs
-        self.tabs = [
-            ("General", GeneralSettingsTab(self.settings)),
-            ("Downloads", DownloadSettingsTab(self.settings)),
-            ("Connection", ConnectionSettingsTab(self.settings)),
-            ("Speed", SpeedLimiterTab(self.settings)),
-            ("Filters", FiltersTab(self.settings)),
-            ("Browser", BrowserTab(self.settings)),
-            ("Advanced", AdvancedSettingsTab(self.settings)),
-            ("Notifications", NotificationsTab(self.settings)),
-            ("Security", SecurityTab(self.settings)),
-            ("Logging", LoggingTab(self.settings)),
-            ("Integrity", IntegrityTab(self.settings))
-        ]
-        
-        for title, tab in self.tabs:
-            self.tab_widget.addTab(tab, title)
+        # Add placeholder tabs; only the visible one is built now
+        self.tabs = []  # (title, tab) for the tabs built so far
+        for title, _, _ in self.TABS:
+            self.tab_widget.addTab(QWidget(), title)
+        self.tab_widget.currentChanged.connect(self.build_tab)
+        self.build_tab(0)
         
         content_layout.addWidget(scroll)
         
@@ -92,9 +85,27 @@ class SettingsModal(ModalWindow):
         
         self.setStyleSheet(self.get_settings_style())
     
+    def build_tab(self, index: int):
+        """Replace a placeholder with its settings tab the first time it is shown."""
+        title, module_name, class_name = self.TABS[index]
+        if any(built_title == title for built_title, _ in self.tabs):
+            return
+        
+        tab_class = getattr(import_module(f".settings.{module_name}", __package__), class_name)
+        tab = tab_class(self.settings)
+        self.tabs.append((title, tab))
+        
+        self.tab_widget.blockSignals(True)
+        placeholder = self.tab_widget.widget(index)
+        self.tab_widget.removeTab(index)
+        self.tab_widget.insertTab(index, tab, title)
+        self.tab_widget.setCurrentIndex(index)
+        self.tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+    
     def save_settings(self):
         try:
-            # Save settings from each tab
+            # Save settings from each tab; unopened tabs have nothing to save
             for _, tab in self.tabs:
                 tab.save_settings()
             
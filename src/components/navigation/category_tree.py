@@ -1,7 +1,6 @@
 from PyQt6.QtWidgets import QTreeWidget, QTreeWidgetItem, QStyle
 from PyQt6.QtCore import QSize, Qt
 from PyQt6.QtGui import QIcon
-from src.theme.styles import Styles
 from src.utils.icon_provider import IconProvider
 
 class CategoryTreeItem(QTreeWidgetItem):
@@ -27,7 +26,6 @@ class CategoryTree(QTreeWidget):
         super().__init__()
         self._is_dark = is_dark
         self.setHeaderHidden(True)
-        self.setStyleSheet(Styles.get_styles()["TREE"])
         self.setIconSize(QSize(20, 20))
         self.setIndentation(20)
         self.setup_tree()
@@ -89,7 +87,6 @@ class CategoryTree(QTreeWidget):
     
     def update_theme(self, is_dark):
         self._is_dark = is_dark
-        self.setStyleSheet(Styles.get_styles(is_dark)["TREE"])
         
         def update_item_icons(item):
             icon_name = item.data(0, Qt.ItemDataRole.UserRole)
@@ -1,6 +1,5 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QPushButton, QProgressBar
 from PyQt6.QtCore import Qt
-from src.theme.styles import Styles
 
 class DiskSpace(QWidget):
     def __init__(self, is_dark=True, parent=None):
@@ -41,14 +40,6 @@ class DiskSpace(QWidget):
         layout.addWidget(self.progress_bar)
         layout.addWidget(self.space_label)
         layout.addWidget(self.cleaner_btn)
-        
-        self.apply_theme()
-    
-    def apply_theme(self):
-        styles = Styles.get_styles(self._is_dark)
-        self.setStyleSheet(styles["DISK_SPACE"])
-        self.progress_bar.setStyleSheet(styles["PROGRESS"])
     
     def update_theme(self, is_dark):
         self._is_dark = is_dark
-        self.apply_theme()
@@ -4,8 +4,6 @@ from PyQt6.QtCore import Qt, QSize
 from src.theme.styles import Styles
 from src.utils.icon_provider import IconProvider
 from src.theme.colors import Colors
-from src.components.modal.download_modal import DownloadModal
-from src.components.modal.settings_modal import SettingsModal
 from src.utils.logger import Logger
 
 class ToolbarSeparator(QWidget):
@@ -40,6 +38,7 @@ class ActionToolbar(QToolBar):
     def setup_ui(self):
         actions = [
             ("Add URL", "add_url", self.show_download_modal),
+            ("Import URLs", "import", self.show_import_modal),
             None,  # Separator
             ("Resume", "resume", None),
             ("Stop", "stop", None),
@@ -81,6 +80,9 @@ class ActionToolbar(QToolBar):
     def show_download_modal(self):
         Logger.debug("Opening download modal")
         try:
+            # Modals pull in the download engine, so they load on first use
+            from src.components.modal.download_modal import DownloadModal
+            
             # Get main window
             main_window = self.window()
             
@@ -94,7 +96,22 @@ class ActionToolbar(QToolBar):
         except Exception as e:
             Logger.error(f"Error showing download modal: {e}")
     
+    def show_import_modal(self):
+        Logger.debug("Opening import modal")
+        try:
+            from src.components.modal.import_modal import ImportModal
+            main_window = self.window()
+            modal = ImportModal(
+                parent=main_window,
+                download_manager=main_window.download_manager
+            )
+            modal.exec()
+        except Exception as e:
+            Logger.error(f"Error showing import modal: {e}")
+    
     def show_settings_modal(self):
+        from src.components.modal.settings_modal import SettingsModal
+        
         # Create modal with the main window as parent
         modal = SettingsModal(self.window())
         # Ensure modal stays on top and is independent
@@ -5,7 +5,6 @@ from qframelesswindow import StandardTitleBar
 from src.components.menu.menu_bar import MenuBar
 from src.components.theme.theme_switcher import ThemeSwitcher
 from src.utils.icon_provider import IconProvider
-from src.theme.styles import Styles
 from src.theme.colors import Colors
 
 class TitleBar(StandardTitleBar):
@@ -121,8 +120,6 @@ class TitleBar(StandardTitleBar):
     
     def apply_theme(self, is_dark):
         self._is_dark = is_dark
-        styles = Styles.get_styles(is_dark)
-        self.setStyleSheet(styles["WINDOW"])
         self.menu_bar.update_theme(is_dark)
         self.update_logo()
         self.customize_buttons(is_dark)
@@ -0,0 +1,147 @@
+from typing import List, Optional
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+import asyncio
+from .bandwidth_shaper import BandwidthShaper, parse_speed
+from src.utils.logger import Logger
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+ALL_DAYS = 0b1111111
+
+def weekday_mask(days: Optional[List[str]]) -> int:
+    """Convert day names such as ["Mon", "Fri"] to a bitmask (bit 0 = Monday)."""
+    if not days:
+        return ALL_DAYS
+    mask = 0
+    for day in days:
+        name = day[:3].title()
+        if name in WEEKDAYS:
+            mask |= 1 << WEEKDAYS.index(name)
+    return mask
+
+@dataclass
+class BandwidthWindow:
+    start: time
+    end: time
+    rate: int  # B/s applied while the window is active, 0 = unlimited
+    weekdays: int = ALL_DAYS
+    
+    def contains(self, moment: datetime) -> bool:
+        """Check whether the window is active at a moment.
+        
+        A window that ends before it starts runs past midnight and belongs to
+        the weekday on which it started.
+        """
+        clock = moment.time()
+        if self.start <= self.end:
+            return self._runs_on(moment) and self.start <= clock < self.end
+        if clock >= self.start:
+            return self._runs_on(moment)
+        return clock < self.end and self._runs_on(moment - timedelta(days=1))
+    
+    def _runs_on(self, moment: datetime) -> bool:
+        return bool(self.weekdays & (1 << moment.weekday()))
+    
+    @classmethod
+    def from_settings(cls, data: dict, default_speed: str) -> 'BandwidthWindow':
+        """Create a window from a time_specific_limiter style settings dict."""
+        return cls(
+            start=time.fromisoformat(data.get("start_time", "00:00")),
+            end=time.fromisoformat(data.get("end_time", "00:00")),
+            rate=parse_speed(data.get("max_speed") or default_speed),
+            weekdays=weekday_mask(data.get("days"))
+        )
+
+def next_boundary(windows: List[BandwidthWindow], moment: datetime) -> Optional[datetime]:
+    """Find the next time any of the windows opens or closes after a moment."""
+    candidates = []
+    for window in windows:
+        for day in range(8):
+            date = (moment + timedelta(days=day)).date()
+            for clock in (window.start, window.end):
+                boundary = datetime.combine(date, clock)
+                if boundary > moment:
+                    candidates.append(boundary)
+    return min(candidates, default=None)
+
+class BandwidthProfiles:
+    """Switch the global speed limit at time-of-day window boundaries.
+    
+    Outside every window downloads run at the base rate. When windows overlap
+    the most restrictive one wins. A single timer is armed for the next
+    boundary, so nothing runs between switches and downloads are never
+    restarted.
+    """
+    
+    MAX_SLEEP = 3600  # Re-check hourly in case the wall clock jumps
+    
+    def __init__(self, shaper: BandwidthShaper):
+        self.shaper = shaper
+        self.windows: List[BandwidthWindow] = []
+        self.base_rate = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    def configure(self, windows: List[BandwidthWindow], base_rate: int = 0):
+        """Replace the windows and apply the limit for the current time."""
+        self.windows = windows
+        self.base_rate = base_rate
+        self._apply()
+    
+    def configure_from_settings(self, limiter: dict):
+        """Build windows from the speed_limiter settings category."""
+        if not limiter.get("enabled", False):
+            self.configure([])
+            return
+        
+        max_speed = limiter.get("max_speed", "")
+        windows = []
+        time_specific = limiter.get("time_specific_limiter")
+        if time_specific:
+            windows.append(BandwidthWindow.from_settings(time_specific, max_speed))
+        for profile in limiter.get("profiles", []):
+            windows.append(BandwidthWindow.from_settings(profile, max_speed))
+        
+        # Without any window the limit applies around the clock
+        self.configure(windows, 0 if windows else parse_speed(max_speed))
+    
+    def start(self):
+        """Begin switching limits on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._apply()
+    
+    def stop(self):
+        """Cancel the pending boundary timer."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._loop = None
+    
+    def active_rate(self, moment: datetime) -> int:
+        """Get the rate in force at a moment."""
+        rates = [window.rate for window in self.windows if window.contains(moment)]
+        limited = [rate for rate in rates if rate > 0]
+        if limited:
+            return min(limited)
+        return 0 if rates else self.base_rate
+    
+    def next_boundary(self, moment: datetime) -> Optional[datetime]:
+        """Find the next time any window opens or closes after a moment."""
+        return next_boundary(self.windows, moment)
+    
+    def _apply(self):
+        """Set the current rate and arm the timer for the next boundary."""
+        now = datetime.now()
+        rate = self.active_rate(now)
+        if rate != self.shaper.global_bucket.rate:
+            Logger.info(f"Bandwidth profile switched global limit to {rate} B/s")
+        self.shaper.set_global_rate(rate)
+        
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        boundary = self.next_boundary(now)
+        if self._loop and boundary:
+            delay = min((boundary - now).total_seconds(), self.MAX_SLEEP)
+            self._timer = self._loop.call_later(delay, self._apply)
+            Logger.debug(f"Next bandwidth profile check at {boundary}")
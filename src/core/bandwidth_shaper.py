@@ -0,0 +1,159 @@
+from typing import Dict, Optional
+import asyncio
+import re
+import time
+
+SPEED_UNITS = {"B/S": 1, "KB/S": 1024, "MB/S": 1024 * 1024, "GB/S": 1024 * 1024 * 1024}
+
+def parse_speed(text: Optional[str]) -> int:
+    """Convert a setting such as "500 KB/s" to bytes per second (0 = unlimited)."""
+    match = re.match(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B/s)?\s*$", text or "", re.IGNORECASE)
+    if not match:
+        return 0
+    unit = (match.group(2) or "KB/s").upper()
+    return int(float(match.group(1)) * SPEED_UNITS[unit])
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` bytes per second.
+    
+    Tokens may go negative: a consumer is let through while the balance is
+    positive and then pays off the debt before the next chunk, which keeps
+    pacing exact even when chunks are larger than the bucket.
+    """
+    
+    BURST_SECONDS = 1.0
+    MIN_CAPACITY = 64 * 1024
+    
+    def __init__(self, rate: int = 0):
+        self.rate = rate
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.last_demand = 0.0  # When traffic last asked this bucket for tokens
+    
+    @property
+    def limited(self) -> bool:
+        return self.rate > 0
+    
+    @property
+    def capacity(self) -> int:
+        return max(int(self.rate * self.BURST_SECONDS), self.MIN_CAPACITY)
+    
+    def refill(self, now: float):
+        """Add the tokens earned since the last refill."""
+        if self.limited:
+            self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+    
+    def set_rate(self, rate: int):
+        """Change the rate without dropping the current balance."""
+        self.refill(time.monotonic())
+        self.rate = rate
+        self.tokens = min(self.tokens, self.capacity)
+    
+    def wait_time(self) -> float:
+        """Seconds until the balance is positive again."""
+        if not self.limited or self.tokens > 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class BandwidthShaper:
+    """Hierarchical token-bucket shaper shared by every active download.
+    
+    Each chunk is charged to the download's bucket, its queue's bucket and the
+    global bucket. Download and global limits are hard caps. Queue limits are
+    shares: a queue that has spent its tokens may borrow the unused tokens of
+    an idle sibling queue. Rates can be changed at any time and take effect on
+    the next chunk.
+    """
+    
+    MAX_WAIT = 0.1  # Re-check at least this often so live changes apply quickly
+    IDLE_AFTER = 0.5  # A queue without demand for this long may lend its tokens
+    
+    def __init__(self, global_rate: int = 0):
+        self.global_bucket = TokenBucket(global_rate)
+        self.queue_buckets: Dict[str, TokenBucket] = {}
+        self.download_buckets: Dict[str, TokenBucket] = {}
+    
+    def set_global_rate(self, rate: int):
+        """Set the cap for all downloads together (0 = unlimited)."""
+        self.global_bucket.set_rate(rate)
+    
+    def set_queue_rate(self, queue: str, rate: int):
+        """Set a queue's share of the bandwidth (0 = unlimited)."""
+        if queue in self.queue_buckets:
+            self.queue_buckets[queue].set_rate(rate)
+        else:
+            self.queue_buckets[queue] = TokenBucket(rate)
+    
+    def set_download_rate(self, download_id: str, rate: int):
+        """Set the cap for a single download (0 = unlimited)."""
+        if download_id in self.download_buckets:
+            self.download_buckets[download_id].set_rate(rate)
+        elif rate:
+            self.download_buckets[download_id] = TokenBucket(rate)
+    
+    def remove_download(self, download_id: str):
+        """Forget a download's bucket once it is no longer transferring."""
+        self.download_buckets.pop(download_id, None)
+    
+    def get_rates(self) -> Dict[str, object]:
+        """Get the configured rates in bytes per second."""
+        return {
+            "global": self.global_bucket.rate,
+            "queues": {name: bucket.rate for name, bucket in self.queue_buckets.items()},
+            "downloads": {
+                download_id: bucket.rate
+                for download_id, bucket in self.download_buckets.items()
+            }
+        }
+    
+    async def consume(self, download_id: str, queue: str, size: int):
+        """Charge `size` transferred bytes, waiting until the limits allow it."""
+        while True:
+            delay = self._try_consume(download_id, queue, size)
+            if delay <= 0:
+                return
+            await asyncio.sleep(min(delay, self.MAX_WAIT))
+    
+    def _try_consume(self, download_id: str, queue: str, size: int) -> float:
+        """Charge the buckets if every level allows it, else return the wait time."""
+        now = time.monotonic()
+        download_bucket = self.download_buckets.get(download_id)
+        queue_bucket = self.queue_buckets.get(queue)
+        
+        delays = []
+        for bucket in (download_bucket, self.global_bucket):
+            if bucket:
+                bucket.refill(now)
+                delays.append(bucket.wait_time())
+        
+        queue_charge = queue_bucket
+        if queue_bucket:
+            queue_bucket.last_demand = now
+            queue_bucket.refill(now)
+            if queue_bucket.wait_time() > 0:
+                queue_charge = self._find_lender(queue, size, now)
+                if queue_charge is None:
+                    delays.append(queue_bucket.wait_time())
+        
+        delay = max(delays, default=0.0)
+        if delay > 0:
+            return delay
+        
+        for bucket in (download_bucket, queue_charge, self.global_bucket):
+            if bucket and bucket.limited:
+                bucket.tokens -= size
+        return 0.0
+    
+    def _find_lender(self, queue: str, size: int, now: float) -> Optional[TokenBucket]:
+        """Find the idle sibling queue with the most unused tokens to cover `size`."""
+        lender = None
+        for name, bucket in self.queue_buckets.items():
+            if name == queue or not bucket.limited:
+                continue
+            if now - bucket.last_demand < self.IDLE_AFTER:
+                continue
+            bucket.refill(now)
+            if bucket.tokens >= size and (lender is None or bucket.tokens > lender.tokens):
+                lender = bucket
+        return lender
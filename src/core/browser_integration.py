@@ -5,7 +5,6 @@ import sys
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from pathlib import Path
-import websockets
 from ..models.download import Download
 
 class BrowserIntegration:
@@ -28,6 +27,9 @@ class BrowserIntegration:
         if not self.enabled_browsers:
             return
         
+        # Only needed once the server actually starts
+        import websockets
+        
         # Start WebSocket server for extension communication
         self.server = await websockets.serve(
             self.handle_connection,
@@ -89,6 +91,23 @@ class BrowserIntegration:
                 "download_id": download.id
             }))
             
+        elif message_type == "batch_download_request":
+            # Handle a batch of links, e.g. "download all links on page"
+            urls = [url for url in data.get("urls", []) if self._check_url_filters(url)]
+            if not urls:
+                await websocket.send(json.dumps({
+                    "type": "error",
+                    "error": "No URLs provided"
+                }))
+                return
+            
+            downloads = await self.download_manager.add_downloads(urls)
+            
+            await websocket.send(json.dumps({
+                "type": "batch_download_started",
+                "download_ids": [download.id for download in downloads]
+            }))
+        
         elif message_type == "capture_toggle":
             # Handle URL sniffer toggle
             enabled = data.get("enabled", False)
@@ -0,0 +1,221 @@
+from typing import Dict, Optional
+import asyncio
+import time
+from ..models.download import DownloadStatus
+from src.utils.logger import Logger
+
+class ConcurrencyController:
+    """Tune active downloads and segments per download to measured throughput.
+    
+    Every INTERVAL seconds the aggregate throughput of running downloads and
+    their request round-trip time are sampled. The controller is AIMD: while
+    neither congestion signal fires it adds one download (when more are
+    waiting) or one segment, and keeps the step only if throughput grew by at
+    least GAIN; otherwise it undoes the step and leaves that knob alone for
+    HOLD samples. On congestion, segments and then downloads are cut by
+    BACKOFF. Values stay within the configured bounds, and the static
+    max_active_downloads and chunk_count apply while it is disabled.
+    
+    RTT is measured from request to response headers, so it is only known
+    when a connection opens a request. It is used while that sample is
+    fresh: above RTT_TOLERANCE times the baseline, queues are building up on
+    the path. During long transfers no request is made and no fresh RTT
+    exists, so throughput is the signal there: falling by more than DROP
+    from one sample to the next, over the same downloads and with no step
+    just taken, is treated as congestion too.
+    """
+    
+    INTERVAL = 3.0
+    GAIN = 0.05
+    RTT_TOLERANCE = 2.0
+    DROP = 0.5
+    BACKOFF = 0.75
+    HOLD = 10
+    BASE_RTT_DRIFT = 1.02  # Lets the baseline RTT follow a path that got slower for good
+    
+    def __init__(self, download_manager):
+        self.download_manager = download_manager
+        self.enabled = False
+        self.static_downloads = 4
+        self.static_segments = 4
+        self.min_downloads = self.max_downloads = 4
+        self.min_segments = self.max_segments = 4
+        self.downloads = 4
+        self.segments = 4
+        self.throughput = 0.0  # Bytes per second over the last interval
+        self.congestion: Optional[str] = None  # Signal behind the last decrease, "rtt" or "throughput"
+        self.rtt: Optional[float] = None
+        self.base_rtt: Optional[float] = None
+        self._step: Optional[str] = None  # Knob raised last sample, "downloads" or "segments"
+        self._before_step = 0.0  # Throughput before that step
+        self._hold: Dict[str, int] = {"downloads": 0, "segments": 0}
+        self._bytes: Dict[str, int] = {}  # Download id -> bytes at the last sample
+        self._sampled_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._started = False
+    
+    def configure(self, settings: dict):
+        """Apply the static limits and the adaptive bounds from settings."""
+        advanced = settings["advanced_download"]
+        self.static_downloads = settings["connection"]["max_active_downloads"]
+        self.static_segments = advanced.get("chunk_count", 4)
+        self.enabled = advanced.get("adaptive_concurrency", False)
+        self.min_downloads = max(1, advanced.get("adaptive_min_downloads", 1))
+        self.max_downloads = max(self.min_downloads, advanced.get("adaptive_max_downloads", 16))
+        self.min_segments = max(1, advanced.get("adaptive_min_segments", 1))
+        self.max_segments = max(self.min_segments, advanced.get("adaptive_max_segments", 16))
+        if self.enabled:
+            # Start from the static values and tune from there
+            self.downloads = min(max(self.static_downloads, self.min_downloads), self.max_downloads)
+            self.segments = min(max(self.static_segments, self.min_segments), self.max_segments)
+        else:
+            self.downloads = self.static_downloads
+            self.segments = self.static_segments
+        self._step = None
+        self._apply()
+        self._schedule()
+    
+    def start(self):
+        """Start sampling on the running event loop while enabled."""
+        self._started = True
+        self._schedule()
+    
+    def _schedule(self):
+        if self._started and self.enabled and (self._task is None or self._task.done()):
+            self._sampled_at = time.monotonic()
+            self._bytes = {}
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop sampling."""
+        self._started = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    def get_stats(self) -> Dict[str, object]:
+        """Get the chosen values next to the static settings they replace."""
+        return {
+            "enabled": self.enabled,
+            "downloads": self.downloads,
+            "segments": self.segments,
+            "static_downloads": self.static_downloads,
+            "static_segments": self.static_segments,
+            "throughput": round(self.throughput),
+            "rtt": self.rtt,
+            "base_rtt": self.base_rtt,
+            "congestion": self.congestion
+        }
+    
+    async def _run(self):
+        while self.enabled:
+            await asyncio.sleep(self.INTERVAL)
+            try:
+                self.sample()
+            except Exception as e:
+                Logger.error(f"Concurrency controller sample failed: {str(e)}")
+    
+    def sample(self):
+        """Measure the last interval and take one control step."""
+        now = time.monotonic()
+        elapsed, self._sampled_at = now - self._sampled_at, now
+        engines = self._running_engines()
+        
+        transferred = 0
+        bytes_now = {}
+        for download_id, engine in engines.items():
+            bytes_now[download_id] = engine.downloaded
+            # Downloads started during the interval count from their first sample
+            transferred += max(bytes_now[download_id] - self._bytes.get(download_id, bytes_now[download_id]), 0)
+        same_downloads = bytes_now.keys() == self._bytes.keys()
+        self._bytes = bytes_now
+        if not engines or elapsed <= 0:
+            self._step = None
+            return
+        
+        previous, self.throughput = self.throughput, transferred / elapsed
+        # Only RTTs measured during this interval describe the path as it is now
+        rtts = [engine.rtt for engine in engines.values()
+                if engine.rtt is not None and engine.rtt_at is not None and now - engine.rtt_at <= elapsed]
+        self.rtt = sum(rtts) / len(rtts) if rtts else None
+        if self.rtt is not None:
+            self.base_rtt = self.rtt if self.base_rtt is None else min(self.rtt, self.base_rtt * self.BASE_RTT_DRIFT)
+        
+        for knob in self._hold:
+            self._hold[knob] = max(self._hold[knob] - 1, 0)
+        
+        if self.rtt is not None and self.rtt > self.base_rtt * self.RTT_TOLERANCE:
+            self._decrease("rtt")
+        elif self._step and self.throughput < self._before_step * (1 + self.GAIN):
+            self._undo()
+        elif not self._step and same_downloads and self.throughput < previous * (1 - self.DROP):
+            self._decrease("throughput")
+        else:
+            self._increase()
+        self._apply()
+    
+    def _running_engines(self) -> dict:
+        downloads = self.download_manager.downloads
+        return {
+            download_id: worker.engine for download_id, worker in self.download_manager.workers.items()
+            if worker.engine and download_id in downloads
+            and downloads[download_id].status == DownloadStatus.DOWNLOADING
+        }
+    
+    def _increase(self):
+        """Add one download if any are waiting, else one segment."""
+        self._step = None
+        waiting = any(len(queue) for queue in self.download_manager.queue_manager.queues.values())
+        running = len(self._bytes)
+        if waiting and running >= self.downloads and self.downloads < self.max_downloads \
+                and not self._hold["downloads"]:
+            self.downloads += 1
+            self._step = "downloads"
+        elif self.segments < self.max_segments and not self._hold["segments"]:
+            self.segments += 1
+            self._step = "segments"
+        self._before_step = self.throughput
+    
+    def _undo(self):
+        """Take back the last step, which did not pay off, and leave that knob alone for a while."""
+        if self._step == "downloads":
+            self.downloads = max(self.downloads - 1, self.min_downloads)
+        else:
+            self.segments = max(self.segments - 1, self.min_segments)
+        self._hold[self._step] = self.HOLD
+        Logger.debug(f"Adaptive concurrency: more {self._step} did not help, holding")
+        self._step = None
+    
+    def _decrease(self, signal: str):
+        """Cut segments, or downloads once segments are at their minimum."""
+        self._step = None
+        self.congestion = signal
+        if self.segments > self.min_segments:
+            self.segments = max(int(self.segments * self.BACKOFF), self.min_segments)
+        else:
+            self.downloads = max(int(self.downloads * self.BACKOFF), self.min_downloads)
+        if signal == "rtt":
+            Logger.debug(f"Adaptive concurrency: RTT {self.rtt:.3f}s over baseline "
+                         f"{self.base_rtt:.3f}s, backing off")
+        else:
+            Logger.debug(f"Adaptive concurrency: throughput fell to {self.throughput:.0f} B/s, backing off")
+    
+    def _apply(self):
+        """Hand the chosen values to the manager and the running downloads."""
+        manager = self.download_manager
+        more_downloads = self.downloads > manager.max_concurrent
+        manager.max_concurrent = self.downloads
+        changed = False
+        for worker in manager.workers.values():
+            worker.chunk_size = self.segments
+            if worker.engine and worker.engine.segments != self.segments:
+                worker.engine.set_segments(self.segments)
+                changed = True
+        if more_downloads or changed:
+            Logger.info(f"Adaptive concurrency: {self.downloads} downloads, {self.segments} segments")
+        if more_downloads:
+            manager.queue_manager.dispatch()
@@ -0,0 +1,123 @@
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit, quote
+import ssl
+import aiohttp
+from src.utils.logger import Logger
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+def proxy_from_settings(proxy_settings: Optional[dict]) -> Optional[str]:
+    """Build a proxy URL from the connection.proxy_settings category."""
+    if not proxy_settings or not proxy_settings.get("enabled"):
+        return None
+    server = proxy_settings.get("server_address", "").strip()
+    if not server:
+        return None
+    if "://" not in server:
+        server = f"http://{server}"
+    
+    parts = urlsplit(server)
+    netloc = parts.hostname or ""
+    port = proxy_settings.get("port") or parts.port
+    if port:
+        netloc = f"{netloc}:{port}"
+    auth = proxy_settings.get("authentication") or {}
+    if auth.get("username"):
+        credentials = quote(auth["username"], safe="")
+        if auth.get("password"):
+            credentials += ":" + quote(auth["password"], safe="")
+        netloc = f"{credentials}@{netloc}"
+    return f"{parts.scheme}://{netloc}"
+
+class ConnectionPool:
+    """Process-wide HTTP sessions shared by every download.
+    
+    One session is kept per (scheme, host, port, proxy) so keep-alive sockets
+    are reused across downloads from the same server instead of paying a new
+    TCP and TLS handshake each time. Every session caps its sockets at
+    `limit_per_host` and shares a single SSL context. Reused and newly opened
+    connections are counted as pool hits and misses.
+    """
+    
+    KEEPALIVE_TIMEOUT = 30  # Seconds an idle socket is kept open
+    
+    def __init__(self, limit_per_host: int = 8, proxy: Optional[str] = None):
+        self.limit_per_host = max(1, limit_per_host)
+        self.proxy = proxy
+        self.hits = 0
+        self.misses = 0
+        self.host_stats: Dict[str, Dict[str, int]] = {}
+        self._sessions: Dict[Tuple, aiohttp.ClientSession] = {}
+        self._ssl_context = ssl.create_default_context()
+    
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'ConnectionPool':
+        """Create a pool from the connection settings category."""
+        connection = settings["connection"]
+        return cls(
+            limit_per_host=connection.get("max_simultaneous_connections", 8),
+            proxy=proxy_from_settings(connection.get("proxy_settings"))
+        )
+    
+    def configure(self, limit_per_host: int, proxy: Optional[str]):
+        """Apply new limits; existing sessions keep theirs until they are closed."""
+        self.limit_per_host = max(1, limit_per_host)
+        self.proxy = proxy
+    
+    def pool_key(self, url: str) -> Tuple:
+        """Get the (scheme, host, port, proxy) key a URL is pooled under."""
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        port = parts.port or DEFAULT_PORTS.get(scheme)
+        return (scheme, (parts.hostname or "").lower(), port, self.proxy)
+    
+    def session(self, url: str) -> aiohttp.ClientSession:
+        """Get the shared session for a URL. Requests must pass `proxy=pool.proxy`."""
+        key = self.pool_key(url)
+        session = self._sessions.get(key)
+        if session is None or session.closed:
+            session = self._create_session(key)
+            self._sessions[key] = session
+        return session
+    
+    def get_stats(self) -> Dict[str, object]:
+        """Get the hit/miss counters overall and per host."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "sessions": sum(1 for session in self._sessions.values() if not session.closed),
+            "hosts": {host: dict(stats) for host, stats in self.host_stats.items()}
+        }
+    
+    async def close(self):
+        """Close every pooled session and its sockets."""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            if not session.closed:
+                await session.close()
+        Logger.debug(f"Connection pool closed: {self.hits} hits, {self.misses} misses")
+    
+    def _create_session(self, key: Tuple) -> aiohttp.ClientSession:
+        scheme, host, port, _ = key
+        label = f"{host}:{port}"
+        self.host_stats.setdefault(label, {"hits": 0, "misses": 0})
+        
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_reuseconn.append(self._count(label, "hits"))
+        trace.on_connection_create_end.append(self._count(label, "misses"))
+        connector = aiohttp.TCPConnector(
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.KEEPALIVE_TIMEOUT,
+            ssl=self._ssl_context
+        )
+        Logger.debug(f"Opening pooled session for {scheme}://{label}")
+        return aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+    
+    def _count(self, label: str, counter: str):
+        async def on_event(session, context, params):
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.host_stats[label][counter] += 1
+        return on_event
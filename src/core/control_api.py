@@ -0,0 +1,380 @@
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from datetime import datetime
+from urllib.parse import urlsplit
+import asyncio
+import hmac
+import json
+import os
+import secrets
+from aiohttp import web
+import aiohttp
+from ..models.download import Download, DownloadStatus
+from src.settings.manager import DEFAULT_SETTINGS_FILE
+from src.utils.logger import Logger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8766  # Next to the browser extension's 8765
+DEFAULT_TOKEN_FILE = os.path.join(os.path.dirname(DEFAULT_SETTINGS_FILE), "control_token")
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+def load_token(path: str = DEFAULT_TOKEN_FILE) -> str:
+    """Read the control API token, creating a random one only the user can read if there is none."""
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    try:
+        descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return load_token(path)  # Created by the server or another client meanwhile
+    with os.fdopen(descriptor, "w") as file:
+        file.write(token)
+    Logger.info(f"Created control API token in {path}")
+    return token
+
+def _is_loopback(netloc: str) -> bool:
+    """Check that a Host header or Origin netloc names this machine."""
+    try:
+        host = urlsplit(f"//{netloc}").hostname
+    except ValueError:
+        return False
+    return host in LOOPBACK_HOSTS
+
+class _EventStream:
+    """Events waiting to be written to one /events client.
+    
+    Pending events are keyed by (event, download ID), so a slow client gets
+    the latest progress of each download instead of every intermediate one,
+    and its backlog never grows beyond one entry per download and event.
+    """
+    
+    def __init__(self):
+        self.pending: Dict[Tuple[str, str], Download] = {}
+        self.ready = asyncio.Event()
+    
+    def push(self, event: str, download: Download):
+        key = (event, download.id)
+        # Re-insert so events stay in the order of their latest update
+        self.pending.pop(key, None)
+        self.pending[key] = download
+        self.ready.set()
+    
+    def take(self) -> Dict[Tuple[str, str], Download]:
+        pending, self.pending = self.pending, {}
+        self.ready.clear()
+        return pending
+
+def encode_event(event: str, download: Download) -> bytes:
+    """Encode an event as one line of newline-delimited JSON."""
+    return (json.dumps({"event": event, "download": download.to_dict()}) + "\n").encode()
+
+class ControlServer:
+    """Local HTTP/JSON API over a DownloadManager.
+    
+    Listens on a Unix socket when `socket_path` is given, otherwise on
+    host:port (localhost by default). Any number of clients can control the
+    same manager and follow it through GET /events, a stream of
+    newline-delimited JSON events.
+    
+    Web pages the user visits can reach a loopback port too, so every
+    request must carry the per-install token from `token_path` as
+    `Authorization: Bearer <token>`, a loopback Host (against DNS
+    rebinding) and no foreign Origin. Request bodies must be sent as
+    application/json, which browsers cannot do cross-site without a
+    preflight. Files may only be saved inside the download directories.
+    """
+    
+    def __init__(self, download_manager, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 socket_path: Optional[str] = None, token_path: str = DEFAULT_TOKEN_FILE):
+        self.download_manager = download_manager
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.token = load_token(token_path)
+        self._streams: Set[_EventStream] = set()
+        self._runner: Optional[web.AppRunner] = None
+        self._closing = False
+        
+        self.app = web.Application(middlewares=[self._guard])
+        self.app.add_routes([
+            web.get("/status", self.get_status),
+            web.get("/downloads", self.list_downloads),
+            web.post("/downloads", self.add_downloads),
+            web.post("/scheduled", self.schedule_download),
+            web.get("/downloads/{id}", self.get_download),
+            web.delete("/downloads/{id}", self.cancel_download),
+            web.post("/downloads/{id}/{action}", self.download_action),
+            web.get("/events", self.stream_events)
+        ])
+    
+    async def start(self):
+        """Start listening."""
+        self._closing = False
+        self.download_manager.add_listener(self._on_event)
+        self._runner = web.AppRunner(self.app, handle_signals=False)
+        await self._runner.setup()
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)  # Left behind by an unclean exit
+            site = web.UnixSite(self._runner, self.socket_path)
+            await site.start()
+            os.chmod(self.socket_path, 0o600)
+            Logger.info(f"Control API listening on {self.socket_path}")
+        else:
+            site = web.TCPSite(self._runner, self.host, self.port)
+            await site.start()
+            Logger.info(f"Control API listening on http://{self.host}:{self.port}")
+    
+    async def stop(self):
+        """Stop listening and close event streams."""
+        self._closing = True
+        self.download_manager.remove_listener(self._on_event)
+        for stream in self._streams:
+            stream.ready.set()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+    
+    @web.middleware
+    async def _guard(self, request: web.Request, handler) -> web.StreamResponse:
+        """Refuse requests that did not come from a local client holding the token."""
+        if not _is_loopback(request.host):
+            raise _error(web.HTTPForbidden, "Host must be a loopback address")
+        origin = request.headers.get("Origin")
+        if origin is not None and not _is_loopback(urlsplit(origin).netloc):
+            raise _error(web.HTTPForbidden, "Cross-origin requests are not allowed")
+        authorization = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {self.token}".encode()):
+            raise _error(web.HTTPUnauthorized, "Missing or wrong control API token")
+        return await handler(request)
+    
+    def _save_roots(self) -> List[str]:
+        """Directories downloads may be saved in: the default one and the category folders."""
+        roots = [self.download_manager.default_directory]
+        categories = self.download_manager.settings["download"].get("file_category_management") or {}
+        if isinstance(categories, dict):
+            roots.extend(path for path in categories.values() if isinstance(path, str) and path)
+        return [os.path.realpath(root) for root in roots]
+    
+    def _save_path(self, path: Optional[str]) -> Optional[str]:
+        """Resolve a requested save path or directory, refusing any outside the download directories."""
+        if not path:
+            return None
+        resolved = os.path.realpath(os.path.join(self.download_manager.default_directory, path))
+        for root in self._save_roots():
+            if os.path.commonpath([resolved, root]) == root:
+                return resolved
+        raise _error(web.HTTPForbidden, f"{path} is outside the download directories")
+    
+    def _on_event(self, event: str, download: Download):
+        for stream in self._streams:
+            stream.push(event, download)
+    
+    def _get(self, request: web.Request) -> Download:
+        download = self.download_manager.downloads.get(request.match_info["id"])
+        if download is None:
+            raise _error(web.HTTPNotFound, f"No download {request.match_info['id']}")
+        return download
+    
+    async def get_status(self, request: web.Request) -> web.Response:
+        manager = self.download_manager
+        return web.json_response({
+            "downloads": len(manager.downloads),
+            "active": len(manager.workers),
+            "max_active": manager.max_concurrent,
+            "concurrency": manager.get_concurrency_stats(),
+            "clients": len(self._streams)
+        })
+    
+    async def list_downloads(self, request: web.Request) -> web.Response:
+        """List loaded downloads, or search the whole history with ?q=."""
+        query = request.query.get("q")
+        if query:
+            downloads = await self.download_manager.search_history(query)
+        else:
+            downloads = list(self.download_manager.downloads.values())
+        
+        status = request.query.get("status")
+        if status:
+            downloads = [download for download in downloads if download.status.value == status]
+        return web.json_response([download.to_dict() for download in downloads])
+    
+    async def get_download(self, request: web.Request) -> web.Response:
+        return web.json_response(self._get(request).to_dict())
+    
+    async def add_downloads(self, request: web.Request) -> web.Response:
+        """Add `{"url": ...}` or a batch `{"urls": [...]}`; `"start": true` starts them."""
+        data = await _read_json(request)
+        manager = self.download_manager
+        queue = data.get("queue", "regular")
+        if data.get("urls"):
+            downloads = await manager.add_downloads(data["urls"], queue, self._save_path(data.get("save_dir")))
+        elif data.get("url"):
+            downloads = [await manager.add_download(data["url"], self._save_path(data.get("save_path")), queue)]
+        else:
+            raise _error(web.HTTPBadRequest, "No URL provided")
+        
+        if data.get("start"):
+            for download in downloads:
+                await manager.start_download(download.id)
+        return web.json_response([download.to_dict() for download in downloads], status=201)
+    
+    async def schedule_download(self, request: web.Request) -> web.Response:
+        """Schedule `{"url": ..., "save_path": ...}` at an ISO `"time"`, a `"recurrence"` rule, or both."""
+        data = await _read_json(request)
+        if not data.get("url") or not data.get("save_path"):
+            raise _error(web.HTTPBadRequest, "url and save_path are required")
+        save_path = self._save_path(data["save_path"])
+        
+        try:
+            schedule_time = datetime.fromisoformat(data["time"]) if data.get("time") else None
+            download = await self.download_manager.schedule_download(
+                data["url"], save_path, schedule_time, data.get("recurrence")
+            )
+        except ValueError as e:
+            raise _error(web.HTTPBadRequest, str(e))
+        return web.json_response(download.to_dict(), status=201)
+    
+    async def download_action(self, request: web.Request) -> web.Response:
+        download = self._get(request)
+        action = request.match_info["action"]
+        if action == "start":
+            await self.download_manager.start_download(download.id)
+        elif action == "pause":
+            await self.download_manager.pause_download(download.id)
+        elif action == "resume":
+            await self.download_manager.resume_download(download.id)
+        else:
+            raise _error(web.HTTPNotFound, f"Unknown action {action}")
+        return web.json_response(download.to_dict())
+    
+    async def cancel_download(self, request: web.Request) -> web.Response:
+        download = self._get(request)
+        await self.download_manager.cancel_download(download.id)
+        return web.json_response(download.to_dict())
+    
+    async def stream_events(self, request: web.Request) -> web.StreamResponse:
+        """Stream download events as newline-delimited JSON until the client leaves."""
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        
+        stream = _EventStream()
+        self._streams.add(stream)
+        Logger.debug(f"Event stream opened ({len(self._streams)} clients)")
+        try:
+            while not self._closing:
+                await stream.ready.wait()
+                lines = b"".join(encode_event(event, download)
+                                 for (event, _), download in stream.take().items())
+                if lines:
+                    await response.write(lines)
+        except (ConnectionResetError, asyncio.CancelledError):
+            pass
+        finally:
+            self._streams.discard(stream)
+            Logger.debug(f"Event stream closed ({len(self._streams)} clients)")
+        return response
+
+def _error(error_class, message: str) -> web.HTTPException:
+    return error_class(text=json.dumps({"error": message}), content_type="application/json")
+
+async def _read_json(request: web.Request) -> dict:
+    """Parse a JSON object body, refusing other content types."""
+    if request.content_type != "application/json":
+        raise _error(web.HTTPUnsupportedMediaType, "Content-Type must be application/json")
+    try:
+        data = await request.json()
+    except json.JSONDecodeError:
+        raise _error(web.HTTPBadRequest, "Invalid JSON")
+    if not isinstance(data, dict):
+        raise _error(web.HTTPBadRequest, "Expected a JSON object")
+    return data
+
+class ControlClient:
+    """Client for a ControlServer, with the DownloadManager's method names."""
+    
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 socket_path: Optional[str] = None, token: Optional[str] = None,
+                 token_path: str = DEFAULT_TOKEN_FILE):
+        if socket_path:
+            self._connector = aiohttp.UnixConnector(path=socket_path)
+            self._base_url = "http://localhost"
+        else:
+            self._connector = aiohttp.TCPConnector()
+            self._base_url = f"http://{host}:{port}"
+        self._session = aiohttp.ClientSession(connector=self._connector, headers={
+            "Authorization": f"Bearer {token or load_token(token_path)}"
+        })
+    
+    async def close(self):
+        await self._session.close()
+    
+    async def _request(self, method: str, path: str, **kwargs):
+        async with self._session.request(method, self._base_url + path, **kwargs) as response:
+            data = await response.json()
+            if response.status >= 400:
+                raise RuntimeError(data.get("error", f"HTTP {response.status}"))
+            return data
+    
+    async def get_status(self) -> dict:
+        return await self._request("GET", "/status")
+    
+    async def list_downloads(self, status: Optional[DownloadStatus] = None,
+                             query: Optional[str] = None) -> List[Download]:
+        params = {}
+        if status:
+            params["status"] = status.value
+        if query:
+            params["q"] = query
+        return [Download.from_dict(data) for data in await self._request("GET", "/downloads", params=params)]
+    
+    async def get_download(self, download_id: str) -> Download:
+        return Download.from_dict(await self._request("GET", f"/downloads/{download_id}"))
+    
+    async def add_download(self, url: str, save_path: Optional[str] = None,
+                           queue: str = "regular", start: bool = False) -> Download:
+        data = await self._request("POST", "/downloads", json={
+            "url": url, "save_path": save_path, "queue": queue, "start": start
+        })
+        return Download.from_dict(data[0])
+    
+    async def add_downloads(self, urls: List[str], queue: str = "regular",
+                            save_dir: Optional[str] = None, start: bool = False) -> List[Download]:
+        data = await self._request("POST", "/downloads", json={
+            "urls": urls, "queue": queue, "save_dir": save_dir, "start": start
+        })
+        return [Download.from_dict(item) for item in data]
+    
+    async def schedule_download(self, url: str, save_path: str,
+                                schedule_time: Optional[datetime] = None,
+                                recurrence: Optional[str] = None) -> Download:
+        data = await self._request("POST", "/scheduled", json={
+            "url": url, "save_path": save_path, "recurrence": recurrence,
+            "time": schedule_time.isoformat() if schedule_time else None
+        })
+        return Download.from_dict(data)
+    
+    async def start_download(self, download_id: str):
+        await self._request("POST", f"/downloads/{download_id}/start")
+    
+    async def pause_download(self, download_id: str):
+        await self._request("POST", f"/downloads/{download_id}/pause")
+    
+    async def resume_download(self, download_id: str):
+        await self._request("POST", f"/downloads/{download_id}/resume")
+    
+    async def cancel_download(self, download_id: str):
+        await self._request("DELETE", f"/downloads/{download_id}")
+    
+    async def events(self) -> AsyncIterator[Tuple[str, Download]]:
+        """Yield (event, download) pairs as the daemon reports them."""
+        async with self._session.get(self._base_url + "/events", timeout=aiohttp.ClientTimeout()) as response:
+            async for line in response.content:
+                if line.strip():
+                    data = json.loads(line)
+                    yield data["event"], Download.from_dict(data["download"])
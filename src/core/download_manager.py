@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
@@ -8,21 +8,61 @@ from .download_worker import DownloadWorker
 from ..models.download import Download, DownloadStatus
 from ..repositories.download_repository import DownloadRepository
 from .queue_manager import QueueManager
+from .download_queue import POSITION_STEP
 from .scheduler import Scheduler
+from .recurrence import parse_recurrence
+from .bandwidth_shaper import BandwidthShaper, parse_speed
+from .bandwidth_profiles import BandwidthProfiles
+from .connection_pool import ConnectionPool, proxy_from_settings
+from .host_limiter import HostLimiter
+from .concurrency_controller import ConcurrencyController
+from .metadata_probe import MetadataProbe, ProbeResult
+from .url_import import dedupe_urls
+from .progress_writer import ProgressWriter
+from .event_compactor import EventCompactor
+from .search_index import parse_query, to_fts_query
 from src.utils.logger import Logger
 
+# Events passed to listeners, each with the download it concerns
+DOWNLOAD_EVENTS = ("added", "progress", "status", "removed")
+
 class DownloadManager:
+    PROBE_CONCURRENCY = 16  # Simultaneous metadata probes during bulk imports
+    
     def __init__(self, settings: dict):
         Logger.debug("Initializing DownloadManager")
         self.settings = settings
         self.downloads: Dict[str, Download] = {}
         self.workers: Dict[str, DownloadWorker] = {}
+        self._worker_tasks: Dict[str, asyncio.Task] = {}
+        self._listeners: List[Callable[[str, Download], None]] = []
         self.repository = DownloadRepository()
         self.queue_manager = QueueManager(self)
+        self.concurrency = ConcurrencyController(self)
         self.scheduler = Scheduler(self)
+        self.progress_writer = ProgressWriter(
+            self.repository,
+            settings["advanced_download"].get("progress_flush_interval_ms", 1000) / 1000
+        )
+        self.event_compactor = EventCompactor(
+            self.repository,
+            settings.get("logging", {}).get("history_management_days", 30)
+        )
+        self.shaper = BandwidthShaper()
+        self.bandwidth_profiles = BandwidthProfiles(self.shaper)
+        self.connection_pool = ConnectionPool.from_settings(settings)
+        self.host_limiter = HostLimiter.from_settings(settings)
+        self.host_limiter.on_available = self.queue_manager.dispatch
+        self.metadata_probe = MetadataProbe(
+            self.connection_pool,
+            timeout=settings["advanced_download"].get("timeout_seconds", 30)
+        )
         
         # Load settings
         self.max_concurrent = settings["connection"]["max_active_downloads"]
+        self.concurrency.configure(settings)
+        self._apply_speed_limits()
+        self.queue_manager.configure(settings.get("scheduler", {}).get("queues", {}))
         self.default_directory = settings["download"]["default_download_directory"]
         self.temp_directory = settings["download"]["temporary_folder"]
         
@@ -31,6 +71,115 @@ class DownloadManager:
         os.makedirs(self.temp_directory, exist_ok=True)
         Logger.info(f"DownloadManager initialized with directories: default={self.default_directory}, temp={self.temp_directory}")
     
+    async def start(self):
+        """Start background services that need the running event loop."""
+        Logger.info("Starting DownloadManager services")
+        self.bandwidth_profiles.start()
+        self.progress_writer.start()
+        self.event_compactor.start()
+        self.queue_manager.start()
+        self.scheduler.start()
+        self.concurrency.start()
+    
+    async def shutdown(self):
+        """Stop background services."""
+        Logger.info("Shutting down DownloadManager")
+        self.queue_manager.stop()
+        self.scheduler.stop()
+        await self.concurrency.stop()
+        self.bandwidth_profiles.stop()
+        await self.event_compactor.stop()
+        # Let stopped workers checkpoint their parts before the final flush
+        for worker in list(self.workers.values()):
+            await worker.stop()
+        await asyncio.gather(*self._worker_tasks.values(), return_exceptions=True)
+        await self.progress_writer.stop()
+        await self.connection_pool.close()
+        await self.repository.close()
+    
+    def add_listener(self, listener: Callable[[str, Download], None]):
+        """Call `listener(event, download)` for every event in DOWNLOAD_EVENTS.
+        
+        Listeners run synchronously on the event loop, so they should only
+        record the event and leave any I/O to a task of their own.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, Download], None]):
+        """Stop calling a listener."""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, event: str, download: Download):
+        for listener in self._listeners:
+            try:
+                listener(event, download)
+            except Exception as e:
+                Logger.error(f"Download listener failed on {event}: {str(e)}")
+    
+    def update_settings(self, settings: dict):
+        """Apply changed settings to running downloads without restarting them."""
+        Logger.info("Applying updated settings to DownloadManager")
+        self.settings = settings
+        self.max_concurrent = settings["connection"]["max_active_downloads"]
+        self.concurrency.configure(settings)
+        self.progress_writer.interval = settings["advanced_download"].get(
+            "progress_flush_interval_ms", 1000
+        ) / 1000
+        self.event_compactor.history_days = settings.get("logging", {}).get(
+            "history_management_days", 30
+        )
+        self.connection_pool.configure(
+            settings["connection"].get("max_simultaneous_connections", 8),
+            proxy_from_settings(settings["connection"].get("proxy_settings"))
+        )
+        self.host_limiter.configure(settings)
+        self._apply_speed_limits()
+        self.queue_manager.configure(settings.get("scheduler", {}).get("queues", {}))
+    
+    def _apply_speed_limits(self):
+        """Push the global and per-queue speed limits into the shaper."""
+        limiter = self.settings["speed_limiter"]
+        enabled = limiter.get("enabled", False)
+        
+        # The global limit follows the time-of-day profiles
+        self.bandwidth_profiles.configure_from_settings(limiter)
+        
+        queues = self.settings.get("scheduler", {}).get("queues", {})
+        for queue_name, queue_settings in queues.items():
+            rate = parse_speed(queue_settings.get("speed_limit")) if enabled else 0
+            self.shaper.set_queue_rate(queue_name, rate)
+        Logger.debug(f"Speed limits applied: {self.shaper.get_rates()}")
+    
+    async def probe_url(self, url: str) -> ProbeResult:
+        """Get a URL's file name, size and type without downloading it."""
+        Logger.info(f"Probing URL: {url}")
+        return await self.metadata_probe.probe(url)
+    
+    async def search_history(self, query: str, limit: int = 200) -> List[Download]:
+        """Search every stored download, loaded or not, with the table's query syntax."""
+        match = to_fts_query(parse_query(query))
+        if not match:
+            return []
+        return await self.repository.search(match, limit)
+    
+    def get_connection_stats(self) -> Dict[str, object]:
+        """Get connection pool hit/miss counters."""
+        return self.connection_pool.get_stats()
+    
+    def get_concurrency_stats(self) -> Dict[str, object]:
+        """Get the active download and segment counts in use, next to the static settings."""
+        return self.concurrency.get_stats()
+    
+    async def set_download_speed_limit(self, download_id: str, speed_limit: Optional[int]):
+        """Cap a single download in B/s (None or 0 removes the cap)."""
+        download = self.downloads[download_id]
+        download.speed_limit = speed_limit or None
+        if download_id in self.workers:
+            self.shaper.set_download_rate(download_id, speed_limit or 0)
+        await self.repository.update(download)
+        Logger.debug(f"Speed limit for download {download_id} set to {speed_limit} B/s")
+    
     async def add_download(self, url: str, save_path: Optional[str] = None, 
                          queue: str = "regular") -> Download:
         """Add a new download to the queue."""
@@ -47,6 +196,7 @@ class DownloadManager:
             save_path=save_path,
             status=DownloadStatus.QUEUED,
             queue=queue,
+            queue_position=self.queue_manager.next_position(queue),
             created_at=datetime.now()
         )
         
@@ -61,9 +211,84 @@ class DownloadManager:
         
         # Store in memory
         self.downloads[download_id] = download
+        self._notify("added", download)
+        self.queue_manager.dispatch()
         
         return download
     
+    async def add_downloads(self, urls: List[str], queue: str = "regular",
+                            save_dir: Optional[str] = None,
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Download]:
+        """Add many URLs at once, e.g. from a link list or a browser batch.
+        
+        URLs already in the list are skipped. The rest are probed concurrently
+        for their file names and sizes, then inserted in a single transaction.
+        """
+        urls = dedupe_urls(urls, {download.url for download in self.downloads.values()})
+        Logger.info(f"Bulk adding {len(urls)} downloads to queue {queue}")
+        if not urls:
+            return []
+        
+        save_dir = save_dir or self.default_directory
+        semaphore = asyncio.Semaphore(self.PROBE_CONCURRENCY)
+        done = 0
+        
+        async def probe(url: str) -> Optional[ProbeResult]:
+            nonlocal done
+            async with semaphore:
+                try:
+                    return await self.metadata_probe.probe(url)
+                except Exception as e:
+                    # The download itself will report the error
+                    Logger.warning(f"Could not probe {url}: {str(e)}")
+                    return None
+                finally:
+                    done += 1
+                    if progress_callback:
+                        progress_callback(done, len(urls))
+        
+        probes = await asyncio.gather(*(probe(url) for url in urls))
+        
+        taken = {download.save_path for download in self.downloads.values()}
+        created_at = datetime.now()
+        first_position = self.queue_manager.next_position(queue)
+        downloads = []
+        for number, (url, result) in enumerate(zip(urls, probes)):
+            file_name = result.file_name if result else (url.split('/')[-1] or "unnamed_file")
+            save_path = self._unique_save_path(os.path.join(save_dir, file_name), taken)
+            taken.add(save_path)
+            downloads.append(Download(
+                url=url,
+                save_path=save_path,
+                status=DownloadStatus.QUEUED,
+                queue=queue,
+                queue_position=first_position + number * POSITION_STEP,
+                total_size=result.total_size if result else None,
+                etag=result.etag if result else None,
+                last_modified=result.last_modified if result else None,
+                created_at=created_at
+            ))
+        
+        await self.repository.add_many(downloads)
+        for download in downloads:
+            self.queue_manager.add_to_queue(download, queue)
+            self.downloads[download.id] = download
+            self._notify("added", download)
+        self.queue_manager.dispatch()
+        Logger.info(f"Added {len(downloads)} downloads")
+        
+        return downloads
+    
+    def _unique_save_path(self, save_path: str, taken: set) -> str:
+        """Append a number to the file name until it is not used."""
+        base, ext = os.path.splitext(save_path)
+        candidate = save_path
+        number = 1
+        while candidate in taken or os.path.exists(candidate):
+            candidate = f"{base} ({number}){ext}"
+            number += 1
+        return candidate
+    
     async def start_download(self, download_id: str):
         """Start a specific download."""
         Logger.info(f"Starting download: {download_id}")
@@ -72,26 +297,66 @@ class DownloadManager:
             return
         
         download = self.downloads[download_id]
-        if len(self.workers) >= self.max_concurrent:
+        if sum(self.queue_manager.active_counts().values()) >= self.max_concurrent:
             download.status = DownloadStatus.QUEUED
+            self.queue_manager.add_to_queue(download, download.queue)
             await self.repository.update(download)
+            self._notify("status", download)
             Logger.debug(f"Download {download_id} queued (max concurrent reached)")
             return
         
+        self.queue_manager.remove(download_id)
+        
         # Create worker with current settings
-        worker = DownloadWorker(download, self.settings)
+        worker = DownloadWorker(download, self.settings, self.repository,
+                                self.shaper, self.connection_pool, self.host_limiter,
+                                self.concurrency.segments)
         self.workers[download_id] = worker
         Logger.debug(f"Created worker for download {download_id}")
         
         # Start download with progress callback
         download.status = DownloadStatus.DOWNLOADING
         await self.repository.update(download)
+        if self.workers.get(download_id) is not worker:
+            return  # Cancelled while the status was being saved
+        self._notify("status", download)
         
-        asyncio.create_task(worker.start(
-            progress_callback=lambda p: self._handle_progress(download_id, p)
-        ))
+        self._worker_tasks[download_id] = asyncio.create_task(self._run_worker(download_id, worker))
         Logger.info(f"Download {download_id} started")
     
+    async def _run_worker(self, download_id: str, worker: DownloadWorker):
+        """Run a worker to the end and persist its final state."""
+        try:
+            await worker.start(
+                progress_callback=lambda p: self._handle_progress(download_id, p)
+            )
+        finally:
+            if self.workers.get(download_id) is worker:
+                del self.workers[download_id]
+            if self._worker_tasks.get(download_id) is asyncio.current_task():
+                del self._worker_tasks[download_id]
+        if download_id not in self.downloads:
+            return  # Cancelled and deleted meanwhile
+        
+        download = self.downloads[download_id]
+        self.progress_writer.mark_dirty(download)
+        if download.status == DownloadStatus.ERROR:
+            self.progress_writer.record_event(download_id, download.status.value, {"error": download.error})
+        elif download.status == DownloadStatus.COMPLETED:
+            self.progress_writer.record_event(download_id, download.status.value,
+                                              {"not_modified": True} if worker.not_modified else None)
+        self.queue_manager.download_finished(download)
+        if self.scheduler.download_finished(download):
+            await self.repository.save_parts(download_id, [])  # The next run starts from scratch
+            self.progress_writer.record_event(download_id, "rescheduled", {
+                "scheduled_time": download.scheduled_time.isoformat()
+            })
+        await self.progress_writer.flush()
+        if download_id not in self.downloads:
+            return  # Cancelled during the flush; "removed" was already sent
+        self._notify("status", download)
+        Logger.debug(f"Worker for download {download_id} finished with status {download.status.value}")
+    
     async def pause_download(self, download_id: str):
         """Pause a specific download."""
         Logger.info(f"Pausing download: {download_id}")
@@ -103,7 +368,11 @@ class DownloadManager:
         
         download = self.downloads[download_id]
         download.status = DownloadStatus.PAUSED
-        await self.repository.update(download)
+        download.speed = 0
+        self.progress_writer.mark_dirty(download)
+        await self.progress_writer.flush()
+        self._notify("status", download)
+        self.queue_manager.dispatch()  # A paused download holds no slot
         Logger.debug(f"Download {download_id} paused")
     
     async def resume_download(self, download_id: str):
@@ -119,31 +388,99 @@ class DownloadManager:
         download = self.downloads[download_id]
         download.status = DownloadStatus.DOWNLOADING
         await self.repository.update(download)
+        self._notify("status", download)
         Logger.debug(f"Download {download_id} resumed")
     
     async def cancel_download(self, download_id: str):
         """Cancel and remove a download."""
         Logger.info(f"Canceling download: {download_id}")
-        if download_id in self.workers:
-            worker = self.workers[download_id]
+        # Forget the download before any await, so its worker's last progress
+        # ticks and status are dropped instead of written or announced
+        download = self.downloads.pop(download_id, None)
+        self.progress_writer.discard(download_id)
+        self.queue_manager.remove(download_id)
+        self.scheduler.cancel_scheduled_download(download_id)
+        
+        worker = self.workers.pop(download_id, None)
+        if worker:
+            task = self._worker_tasks.get(download_id)
             await worker.stop()
-            del self.workers[download_id]
+            if task:
+                await asyncio.gather(task, return_exceptions=True)
             Logger.debug(f"Stopped worker for download {download_id}")
         
-        if download_id in self.downloads:
+        if download is not None:
             await self.repository.delete(download_id)
-            del self.downloads[download_id]
+            self._notify("removed", download)
             Logger.debug(f"Deleted download {download_id}")
+        self.queue_manager.dispatch()
+    
+    async def requeue_download(self, download_id: str):
+        """Stop a running download and put it back in its queue, keeping its progress."""
+        worker = self.workers.get(download_id)
+        if worker is None:
+            return
+        task = self._worker_tasks.get(download_id)
+        await worker.stop()
+        if task:
+            await asyncio.gather(task, return_exceptions=True)
+        
+        download = self.downloads[download_id]
+        download.status = DownloadStatus.QUEUED
+        download.speed = 0
+        self.queue_manager.add_to_queue(download, download.queue)
+        self.progress_writer.mark_dirty(download)
+        self._notify("status", download)
+    
+    async def set_download_priority(self, download_id: str, priority: int):
+        """Change a download's priority; queued downloads are re-ordered at once."""
+        download = self.downloads[download_id]
+        download.priority = priority
+        self.queue_manager.set_priority(download_id, priority)
+        self.progress_writer.mark_dirty(download)
+    
+    async def reorder_download(self, download_id: str, new_position: int):
+        """Move a queued download to a position in its queue's start order."""
+        download = self.downloads[download_id]
+        for changed in self.queue_manager.reorder_queue(download.queue, download_id, new_position):
+            self.progress_writer.mark_dirty(changed)
+    
+    async def move_download_between(self, download_id: str, before_id: Optional[str],
+                                    after_id: Optional[str]):
+        """Move a queued download between two adjacent ones, e.g. where a row was dropped."""
+        download = self.downloads[download_id]
+        for changed in self.queue_manager.move_between(download.queue, download_id, before_id, after_id):
+            self.progress_writer.mark_dirty(changed)
+    
+    async def move_download_to_queue(self, download_id: str, queue: str):
+        """Move a queued download to the end of another queue."""
+        download = self.downloads[download_id]
+        for changed in self.queue_manager.move_to_queue(download_id, download.queue, queue):
+            self.progress_writer.mark_dirty(changed)
     
     async def schedule_download(self, url: str, save_path: str, 
-                              schedule_time: datetime) -> Download:
-        """Schedule a download for later."""
-        Logger.info(f"Scheduling download: url={url}, save_path={save_path}, time={schedule_time}")
+                              schedule_time: Optional[datetime] = None,
+                              recurrence: Optional[str] = None) -> Download:
+        """Schedule a download for later, optionally repeating by a cron expression or RRULE-style interval.
+        
+        Without a schedule_time, a recurring download first runs at the rule's
+        next time. Raises ValueError for an invalid rule.
+        """
+        Logger.info(f"Scheduling download: url={url}, save_path={save_path}, "
+                    f"time={schedule_time}, recurrence={recurrence}")
+        if recurrence:
+            now = datetime.now()
+            next_time = parse_recurrence(recurrence).next_time(now, now)  # Also rejects rules that never fire
+            schedule_time = schedule_time or next_time
+        elif schedule_time is None:
+            raise ValueError("A schedule time or a recurrence rule is required")
+        
         download = Download(
             url=url,
             save_path=save_path,
             status=DownloadStatus.SCHEDULED,
             scheduled_time=schedule_time,
+            recurrence=recurrence or None,
             created_at=datetime.now()
         )
         
@@ -154,6 +491,7 @@ class DownloadManager:
         
         # Store in memory
         self.downloads[download_id] = download
+        self._notify("added", download)
         
         # Add to scheduler
         self.scheduler.schedule_download(download)
@@ -167,26 +505,22 @@ class DownloadManager:
             return
         
         download = self.downloads[download_id]
-        download.progress = progress["downloaded"] / progress["total"] * 100
+        if progress["total"]:
+            download.progress = progress["downloaded"] / progress["total"] * 100
         download.speed = progress["speed"]
         download.downloaded_size = progress["downloaded"]
-        download.total_size = progress["total"]
-        
-        # Update in database
-        await self.repository.update(download)
-        Logger.debug(f"Updated progress for download {download_id}: {download.progress:.1f}%")
+        download.total_size = progress["total"] or None
         
-        # Log event
-        await self.repository.add_event(
-            download_id,
-            "progress_update",
-            progress
-        )
+        # Written to the database by the next progress flush
+        self.progress_writer.mark_dirty(download)
+        self.progress_writer.record_event(download_id, "progress_update", progress)
+        self._notify("progress", download)
     
     async def load_downloads(self):
         """Load all downloads from database."""
         Logger.info("Loading downloads from database")
         downloads = await self.repository.get_all()
+        queued = []
         for download in downloads:
             self.downloads[download.id] = download
             
@@ -196,10 +530,14 @@ class DownloadManager:
                 Logger.debug(f"Resumed active download: {download.id}")
             # Add queued downloads back to queue
             elif download.status == DownloadStatus.QUEUED:
-                self.queue_manager.add_to_queue(download, download.queue)
-                Logger.debug(f"Re-queued download: {download.id}")
-            # Re-schedule scheduled downloads
-            elif download.status == DownloadStatus.SCHEDULED:
-                self.scheduler.schedule_download(download)
-                Logger.debug(f"Re-scheduled download: {download.id}")
+                queued.append(download)
+        
+        # Rows from before queue positions existed are queued oldest first
+        for download in sorted(queued, key=lambda d: (d.queue_position is None, d.created_at)):
+            self.queue_manager.add_to_queue(download, download.queue)
+        Logger.debug(f"Re-queued {len(queued)} downloads")
+        
+        # Scheduled downloads that came due while we were not running start now
+        await self.scheduler.load()
         Logger.info(f"Loaded {len(downloads)} downloads")
+        self.queue_manager.dispatch()
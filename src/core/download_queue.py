@@ -0,0 +1,217 @@
+from datetime import datetime
+from itertools import count
+from typing import Dict, Iterator, List, Optional
+import heapq
+from .host_limiter import host_of
+from ..models.download import Download
+
+POSITION_STEP = 1024  # Gap between queue positions, so moves rarely renumber
+COMPACT_MIN = 64  # Removed entries tolerated before the heap is rebuilt
+
+class DownloadQueue:
+    """Priority queue of downloads with O(log n) push, pop, update and remove.
+    
+    Downloads are ordered by priority (highest first), then queue_position,
+    then created_at. The heap holds [key, sequence, download] entries and an
+    id->entry map finds any download in O(1); removing or re-keying a
+    download blanks its old entry instead of searching the heap, and blank
+    entries are skipped by pop and dropped once they outnumber the live ones.
+    The same entries also sit in one small heap per host, so the head of
+    every host's downloads is found without walking past other hosts'.
+    """
+    
+    def __init__(self, downloads: Optional[List[Download]] = None):
+        self._heap: List[list] = []
+        self._host_heaps: Dict[str, List[list]] = {}  # Host -> heap of its entries
+        self._entries: Dict[str, list] = {}
+        self._removed = 0
+        self._last_position = 0
+        self._sequence = count()  # Tie-breaker, so entries never compare downloads
+        for download in downloads or []:
+            self.push(download)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, download_id: str) -> bool:
+        return download_id in self._entries
+    
+    def __iter__(self) -> Iterator[Download]:
+        """Iterate in queue order; O(n log n)."""
+        return iter(self.ordered())
+    
+    def get(self, download_id: str) -> Optional[Download]:
+        entry = self._entries.get(download_id)
+        return entry[2] if entry else None
+    
+    def next_position(self) -> int:
+        """Get a queue position after every download pushed so far."""
+        return self._last_position + POSITION_STEP
+    
+    def push(self, download: Download):
+        """Add a download, or re-key it if it is already queued."""
+        if download.id in self._entries:
+            self._discard(download.id)
+        if download.queue_position is None:
+            download.queue_position = self.next_position()
+        self._last_position = max(self._last_position, download.queue_position)
+        
+        entry = [_key(download), next(self._sequence), download]
+        self._entries[download.id] = entry
+        heapq.heappush(self._heap, entry)
+        heapq.heappush(self._host_heaps.setdefault(host_of(download.url), []), entry)
+    
+    def update(self, download: Download):
+        """Re-key a queued download after its priority or position changed."""
+        if download.id in self._entries:
+            self.push(download)
+    
+    def peek(self) -> Optional[Download]:
+        """Get the next download without removing it."""
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._removed -= 1
+        return heap[0][2] if heap else None
+    
+    def pop(self) -> Optional[Download]:
+        """Remove and return the next download."""
+        download = self.peek()
+        if download is not None:
+            heapq.heappop(self._heap)[2] = None  # Also blanks it in its host's heap
+            del self._entries[download.id]
+        return download
+    
+    def remove(self, download_id: str) -> Optional[Download]:
+        """Remove a download wherever it is in the queue."""
+        entry = self._entries.get(download_id)
+        if entry is None:
+            return None
+        download = entry[2]
+        self._discard(download_id)
+        return download
+    
+    def hosts(self) -> List[str]:
+        """Get the hosts that may have queued downloads."""
+        return list(self._host_heaps)
+    
+    def host_head(self, host: str) -> Optional[Download]:
+        """Get the next queued download for a host, in queue order."""
+        heap = self._host_heaps.get(host)
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)  # Counted in _removed until the main heap drops it
+        if not heap:
+            self._host_heaps.pop(host, None)
+            return None
+        return heap[0][2]
+    
+    def ordered(self, limit: Optional[int] = None) -> List[Download]:
+        """Get queued downloads in order; the first `limit` cost O(n log limit)."""
+        live = (entry for entry in self._heap if entry[2] is not None)
+        entries = sorted(live) if limit is None else heapq.nsmallest(limit, live)
+        return [entry[2] for entry in entries]
+    
+    def move(self, download_id: str, index: int) -> List[Download]:
+        """Move a download to an index in queue order.
+        
+        Finding the neighbours at an index costs O(n log index); callers that
+        already know them, like a table row being dropped, should use
+        move_between instead.
+        """
+        download = self.get(download_id)
+        if download is None:
+            return []
+        index = max(0, min(index, len(self) - 1))
+        if index == 0 and self.peek() is not download:
+            return self._place(download, None, self.peek())
+        
+        # Neighbours at the target index, ignoring the download being moved
+        live = (entry for entry in self._heap if entry[2] is not None and entry[2] is not download)
+        if index == len(self) - 1:
+            before = max(live)[2] if len(self) > 1 else None
+            after = None
+        else:
+            others = heapq.nsmallest(index + 1, live)
+            before = others[index - 1][2] if index > 0 else None
+            after = others[index][2]
+        return self._place(download, before, after)
+    
+    def move_between(self, download_id: str, before_id: Optional[str],
+                     after_id: Optional[str]) -> List[Download]:
+        """Move a download between two adjacent queued downloads in O(log n).
+        
+        Pass None for the missing neighbour when dropping at the front or back.
+        """
+        download = self.get(download_id)
+        if download is None:
+            return []
+        before = self.get(before_id) if before_id else None
+        after = self.get(after_id) if after_id else None
+        if before is None and after is None:
+            after = self.peek()
+        if after is download:
+            after = None
+        return self._place(download, before, after)
+    
+    def _place(self, download: Download, before: Optional[Download],
+               after: Optional[Download]) -> List[Download]:
+        """Re-key a download to sit between two neighbours, adopting their priority.
+        
+        Returns every download whose priority or position changed, which is
+        just the moved one unless the neighbours had no gap left and the
+        queue had to be renumbered.
+        """
+        if after is None and before is None:
+            return []
+        if before is not None and after is not None and _key(before) > _key(after):
+            before = None  # Not neighbours after all; keep the download ahead of `after`
+        if after is None:
+            priority, position = before.priority, before.queue_position + POSITION_STEP
+        elif before is None or before.priority != after.priority:
+            priority, position = after.priority, after.queue_position - POSITION_STEP
+        elif after.queue_position - before.queue_position > 1:
+            priority, position = after.priority, (before.queue_position + after.queue_position) // 2
+        else:
+            # No gap left between the neighbours: spread positions out and retry
+            changed = self._renumber()
+            self._place(download, before, after)
+            return changed
+        
+        download.priority = priority
+        download.queue_position = position
+        self.push(download)
+        return [download]
+    
+    def _renumber(self) -> List[Download]:
+        """Spread queue positions POSITION_STEP apart, keeping the order."""
+        downloads = self.ordered()
+        for number, download in enumerate(downloads, 1):
+            download.queue_position = number * POSITION_STEP
+        self._heap = [[_key(download), next(self._sequence), download]
+                      for download in downloads]  # Sorted, so already a heap
+        self._entries = {download.id: entry for download, entry in zip(downloads, self._heap)}
+        self._index_hosts()
+        self._removed = 0
+        self._last_position = len(downloads) * POSITION_STEP
+        return downloads
+    
+    def _discard(self, download_id: str):
+        self._entries.pop(download_id)[2] = None
+        self._removed += 1
+        if self._removed > COMPACT_MIN and self._removed > len(self._entries):
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+            self._index_hosts()
+            self._removed = 0
+    
+    def _index_hosts(self):
+        """Rebuild the per-host heaps from the live entries of the main heap."""
+        self._host_heaps = {}
+        for entry in self._heap:
+            if entry[2] is not None:
+                self._host_heaps.setdefault(host_of(entry[2].url), []).append(entry)
+        for heap in self._host_heaps.values():
+            heapq.heapify(heap)
+
+def _key(download: Download) -> tuple:
+    return (-download.priority, download.queue_position, download.created_at or datetime.min, download.id)
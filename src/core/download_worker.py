@@ -1,73 +1,96 @@
-from typing import Optional, Callable, Dict, Any
-import asyncio
+from typing import Optional, Callable, Dict, Any, List
 from datetime import datetime
 import os
-from pySmartDL import SmartDL
-from functools import partial
 import hashlib
 from ..models.download import Download, DownloadStatus
+from ..models.download_part import DownloadPart
+from ..repositories.download_repository import DownloadRepository
+from .segmented_downloader import SegmentedDownloader
+from .bandwidth_shaper import BandwidthShaper
+from .connection_pool import ConnectionPool
+from .host_limiter import HostLimiter
 from src.utils.logger import Logger
 
 class DownloadWorker:
-    def __init__(self, download: Download, settings: dict):
+    def __init__(self, download: Download, settings: dict,
+                 repository: Optional[DownloadRepository] = None,
+                 shaper: Optional[BandwidthShaper] = None,
+                 pool: Optional[ConnectionPool] = None,
+                 hosts: Optional[HostLimiter] = None,
+                 segments: Optional[int] = None):
         Logger.debug(f"Initializing DownloadWorker for download {download.id}")
         self.download = download
         self.settings = settings
-        self.obj: Optional[SmartDL] = None
+        self.repository = repository
+        self.shaper = shaper
+        self.pool = pool
+        self.hosts = hosts
+        self.engine: Optional[SegmentedDownloader] = None
         self.progress_callback: Optional[Callable] = None
-        self._stop_event = asyncio.Event()
-        self._paused = False
         
         # Get settings
-        self.chunk_size = settings["advanced_download"].get("chunk_count", 4)
+        self.chunk_size = segments or settings["advanced_download"].get("chunk_count", 4)
+        self.retry_limit = settings["advanced_download"].get("retry_limit", 5)
+        self.resume_capability = settings["advanced_download"].get("resume_capability", True)
         self.verify_hash = settings["integrity_checking"].get("hash_verification", True)
         self.hash_algo = settings["integrity_checking"].get("checksum_algorithm", "MD5")
         self.timeout = settings["advanced_download"].get("timeout_seconds", 30)
         
-        # Speed limit from settings
-        speed_limit = settings["speed_limiter"].get("max_speed", "500 KB/s")
-        try:
-            self.speed_limit = int(speed_limit.split()[0]) * 1024  # Convert KB/s to B/s
-        except (ValueError, IndexError):
-            self.speed_limit = 500 * 1024  # Default to 500 KB/s
-        
         Logger.debug(f"Worker initialized with settings: chunks={self.chunk_size}, "
                     f"verify_hash={self.verify_hash}, timeout={self.timeout}, "
-                    f"speed_limit={self.speed_limit}")
+                    f"speed_limit={download.speed_limit}")
     
     async def start(self, progress_callback: Optional[Callable] = None):
         """Start the download."""
         Logger.info(f"Starting download {self.download.id}: {self.download.url}")
         self.progress_callback = progress_callback
-        self._stop_event.clear()
-        self._paused = False
         
         try:
             # Create download directory if it doesn't exist
             os.makedirs(os.path.dirname(self.download.save_path), exist_ok=True)
             Logger.debug(f"Created directory: {os.path.dirname(self.download.save_path)}")
             
-            # Initialize SmartDL
-            self.obj = SmartDL(
+            parts = await self._load_parts()
+            # A new run of a recurring download only transfers a changed file
+            conditional = bool(self.download.recurrence) and not parts \
+                and os.path.exists(self.download.save_path)
+            
+            # Downloads run as coroutines on the shared event loop
+            self.engine = SegmentedDownloader(
                 self.download.url,
                 self.download.save_path,
-                progress_bar=False,  # We'll handle progress ourselves
-                fix_urls=True,
-                threads=self.chunk_size,
-                timeout=self.timeout
+                segments=self.chunk_size,
+                timeout=self.timeout,
+                retries=self.retry_limit,
+                throttle=self._throttle if self.shaper else None,
+                # Pooled sessions keep sockets alive between downloads
+                session=self.pool.session(self.download.url) if self.pool else None,
+                proxy=self.pool.proxy if self.pool else None,
+                hosts=self.hosts,
+                parts=parts,
+                etag=self.download.etag,
+                last_modified=self.download.last_modified,
+                conditional=conditional,
+                plan_callback=self._save_plan,
+                checkpoint_callback=self._checkpoint_parts
             )
+            # Speed limits are enforced by the shared shaper
+            if self.shaper and self.download.speed_limit:
+                self.shaper.set_download_rate(self.download.id, self.download.speed_limit)
+                Logger.debug(f"Speed limit set to {self.download.speed_limit} B/s")
             
-            # Set speed limit if enabled
-            if self.settings["speed_limiter"]["enabled"]:
-                self.obj.limit_speed = self.speed_limit
-                Logger.debug(f"Speed limit set to {self.speed_limit} B/s")
+            if not await self.engine.run(self.progress_callback):
+                Logger.debug(f"Download {self.download.id} stopped")
+                return
             
-            # Start download in thread pool
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._download_with_progress
-            )
+            if self.engine.not_modified:
+                size = os.path.getsize(self.download.save_path)
+                self.download.downloaded_size = self.download.total_size = size
+                self.download.progress = 100.0
+                self.download.status = DownloadStatus.COMPLETED
+                self.download.completed_at = datetime.now()
+                Logger.info(f"Download {self.download.id} is unchanged on the server, kept the existing file")
+                return
             
             # Verify hash if enabled
             if self.verify_hash and self.download.expected_hash:
@@ -87,68 +110,73 @@ class DownloadWorker:
             self.download.status = DownloadStatus.ERROR
             self.download.error = str(e)
             Logger.error(f"Download {self.download.id} failed: {str(e)}")
+        finally:
+            if self.shaper:
+                self.shaper.remove_download(self.download.id)
     
-    def _download_with_progress(self):
-        """Run the download with progress updates."""
-        Logger.debug(f"Starting download process for {self.download.id}")
-        self.obj.start(blocking=False)
-        
-        while not self.obj.isFinished():
-            if self._stop_event.is_set():
-                self.obj.pause()
-                Logger.debug(f"Download {self.download.id} stopped")
-                break
-            
-            if self._paused:
-                if not self.obj.isPaused():
-                    self.obj.pause()
-                    Logger.debug(f"Download {self.download.id} paused")
-                continue
-            elif self.obj.isPaused():
-                self.obj.unpause()
-                Logger.debug(f"Download {self.download.id} unpaused")
-            
-            if self.progress_callback:
-                progress = {
-                    "downloaded": self.obj.get_dl_size(),
-                    "total": self.obj.get_final_filesize(),
-                    "speed": self.obj.get_speed(),
-                    "eta": self.obj.get_eta()
-                }
-                Logger.debug(f"Download {self.download.id} progress: "
-                           f"{progress['downloaded']}/{progress['total']} bytes, "
-                           f"speed: {progress['speed']} B/s")
-                asyncio.run_coroutine_threadsafe(
-                    self.progress_callback(progress),
-                    asyncio.get_event_loop()
-                )
-            
-            # Sleep briefly to avoid high CPU usage
-            asyncio.get_event_loop().run_until_complete(asyncio.sleep(0.1))
+    @property
+    def not_modified(self) -> bool:
+        """Whether the run was skipped because the remote file is unchanged."""
+        return self.engine is not None and self.engine.not_modified
+    
+    async def _throttle(self, size: int):
+        """Charge transferred bytes to the shared bandwidth shaper."""
+        await self.shaper.consume(self.download.id, self.download.queue, size)
+    
+    async def _load_parts(self) -> List[DownloadPart]:
+        """Load checkpointed parts from a previous run, if resuming is enabled."""
+        if not self.resume_capability or not self.repository or not self.download.id:
+            return []
+        try:
+            parts = await self.repository.get_parts(self.download.id)
+        except Exception as e:
+            Logger.warning(f"Could not load parts for download {self.download.id}: {str(e)}")
+            return []
+        if parts and not os.path.exists(self.download.save_path):
+            Logger.debug(f"Partial file missing for download {self.download.id}")
+            return []
+        return parts
+    
+    async def _save_plan(self, parts: List[DownloadPart]):
+        """Record the segment layout so splits survive a restart."""
+        # The plan is first saved right after probing, so validators are known
+        self.download.etag = self.engine.etag
+        self.download.last_modified = self.engine.last_modified
+        if not self.repository or not self.download.id:
+            return
+        try:
+            await self.repository.save_parts(self.download.id, parts)
+        except Exception as e:
+            Logger.warning(f"Could not save parts for download {self.download.id}: {str(e)}")
+    
+    async def _checkpoint_parts(self, parts: List[DownloadPart]):
+        """Persist per-part offsets so a crash loses seconds, not the file."""
+        if not self.repository or not self.download.id:
+            return
+        try:
+            await self.repository.checkpoint_parts(self.download.id, parts)
+        except Exception as e:
+            Logger.warning(f"Could not checkpoint download {self.download.id}: {str(e)}")
     
     async def pause(self):
         """Pause the download."""
         Logger.info(f"Pausing download {self.download.id}")
-        self._paused = True
+        if self.engine:
+            self.engine.pause()
         self.download.status = DownloadStatus.PAUSED
     
     async def resume(self):
         """Resume the download."""
         Logger.info(f"Resuming download {self.download.id}")
-        self._paused = False
+        if self.engine:
+            self.engine.resume()
         self.download.status = DownloadStatus.DOWNLOADING
     
     async def stop(self):
         """Stop the download."""
         Logger.info(f"Stopping download {self.download.id}")
-        self._stop_event.set()
-        if self.obj:
-            # Run stop in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self.obj.stop
-            )
+        if self.engine:
+            self.engine.stop()
     
     async def _verify_hash(self) -> bool:
         """Verify the downloaded file's hash."""
@@ -176,7 +204,7 @@ class DownloadWorker:
     
     def get_status(self) -> Dict[str, Any]:
         """Get current download status."""
-        if not self.obj:
+        if not self.engine:
             return {
                 "status": self.download.status,
                 "progress": 0,
@@ -186,9 +214,9 @@ class DownloadWorker:
         
         status = {
             "status": self.download.status,
-            "progress": self.obj.get_progress() * 100,
-            "speed": self.obj.get_speed(),
-            "eta": self.obj.get_eta()
+            "progress": self.engine.progress * 100,
+            "speed": self.engine.speed,
+            "eta": self.engine.eta
         }
         Logger.debug(f"Download {self.download.id} status: {status}")
         return status
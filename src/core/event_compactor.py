@@ -0,0 +1,71 @@
+from typing import Optional
+from datetime import datetime, timedelta
+import asyncio
+from ..repositories.download_repository import DownloadRepository
+from src.utils.logger import Logger
+
+class EventCompactor:
+    """Background job that keeps download_events small.
+    
+    Raw progress events older than RAW_AGE are folded into one
+    `progress_minute` summary per download and minute, and every event older
+    than the history window is deleted. Work is done in batches of BATCH_SIZE
+    rows, each in its own short transaction with a pause in between, so the
+    writer connection is never held for long.
+    """
+    
+    INTERVAL = 600  # Seconds between runs
+    START_DELAY = 30  # Let startup settle before the first run
+    RAW_AGE = timedelta(hours=1)  # Keep full-resolution progress this long
+    BATCH_SIZE = 500
+    BATCH_PAUSE = 0.05
+    
+    def __init__(self, repository: DownloadRepository, history_days: int = 30):
+        self.repository = repository
+        self.history_days = history_days
+        self._task: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Run the job periodically on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Cancel the job, abandoning at most one batch."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def run_once(self):
+        """Compact and expire everything that is due."""
+        now = datetime.now()
+        compacted = await self._drain(self.repository.compact_progress_events, now - self.RAW_AGE)
+        expired = 0
+        if self.history_days > 0:
+            expired = await self._drain(self.repository.delete_events_before,
+                                        now - timedelta(days=self.history_days))
+        if compacted or expired:
+            Logger.info(f"Event compaction: {compacted} progress events summarized, "
+                       f"{expired} expired events deleted")
+    
+    async def _drain(self, step, before: datetime) -> int:
+        total = 0
+        while True:
+            count = await step(before, self.BATCH_SIZE)
+            total += count
+            if count < self.BATCH_SIZE:
+                return total
+            await asyncio.sleep(self.BATCH_PAUSE)
+    
+    async def _run(self):
+        await asyncio.sleep(self.START_DELAY)
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                Logger.error(f"Event compaction failed: {str(e)}")
+            await asyncio.sleep(self.INTERVAL)
@@ -0,0 +1,179 @@
+from typing import Dict, Iterable, Optional, Tuple
+from collections import Counter
+from contextlib import asynccontextmanager
+from itertools import count
+from urllib.parse import urlsplit
+import asyncio
+import ipaddress
+import time
+from src.utils.logger import Logger
+
+# Second-level labels under which country-code TLDs register names, e.g. example.co.uk
+SECOND_LEVEL_LABELS = {"ac", "co", "com", "edu", "gov", "ltd", "net", "nic", "org", "plc", "sch"}
+
+def host_of(url: str) -> str:
+    """Get the lowercased host name of a URL."""
+    return (urlsplit(url).hostname or "").lower()
+
+def registered_domain(host: str) -> str:
+    """Get the domain a host name was registered under, e.g. cdn.example.co.uk -> example.co.uk.
+    
+    Uses the common second-level labels instead of the full public suffix
+    list, which is close enough to group mirrors and CDN shards of one site.
+    """
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.rstrip(".").split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in SECOND_LEVEL_LABELS:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+class HostLimiter:
+    """Politeness state shared by the dispatcher and every download worker.
+    
+    Caps how many downloads and connections run against one host and one
+    registered domain (0 means no cap), remembers which host was given a
+    download slot last so the dispatcher can rotate between hosts, and keeps
+    one backoff per host: when any connection is refused with 429/503 or a
+    transient error, every connection to that host waits it out before its
+    next request instead of each retrying on its own schedule.
+    """
+    
+    BACKOFF_BASE = 1.0
+    BACKOFF_MAX = 60.0
+    
+    def __init__(self, connections_per_host: int = 8, connections_per_domain: int = 0,
+                 downloads_per_host: int = 0, downloads_per_domain: int = 0):
+        self.connections_per_host = connections_per_host
+        self.connections_per_domain = connections_per_domain
+        self.downloads_per_host = downloads_per_host
+        self.downloads_per_domain = downloads_per_domain
+        self.on_available = None  # Called when a host's backoff ends
+        self._connections: Counter = Counter()  # ("host" | "domain", name) -> open connections
+        self._changed: Optional[asyncio.Condition] = None
+        self._wake_task: Optional[asyncio.Task] = None
+        self._failures: Dict[str, int] = {}
+        self._blocked_until: Dict[str, float] = {}  # Host -> monotonic time its backoff ends
+        self._started: Dict[str, int] = {}  # Host -> when it last got a download slot
+        self._clock = count(1)
+    
+    @classmethod
+    def from_settings(cls, settings: dict) -> 'HostLimiter':
+        """Create a limiter from the connection settings category."""
+        limiter = cls()
+        limiter.configure(settings)
+        return limiter
+    
+    def configure(self, settings: dict):
+        """Apply the connection settings' per-host and per-domain caps."""
+        connection = settings["connection"]
+        self.connections_per_host = connection.get("max_simultaneous_connections", 8)
+        self.connections_per_domain = connection.get("max_connections_per_domain", 0)
+        self.downloads_per_host = connection.get("max_downloads_per_host", 0)
+        self.downloads_per_domain = connection.get("max_downloads_per_domain", 0)
+        if self._changed is not None:
+            # Connections waiting on the old caps may fit under the new ones
+            self._wake_task = asyncio.get_running_loop().create_task(self._wake_waiters())
+    
+    async def _wake_waiters(self):
+        async with self._changed:
+            self._changed.notify_all()
+    
+    def keys(self, url: str) -> Tuple[str, str]:
+        """Get the (host, registered domain) a URL is limited under."""
+        host = host_of(url)
+        return host, registered_domain(host)
+    
+    def download_counts(self, urls: Iterable[str]) -> Tuple[Counter, Counter]:
+        """Count running downloads per host and per registered domain."""
+        hosts, domains = Counter(), Counter()
+        for url in urls:
+            host, domain = self.keys(url)
+            hosts[host] += 1
+            domains[domain] += 1
+        return hosts, domains
+    
+    def can_start(self, url: str, hosts: Counter, domains: Counter) -> bool:
+        """Check whether another download may start against a URL's host now."""
+        host, domain = self.keys(url)
+        if self.downloads_per_host and hosts[host] >= self.downloads_per_host:
+            return False
+        if self.downloads_per_domain and domains[domain] >= self.downloads_per_domain:
+            return False
+        return self.backoff_remaining(host) <= 0
+    
+    def started(self, url: str):
+        """Record that a download slot went to a URL's host."""
+        self._started[host_of(url)] = next(self._clock)
+    
+    def last_started(self, url: str) -> int:
+        """Get when a URL's host last got a download slot; 0 if never."""
+        return self._started.get(host_of(url), 0)
+    
+    @asynccontextmanager
+    async def connection(self, url: str):
+        """Hold one connection to a URL's host, after its backoff and within its caps."""
+        host, domain = self.keys(url)
+        while (delay := self.backoff_remaining(host)) > 0:
+            await asyncio.sleep(delay)
+        
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._has_connection(host, domain))
+            self._connections["host", host] += 1
+            self._connections["domain", domain] += 1
+        try:
+            yield
+        finally:
+            async with self._changed:
+                self._connections["host", host] -= 1
+                self._connections["domain", domain] -= 1
+                self._changed.notify_all()
+    
+    def _has_connection(self, host: str, domain: str) -> bool:
+        if self.connections_per_host and self._connections["host", host] >= self.connections_per_host:
+            return False
+        if self.connections_per_domain and self._connections["domain", domain] >= self.connections_per_domain:
+            return False
+        return True
+    
+    def backoff_remaining(self, host: str) -> float:
+        """Get the seconds left before requests to a host may resume."""
+        until = self._blocked_until.get(host)
+        return until - time.monotonic() if until else 0.0
+    
+    def failure(self, url: str, retry_after: Optional[float] = None) -> float:
+        """Back a URL's host off after a refused or failed request. Returns the delay.
+        
+        Connections failing together while the host is already backing off
+        do not stretch the delay further, so one burst counts as one failure.
+        """
+        host = host_of(url)
+        remaining = self.backoff_remaining(host)
+        if remaining > 0 and (retry_after is None or retry_after <= remaining):
+            return remaining
+        
+        failures = self._failures.get(host, 0) + 1
+        self._failures[host] = failures
+        delay = retry_after if retry_after is not None else \
+            min(self.BACKOFF_BASE * 2 ** (failures - 1), self.BACKOFF_MAX)
+        self._blocked_until[host] = time.monotonic() + delay
+        Logger.warning(f"Backing off {host} for {delay:.1f}s after {failures} failure(s)")
+        
+        if self.on_available:
+            asyncio.get_running_loop().call_later(delay, self._backoff_ended, host)
+        return delay
+    
+    def success(self, url: str):
+        """Clear a URL's host backoff after a successful response."""
+        host = host_of(url)
+        if self._failures.pop(host, None) is not None:
+            self._blocked_until.pop(host, None)
+    
+    def _backoff_ended(self, host: str):
+        if self.backoff_remaining(host) <= 0 and self.on_available:
+            self.on_available()
@@ -0,0 +1,149 @@
+from typing import Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from urllib.parse import urlsplit, unquote
+import asyncio
+import mimetypes
+import os
+import re
+import time
+import aiohttp
+from .connection_pool import ConnectionPool
+from src.utils.logger import Logger
+
+@dataclass
+class ProbeResult:
+    url: str
+    final_url: str  # After following redirects
+    file_name: str
+    total_size: Optional[int]  # None when the server does not say
+    mime_type: str
+    accept_ranges: bool
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class MetadataProbe:
+    """Fetch a URL's file metadata in a single round trip.
+    
+    A HEAD request is tried first. Servers that reject HEAD or omit the size
+    get a `Range: bytes=0-0` GET instead, which costs one byte of body.
+    Results are cached per URL for `ttl` seconds, and at most `cache_size`
+    of them are kept.
+    """
+    
+    CACHE_TTL = 300
+    CACHE_SIZE = 512
+    CONTENT_RANGE = re.compile(r"bytes\s+\d+-\d+/(\d+)")
+    
+    def __init__(self, pool: Optional[ConnectionPool] = None, timeout: int = 30,
+                 ttl: float = CACHE_TTL, cache_size: int = CACHE_SIZE):
+        self.pool = pool
+        self.timeout = timeout
+        self.ttl = ttl
+        self.cache_size = cache_size
+        # URL -> (expiry, result), oldest first, which is also the order they expire in
+        self._cache: OrderedDict[str, Tuple[float, ProbeResult]] = OrderedDict()
+    
+    async def probe(self, url: str, use_cache: bool = True) -> ProbeResult:
+        """Get metadata for a URL, from the cache when it is fresh."""
+        cached = self._cache.get(url)
+        if use_cache and cached and cached[0] > time.monotonic():
+            Logger.debug(f"Probe cache hit for {url}")
+            return cached[1]
+        
+        own_session = self.pool is None
+        session = self.pool.session(url) if self.pool else aiohttp.ClientSession()
+        try:
+            result = await self._head(session, url)
+            if result is None or result.total_size is None:
+                result = await self._range_get(session, url) or result
+        finally:
+            if own_session:
+                await session.close()
+        
+        if result is None:
+            raise aiohttp.ClientError(f"Could not probe {url}")
+        self._remember(url, result)
+        Logger.debug(f"Probed {url}: {result}")
+        return result
+    
+    def _remember(self, url: str, result: ProbeResult):
+        """Cache a result, dropping expired entries and the oldest ones beyond cache_size."""
+        now = time.monotonic()
+        self._cache.pop(url, None)
+        self._cache[url] = (now + self.ttl, result)
+        while self._cache:
+            expires, _ = next(iter(self._cache.values()))
+            if expires > now and len(self._cache) <= self.cache_size:
+                break
+            self._cache.popitem(last=False)
+    
+    def invalidate(self, url: Optional[str] = None):
+        """Drop one cached URL, or the whole cache."""
+        if url is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(url, None)
+    
+    async def _head(self, session: aiohttp.ClientSession, url: str) -> Optional[ProbeResult]:
+        try:
+            async with session.head(url, allow_redirects=True, proxy=self._proxy,
+                                    timeout=self._client_timeout()) as response:
+                if response.status >= 400:
+                    Logger.debug(f"HEAD {url} returned HTTP {response.status}")
+                    return None
+                length = response.headers.get("Content-Length")
+                return self._result(url, response, int(length) if length else None,
+                                    response.headers.get("Accept-Ranges", "").lower() == "bytes")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            Logger.debug(f"HEAD {url} failed: {str(e)}")
+            return None
+    
+    async def _range_get(self, session: aiohttp.ClientSession, url: str) -> Optional[ProbeResult]:
+        headers = {"Range": "bytes=0-0"}
+        async with session.get(url, headers=headers, proxy=self._proxy,
+                               timeout=self._client_timeout()) as response:
+            if response.status == 206:
+                match = self.CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                # Read the single byte so the connection can go back to the pool
+                await response.read()
+                return self._result(url, response, int(match.group(1)) if match else None, True)
+            if response.status == 200:
+                length = response.headers.get("Content-Length")
+                return self._result(url, response, int(length) if length else None, False)
+            raise aiohttp.ClientResponseError(
+                response.request_info, response.history,
+                status=response.status, message=response.reason or ""
+            )
+    
+    def _result(self, url: str, response: aiohttp.ClientResponse,
+                total_size: Optional[int], accept_ranges: bool) -> ProbeResult:
+        final_url = str(response.url)
+        file_name = self._file_name(response, final_url)
+        mime_type = response.content_type
+        if not mime_type or mime_type == "application/octet-stream":
+            mime_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+        return ProbeResult(
+            url=url,
+            final_url=final_url,
+            file_name=file_name,
+            total_size=total_size,
+            mime_type=mime_type,
+            accept_ranges=accept_ranges,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified")
+        )
+    
+    def _file_name(self, response: aiohttp.ClientResponse, final_url: str) -> str:
+        """Prefer the Content-Disposition filename, then the URL path."""
+        disposition = response.content_disposition
+        if disposition and disposition.filename:
+            return os.path.basename(disposition.filename)
+        return os.path.basename(unquote(urlsplit(final_url).path)) or "unnamed_file"
+    
+    @property
+    def _proxy(self) -> Optional[str]:
+        return self.pool.proxy if self.pool else None
+    
+    def _client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(total=self.timeout)
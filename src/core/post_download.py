@@ -0,0 +1,58 @@
+from typing import Dict, List, Optional
+import asyncio
+import subprocess
+import sys
+from src.utils.logger import Logger
+
+# Commands for the scheduler's post_download_action choices, per platform
+POST_DOWNLOAD_COMMANDS: Dict[str, Dict[str, List[str]]] = {
+    "linux": {
+        "shutdown": ["systemctl", "poweroff"],
+        "sleep": ["systemctl", "suspend"],
+        "hibernate": ["systemctl", "hibernate"],
+        "disconnect internet": ["nmcli", "networking", "off"]
+    },
+    "win32": {
+        "shutdown": ["shutdown", "/s", "/t", "60"],
+        "sleep": ["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"],
+        "hibernate": ["shutdown", "/h"],
+        "disconnect internet": ["ipconfig", "/release"]
+    },
+    "darwin": {
+        "shutdown": ["osascript", "-e", 'tell app "System Events" to shut down'],
+        "sleep": ["pmset", "sleepnow"],
+        "hibernate": ["pmset", "sleepnow"],
+        "disconnect internet": ["networksetup", "-setairportpower", "en0", "off"]
+    }
+}
+
+def post_download_command(action: str) -> Optional[List[str]]:
+    """Get the command for an action on this platform, or None for "none" and unknown actions."""
+    platform = "linux" if sys.platform.startswith("linux") else sys.platform
+    return POST_DOWNLOAD_COMMANDS.get(platform, {}).get(action.lower())
+
+async def run_post_download_action(action: str) -> bool:
+    """Run a queue's post-download action. Returns True if its command succeeded."""
+    command = post_download_command(action)
+    if command is None:
+        if action.lower() != "none":
+            Logger.warning(f"Post-download action {action!r} is not supported on {sys.platform}")
+        return False
+    
+    Logger.info(f"Running post-download action {action!r}: {' '.join(command)}")
+    # Run in a thread rather than with create_subprocess_exec, which the
+    # selector-based Qt event loop does not support on Windows
+    try:
+        process = await asyncio.get_running_loop().run_in_executor(None, lambda: subprocess.run(
+            command,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        ))
+    except OSError as e:
+        Logger.error(f"Post-download action {action!r} failed: {str(e)}")
+        return False
+    if process.returncode != 0:
+        Logger.error(f"Post-download action {action!r} exited with {process.returncode}: "
+                     f"{process.stderr.decode(errors='replace').strip()}")
+        return False
+    return True
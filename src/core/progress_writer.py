@@ -0,0 +1,86 @@
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import asyncio
+from ..models.download import Download
+from ..repositories.download_repository import DownloadRepository
+from src.utils.logger import Logger
+
+class ProgressWriter:
+    """Write-behind buffer for download progress.
+    
+    Progress ticks only mark a download dirty and keep its latest progress
+    event. Every `interval` seconds the dirty downloads and pending events are
+    written in one transaction, so the database sees one write per download
+    per interval instead of one per tick. Call flush() on pause, completion
+    and shutdown to make the latest state durable straight away.
+    """
+    
+    def __init__(self, repository: DownloadRepository, interval: float = 1.0):
+        self.repository = repository
+        self.interval = interval
+        self._dirty: Dict[str, Download] = {}
+        self._progress_events: Dict[str, Tuple[str, str, Optional[Dict[str, Any]], datetime]] = {}
+        self._events: List[Tuple[str, str, Optional[Dict[str, Any]], datetime]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+    
+    def mark_dirty(self, download: Download):
+        """Queue a download's current state for the next flush."""
+        self._dirty[download.id] = download
+    
+    def record_event(self, download_id: str, event_type: str,
+                     event_data: Optional[Dict[str, Any]] = None):
+        """Queue an event. Only the latest progress update per download is kept."""
+        event = (download_id, event_type, event_data, datetime.now())
+        if event_type == "progress_update":
+            self._progress_events[download_id] = event
+        else:
+            self._events.append(event)
+    
+    def discard(self, download_id: str):
+        """Drop pending writes for a download that is being deleted."""
+        self._dirty.pop(download_id, None)
+        self._progress_events.pop(download_id, None)
+        self._events = [event for event in self._events if event[0] != download_id]
+    
+    async def flush(self):
+        """Write everything pending in a single transaction."""
+        async with self._lock:
+            if not self._dirty and not self._progress_events and not self._events:
+                return
+            downloads = list(self._dirty.values())
+            events = self._events + list(self._progress_events.values())
+            self._dirty = {}
+            self._progress_events = {}
+            self._events = []
+            try:
+                await self.repository.save_progress(downloads, events)
+            except Exception as e:
+                Logger.error(f"Failed to flush progress: {str(e)}")
+                # Keep the newest state for the next attempt
+                for download in downloads:
+                    self._dirty.setdefault(download.id, download)
+                self._events = events + self._events
+                return
+            Logger.debug(f"Flushed {len(downloads)} downloads and {len(events)} events")
+    
+    def start(self):
+        """Start the periodic flush on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the periodic flush and write what is left."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+    
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
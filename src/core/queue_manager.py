@@ -1,87 +1,308 @@
-from typing import Dict, List, Optional
-from collections import defaultdict
-from ..models.download import Download
+from typing import Dict, List, Optional, Set
+from collections import Counter, defaultdict
+from datetime import datetime, time
+import asyncio
+from .download_queue import DownloadQueue
+from .bandwidth_profiles import BandwidthWindow, next_boundary
+from .post_download import run_post_download_action
+from ..models.download import Download, DownloadStatus
+from src.utils.logger import Logger
+
+def queue_window(queue_settings: dict) -> Optional[BandwidthWindow]:
+    """Get the daily window a queue may start downloads in, or None if it is always open."""
+    start = time.fromisoformat(queue_settings.get("start_time") or "00:00")
+    stop = time.fromisoformat(queue_settings.get("stop_time") or "00:00")
+    if stop == time(23, 59):
+        stop = time(0, 0)  # "Until 23:59" means until midnight
+    if start == stop:
+        return None
+    return BandwidthWindow(start=start, end=stop, rate=0)
 
 class QueueManager:
+    """Waiting downloads per queue, and the dispatcher that starts them.
+    
+    Each queue has a concurrency limit, a daily window in which it may start
+    downloads and an action to run once it drains. Dispatching is purely
+    event driven: the manager calls dispatch() when a slot may have freed,
+    and a single timer fires at the next window boundary. Within a queue,
+    slots go round-robin to the hosts of its highest waiting priority that
+    are under their per-host and per-domain caps and not backing off.
+    """
+    
+    MAX_SLEEP = 3600  # Re-check hourly in case the wall clock jumps
+    
     def __init__(self, download_manager):
         self.download_manager = download_manager
-        self.queues = defaultdict(list)  # Queue name -> List[Download]
+        self.queues: Dict[str, DownloadQueue] = defaultdict(DownloadQueue)  # Queue name -> waiting downloads
+        self.settings: Dict[str, dict] = {}  # Queue name -> QueueSettings values
+        self.windows: Dict[str, Optional[BandwidthWindow]] = {}
+        self._completed: Set[str] = set()  # Queues with completions since they last drained
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._dispatch_task: Optional[asyncio.Task] = None
+        self._dispatch_again = False
+    
+    def configure(self, queues: dict):
+        """Apply the scheduler's queue settings and re-check what may run."""
+        self.settings = {name: dict(queue_settings) for name, queue_settings in queues.items()}
+        self.windows = {name: queue_window(queue_settings) for name, queue_settings in self.settings.items()}
+        if self._loop:
+            self._arm_window_timer()
+            self.dispatch()
+    
+    def start(self):
+        """Begin dispatching on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._arm_window_timer()
+        self.dispatch()
+    
+    def stop(self):
+        """Stop dispatching; running downloads are left alone."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if self._dispatch_task:
+            self._dispatch_task.cancel()
+            self._dispatch_task = None
+        self._loop = None
     
     def add_to_queue(self, download: Download, queue_name: str = "regular"):
         """Add a download to a specific queue."""
-        self.queues[queue_name].append(download)
+        download.queue = queue_name
+        self.queues[queue_name].push(download)
     
-    async def process_queue(self):
-        """Process downloads in queues based on priority."""
-        # First try high priority queue
-        if await self._process_queue_items("high_priority"):
-            return
-        
-        # Then try regular queue
-        await self._process_queue_items("regular")
+    def next_position(self, queue_name: str) -> int:
+        """Get the position a download added to a queue now would take."""
+        return self.queues[queue_name].next_position()
     
-    async def _process_queue_items(self, queue_name: str) -> bool:
-        """Process items in a specific queue. Returns True if started a download."""
-        queue = self.queues.get(queue_name, [])
-        if not queue:
-            return False
+    def remove(self, download_id: str) -> Optional[Download]:
+        """Take a download out of whichever queue holds it."""
+        for queue in self.queues.values():
+            download = queue.remove(download_id)
+            if download is not None:
+                return download
+        return None
+    
+    def dispatch(self):
+        """Start queued downloads that may run now, on the next loop iteration.
         
-        # Check if we can start more downloads
-        active_count = len(self.download_manager.active_downloads)
-        if active_count >= self.download_manager.max_concurrent:
-            return False
+        Called whenever a slot may have freed up or work was added: a download
+        completing, failing, pausing or being cancelled, new downloads, changed
+        settings and queue window boundaries. Calls made while a pass is
+        running are folded into one more pass, and nothing runs in between.
+        """
+        if self._loop is None:
+            return
+        if self._dispatch_task and not self._dispatch_task.done():
+            self._dispatch_again = True
+            return
+        self._dispatch_task = self._loop.create_task(self._dispatch())
+    
+    async def _dispatch(self):
+        try:
+            while True:
+                self._dispatch_again = False
+                await self.process_queue()
+                await self._run_post_download_actions()
+                if not self._dispatch_again:
+                    return
+        except Exception as e:
+            Logger.error(f"Queue dispatch failed: {str(e)}")
+    
+    async def process_queue(self):
+        """Start the next downloads while global, per-queue and per-host slots are free."""
+        now = datetime.now()
+        running = self.running_downloads()
+        active = Counter(download.queue for download in running)
+        limiter = self.download_manager.host_limiter
+        hosts, domains = limiter.download_counts(download.url for download in running)
+        while sum(active.values()) < self.download_manager.max_concurrent:
+            download = self._next_download(now, active, hosts, domains)
+            if download is None:
+                return
+            self.queues[download.queue].remove(download.id)
+            await self.download_manager.start_download(download.id)
+            if download.id not in self.download_manager.workers:
+                return  # The manager refused it and queued it again
+            # Only a confirmed start counts as the host's turn
+            limiter.started(download.url)
+            active[download.queue] += 1
+            host, domain = limiter.keys(download.url)
+            hosts[host] += 1
+            domains[domain] += 1
+    
+    def _next_download(self, now: datetime, active: Counter, hosts: Counter,
+                       domains: Counter) -> Optional[Download]:
+        """Pick the next download of the first queue, in priority order, that may start one now."""
+        for queue_name in self._queue_order():
+            queue = self.queues.get(queue_name)
+            if not queue or not self.is_open(queue_name, now):
+                continue
+            limit = self.settings.get(queue_name, {}).get("limit_active_downloads", 0)
+            if limit and active[queue_name] >= limit:
+                continue
+            download = self._pick(queue, hosts, domains)
+            if download is not None:
+                return download
+        return None
+    
+    def _pick(self, queue: DownloadQueue, hosts: Counter, domains: Counter) -> Optional[Download]:
+        """Pick the download whose host is least busy and waited longest.
         
-        # Get next download from queue
-        download = queue[0]
-        queue.pop(0)
+        Only the head of each host's own sub-queue is looked at, so however
+        many downloads of a capped host wait in front, other hosts still get
+        their turn and the queue order holds within every host. Among hosts
+        that may start one, the highest priority head wins, then the least
+        busy host, then the one served longest ago.
+        """
+        limiter = self.download_manager.host_limiter
+        best, best_rank = None, None
+        for host in queue.hosts():
+            download = queue.host_head(host)
+            if download is None or not limiter.can_start(download.url, hosts, domains):
+                continue
+            rank = (-download.priority, hosts[host], limiter.last_started(download.url),
+                    download.queue_position or 0)
+            if best_rank is None or rank < best_rank:
+                best, best_rank = download, rank
+        return best
+    
+    def _queue_order(self) -> List[str]:
+        # Configured queues first, high priority before regular, then any others
+        names = sorted(self.settings, key=lambda name: name != "high_priority")
+        return names + [name for name in self.queues if name not in self.settings]
+    
+    def running_downloads(self) -> List[Download]:
+        """Get the downloads that are actually transferring; paused ones hold no slot."""
+        downloads = self.download_manager.downloads
+        return [
+            downloads[download_id] for download_id in self.download_manager.workers
+            if download_id in downloads and downloads[download_id].status == DownloadStatus.DOWNLOADING
+        ]
+    
+    def active_counts(self) -> Counter:
+        """Count running downloads per queue."""
+        return Counter(download.queue for download in self.running_downloads())
+    
+    def is_open(self, queue_name: str, moment: datetime) -> bool:
+        """Check whether a queue may start downloads at a moment."""
+        window = self.windows.get(queue_name)
+        return window is None or window.contains(moment)
+    
+    def download_finished(self, download: Download):
+        """Note a finished download and refill its slot."""
+        if download.status == DownloadStatus.COMPLETED:
+            self._completed.add(download.queue)
+        self.dispatch()
+    
+    async def _run_post_download_actions(self):
+        """Run the action of every queue that completed downloads and has now drained."""
+        # A paused download still has its worker and will finish later, so it keeps the queue open
+        downloads = self.download_manager.downloads
+        unfinished = Counter(downloads[download_id].queue for download_id in self.download_manager.workers
+                             if download_id in downloads)
+        for queue_name in list(self._completed):
+            if self.queues.get(queue_name) or unfinished[queue_name]:
+                continue
+            self._completed.discard(queue_name)
+            queue_settings = self.settings.get(queue_name, {})
+            action = queue_settings.get("post_download_action", "none")
+            if not action or action.lower() == "none":
+                continue
+            if not queue_settings.get("post_download_action_confirmed"):
+                Logger.warning(f"Queue {queue_name} finished; skipping {action}, "
+                               f"which was not chosen in the scheduler settings")
+                continue
+            Logger.info(f"Queue {queue_name} finished, running {action}")
+            await run_post_download_action(action)
+    
+    def _arm_window_timer(self):
+        """Wake up at the next queue window boundary."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        windows = [window for window in self.windows.values() if window is not None]
+        now = datetime.now()
+        boundary = next_boundary(windows, now)
+        if self._loop and boundary:
+            delay = min((boundary - now).total_seconds(), self.MAX_SLEEP)
+            self._timer = self._loop.call_later(delay, self._on_window_boundary)
+            Logger.debug(f"Next queue window boundary at {boundary}")
+    
+    def _on_window_boundary(self):
+        self._timer = None
+        self._loop.create_task(self._close_windows())
+        self._arm_window_timer()
+    
+    async def _close_windows(self):
+        """Send running downloads of queues whose window closed back to their queue, then refill.
         
-        # Start the download
-        await self.download_manager.start_download(download.id)
-        return True
+        Paused downloads are left alone so a manual pause outlives the window.
+        """
+        now = datetime.now()
+        downloads = self.download_manager.downloads
+        for download_id in list(self.download_manager.workers):
+            download = downloads.get(download_id)
+            if download and download.status == DownloadStatus.DOWNLOADING and not self.is_open(download.queue, now):
+                Logger.info(f"Queue {download.queue} window closed, requeueing download {download_id}")
+                await self.download_manager.requeue_download(download_id)
+        self.dispatch()
     
     def get_queue_status(self, queue_name: str) -> dict:
         """Get status information about a queue."""
-        queue = self.queues.get(queue_name, [])
+        queue = self.queues.get(queue_name)
+        downloads = self.download_manager.downloads
+        waiting = len(queue) if queue else 0
+        active = sum(1 for download_id in self.download_manager.workers
+                     if download_id in downloads and downloads[download_id].queue == queue_name)
         return {
             "name": queue_name,
-            "count": len(queue),
-            "active": sum(1 for d in queue if d.status == "downloading"),
-            "waiting": sum(1 for d in queue if d.status == "queued")
+            "count": waiting + active,
+            "active": active,
+            "waiting": waiting
         }
     
-    def reorder_queue(self, queue_name: str, download_id: str, new_position: int):
-        """Move a download to a new position in its queue."""
-        queue = self.queues.get(queue_name, [])
+    def get_queue(self, queue_name: str, limit: Optional[int] = None) -> List[Download]:
+        """Get a queue's waiting downloads in start order."""
+        queue = self.queues.get(queue_name)
+        return queue.ordered(limit) if queue else []
+    
+    def set_priority(self, download_id: str, priority: int) -> List[Download]:
+        """Change a queued download's priority. Returns the downloads to persist."""
+        for queue in self.queues.values():
+            download = queue.get(download_id)
+            if download is not None:
+                download.priority = priority
+                queue.update(download)
+                return [download]
+        return []
+    
+    def reorder_queue(self, queue_name: str, download_id: str, new_position: int) -> List[Download]:
+        """Move a download to a new position in its queue. Returns the downloads to persist."""
+        queue = self.queues.get(queue_name)
         if not queue:
-            return
-        
-        # Find download in queue
-        download_index = next(
-            (i for i, d in enumerate(queue) if d.id == download_id), 
-            None
-        )
-        if download_index is None:
-            return
-        
-        # Move download to new position
-        download = queue.pop(download_index)
-        queue.insert(min(new_position, len(queue)), download)
+            return []
+        return queue.move(download_id, new_position)
     
-    def move_to_queue(self, download_id: str, from_queue: str, to_queue: str):
-        """Move a download from one queue to another."""
-        from_queue_list = self.queues.get(from_queue, [])
+    def move_between(self, queue_name: str, download_id: str, before_id: Optional[str],
+                     after_id: Optional[str]) -> List[Download]:
+        """Move a download between two adjacent downloads of its queue. Returns the downloads to persist."""
+        queue = self.queues.get(queue_name)
+        if not queue:
+            return []
+        return queue.move_between(download_id, before_id, after_id)
+    
+    def move_to_queue(self, download_id: str, from_queue: str, to_queue: str) -> List[Download]:
+        """Move a download from one queue to the end of another. Returns the downloads to persist."""
+        from_queue_list = self.queues.get(from_queue)
         if not from_queue_list:
-            return
+            return []
         
-        # Find and remove download from old queue
-        download = next(
-            (d for d in from_queue_list if d.id == download_id),
-            None
-        )
+        download = from_queue_list.remove(download_id)
         if download is None:
-            return
-        
-        from_queue_list.remove(download)
+            return []
         
         # Add to new queue
+        download.queue_position = self.next_position(to_queue)
         self.add_to_queue(download, to_queue)
+        return [download]
@@ -0,0 +1,202 @@
+from typing import Dict, FrozenSet, Optional, Union
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import count
+
+# Cron fields in order: (name, lowest value, highest value, value names)
+MONTH_NAMES = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+DAY_NAMES = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+CRON_FIELDS = [
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day of month", 1, 31, None),
+    ("month", 1, 12, {name: number for number, name in enumerate(MONTH_NAMES, 1)}),
+    ("day of week", 0, 7, {name: number for number, name in enumerate(DAY_NAMES)})
+]
+CRON_MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *"
+}
+CRON_SEARCH_DAYS = 366 * 5  # A field combination that never matches in this span never will
+
+FREQUENCIES: Dict[str, timedelta] = {
+    "MINUTELY": timedelta(minutes=1),
+    "HOURLY": timedelta(hours=1),
+    "DAILY": timedelta(days=1),
+    "WEEKLY": timedelta(weeks=1)
+}
+RRULE_DAYS = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+
+def _cron_field(text: str, low: int, high: int, names: Optional[Dict[str, int]]) -> FrozenSet[int]:
+    """Parse one cron field such as `*/15`, `1-5` or `mon,wed,fri` into its values."""
+    def value(token: str) -> int:
+        if names and token.lower() in names:
+            return names[token.lower()]
+        if not token.isdigit():
+            raise ValueError(f"Invalid cron value {token!r}")
+        return int(token)
+    
+    values = set()
+    for item in text.split(","):
+        expression, slash, step_text = item.partition("/")
+        step = value(step_text) if slash else 1
+        if expression == "*":
+            start, end = low, high
+        elif "-" in expression:
+            first, last = expression.split("-", 1)
+            start, end = value(first), value(last)
+        else:
+            start = value(expression)
+            end = high if slash else start  # `5/10` means from 5 to the end in steps of 10
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"Cron field {item!r} is out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+@dataclass(frozen=True)
+class CronRule:
+    """A five-field cron expression: minute, hour, day of month, month, day of week.
+    
+    Fields accept `*`, lists, ranges, steps and month/day names. As in cron,
+    when both day fields are restricted a day matching either one fires.
+    """
+    expression: str
+    minutes: FrozenSet[int]
+    hours: FrozenSet[int]
+    days: FrozenSet[int]
+    months: FrozenSet[int]
+    weekdays: FrozenSet[int]  # 0 = Sunday
+    any_day: bool  # Day of month is `*`
+    any_weekday: bool  # Day of week is `*`
+    
+    @classmethod
+    def parse(cls, expression: str) -> 'CronRule':
+        fields = CRON_MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != len(CRON_FIELDS):
+            raise ValueError(f"Cron expression {expression!r} needs {len(CRON_FIELDS)} fields")
+        minutes, hours, days, months, weekdays = (
+            _cron_field(text, low, high, names)
+            for text, (_, low, high, names) in zip(fields, CRON_FIELDS)
+        )
+        return cls(
+            expression=expression,
+            minutes=minutes,
+            hours=hours,
+            days=days,
+            months=months,
+            weekdays=frozenset(day % 7 for day in weekdays),  # 7 is Sunday too
+            any_day=fields[2].startswith("*"),
+            any_weekday=fields[4].startswith("*")
+        )
+    
+    def next_time(self, previous: datetime, now: datetime) -> datetime:
+        """Get the first matching minute after both the previous run and now."""
+        moment = max(previous, now).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=CRON_SEARCH_DAYS)
+        while moment < limit:
+            if moment.month not in self.months:
+                month_start = moment.replace(day=1, hour=0, minute=0)
+                moment = (month_start + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+    
+    def _day_matches(self, moment: datetime) -> bool:
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+@dataclass(frozen=True)
+class IntervalRule:
+    """An RRULE-style fixed interval such as `FREQ=DAILY;INTERVAL=2;BYDAY=MO,WE,FR`.
+    
+    Runs repeat every INTERVAL periods of FREQ counted from the previous
+    run, so the first scheduled time sets the time of day. For WEEKLY,
+    BYDAY lists the days to run on in every INTERVAL-th week, weeks starting
+    on Monday; for shorter periods it skips runs that fall on other weekdays.
+    """
+    rule: str
+    period: timedelta
+    weekdays: FrozenSet[int]  # 0 = Monday, empty for every day
+    
+    @classmethod
+    def parse(cls, rule: str) -> 'IntervalRule':
+        text = rule.strip()
+        if text.upper().startswith("RRULE:"):
+            text = text[len("RRULE:"):]
+        parts = {}
+        for item in filter(None, text.split(";")):
+            key, equals, value = item.partition("=")
+            if not equals:
+                raise ValueError(f"Invalid recurrence rule part {item!r}")
+            parts[key.strip().upper()] = value.strip().upper()
+        
+        unknown = set(parts) - {"FREQ", "INTERVAL", "BYDAY"}
+        if unknown:
+            raise ValueError(f"Unsupported recurrence rule parts: {', '.join(sorted(unknown))}")
+        if parts.get("FREQ") not in FREQUENCIES:
+            raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+        interval = parts.get("INTERVAL", "1")
+        if not interval.isdigit() or int(interval) < 1:
+            raise ValueError(f"Invalid recurrence interval {interval!r}")
+        weekdays = set()
+        for day in filter(None, parts.get("BYDAY", "").split(",")):
+            if day not in RRULE_DAYS:
+                raise ValueError(f"Invalid recurrence day {day!r}")
+            weekdays.add(RRULE_DAYS.index(day))
+        return cls(rule=rule, period=FREQUENCIES[parts["FREQ"]] * int(interval),
+                   weekdays=frozenset(weekdays))
+    
+    def next_time(self, previous: datetime, now: datetime) -> datetime:
+        """Get the first run in the previous run's series that is after now.
+        
+        Runs missed while the application was not running are skipped
+        rather than fired one after another.
+        """
+        if self.weekdays and self.period >= timedelta(weeks=1):
+            return self._next_weekday(previous, now)
+        steps = max((now - previous) // self.period + 1, 1)
+        moment = previous + self.period * steps
+        # Seven steps, or a week of them, visit every weekday the series can reach
+        for _ in range(max(7, timedelta(weeks=1) // self.period)):
+            if not self.weekdays or moment.weekday() in self.weekdays:
+                return moment
+            moment += self.period
+        raise ValueError(f"Recurrence rule {self.rule!r} never fires")
+    
+    def _next_weekday(self, previous: datetime, now: datetime) -> datetime:
+        """Get the next BYDAY run of a weekly rule, in the weeks the previous run's week repeats in."""
+        week_start = previous - timedelta(days=previous.weekday())  # Keeps the time of day
+        weeks = self.period // timedelta(weeks=1)
+        after = max(previous, now)
+        # Jump to the last run week that starts at or before `after`
+        first_week = (after - week_start) // timedelta(weeks=1) // weeks * weeks
+        for week in count(first_week, weeks):
+            for weekday in sorted(self.weekdays):
+                moment = week_start + timedelta(weeks=week, days=weekday)
+                if moment > after:
+                    return moment
+
+Recurrence = Union[CronRule, IntervalRule]
+
+def parse_recurrence(rule: str) -> Recurrence:
+    """Parse a cron expression or an RRULE-style interval. Raises ValueError if invalid."""
+    text = rule.strip()
+    if not text:
+        raise ValueError("Empty recurrence rule")
+    if "=" in text:
+        return IntervalRule.parse(text)
+    return CronRule.parse(text)
@@ -1,76 +1,165 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 import asyncio
-from ..models.download import Download
+import heapq
+from .recurrence import parse_recurrence
+from ..models.download import Download, DownloadStatus
+from src.utils.logger import Logger
 
 class Scheduler:
+    """Start downloads at their scheduled_time from a single timer.
+    
+    Due times live in a min-heap of (scheduled_time, download id) entries
+    with an id->time map, so each scheduled download costs one tuple and one
+    dict entry instead of a sleeping task. One loop timer is armed for the
+    earliest entry. Cancelled and rescheduled downloads leave their old
+    entry behind; it is skipped when it comes up because its time no longer
+    matches the map, and dropped once such entries outnumber the live ones.
+    Downloads with a recurrence rule go back on the heap at their next run
+    once a run finishes.
+    """
+    
+    MAX_SLEEP = 3600  # Re-check hourly in case the wall clock jumps
+    COMPACT_MIN = 64
+    
     def __init__(self, download_manager):
         self.download_manager = download_manager
-        self.scheduled_downloads: Dict[str, Download] = {}
-        self.schedule_tasks: Dict[str, asyncio.Task] = {}
+        self._heap: List[Tuple[datetime, str]] = []
+        self._due: Dict[str, datetime] = {}  # Download id -> scheduled time
+        self._stale = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+    
+    def __len__(self) -> int:
+        return len(self._due)
+    
+    async def load(self):
+        """Fill the heap from the database; past-due downloads start as soon as the timer runs."""
+        for download_id, scheduled_time in await self.download_manager.repository.get_scheduled():
+            self._due.setdefault(download_id, scheduled_time)
+        self._heap = [(scheduled_time, download_id) for download_id, scheduled_time in self._due.items()]
+        self._stale = 0
+        heapq.heapify(self._heap)
+        Logger.debug(f"Loaded {len(self._due)} scheduled downloads")
+        self._arm()
+    
+    def start(self):
+        """Start firing on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._arm()
+    
+    def stop(self):
+        """Stop firing; the schedule is kept in the database."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._loop = None
     
     def schedule_download(self, download: Download):
         """Schedule a download for later."""
         if not download.scheduled_time:
             return
-        
-        self.scheduled_downloads[download.id] = download
-        
-        # Calculate delay until scheduled time
-        now = datetime.now()
-        delay = (download.scheduled_time - now).total_seconds()
-        
-        if delay > 0:
-            # Create task to start download at scheduled time
-            task = asyncio.create_task(self._schedule_task(download.id, delay))
-            self.schedule_tasks[download.id] = task
-    
-    async def _schedule_task(self, download_id: str, delay: float):
-        """Task that waits for scheduled time and starts download."""
-        try:
-            await asyncio.sleep(delay)
-            
-            # Start download if it still exists
-            if download_id in self.scheduled_downloads:
-                download = self.scheduled_downloads[download_id]
-                await self.download_manager.start_download(download_id)
-                
-                # Cleanup
-                del self.scheduled_downloads[download_id]
-                del self.schedule_tasks[download_id]
-                
-        except asyncio.CancelledError:
-            # Handle cancellation
-            if download_id in self.scheduled_downloads:
-                del self.scheduled_downloads[download_id]
-            if download_id in self.schedule_tasks:
-                del self.schedule_tasks[download_id]
+        if download.id in self._due:
+            self._stale += 1
+        self._due[download.id] = download.scheduled_time
+        entry = (download.scheduled_time, download.id)
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._arm()  # New earliest entry
     
     def cancel_scheduled_download(self, download_id: str):
         """Cancel a scheduled download."""
-        if download_id in self.schedule_tasks:
-            task = self.schedule_tasks[download_id]
-            task.cancel()
-            del self.schedule_tasks[download_id]
-        
-        if download_id in self.scheduled_downloads:
-            del self.scheduled_downloads[download_id]
+        if self._due.pop(download_id, None) is None:
+            return
+        self._stale += 1
+        if self._stale > self.COMPACT_MIN and self._stale > len(self._due):
+            self._heap = [(scheduled_time, download_id) for download_id, scheduled_time in self._due.items()]
+            heapq.heapify(self._heap)
+            self._stale = 0
     
     def get_scheduled_downloads(self) -> Dict[str, Download]:
         """Get all scheduled downloads."""
-        return self.scheduled_downloads.copy()
+        downloads = self.download_manager.downloads
+        return {download_id: downloads[download_id] for download_id in self._due if download_id in downloads}
+    
+    def next_due(self) -> Optional[datetime]:
+        """Get when the next scheduled download starts."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
     
     def reschedule_download(self, download_id: str, new_time: datetime):
         """Reschedule a download for a different time."""
-        if download_id not in self.scheduled_downloads:
+        download = self.download_manager.downloads.get(download_id)
+        if download is None or download_id not in self._due:
             return
-        
-        # Cancel existing schedule
-        self.cancel_scheduled_download(download_id)
-        
-        # Update scheduled time
-        download = self.scheduled_downloads[download_id]
         download.scheduled_time = new_time
+        self.schedule_download(download)
+    
+    def download_finished(self, download: Download) -> bool:
+        """Schedule the next run of a recurring download that finished. Returns True if scheduled.
+        
+        Failed runs are rescheduled too, so one bad run does not end the series.
+        """
+        if not download.recurrence or download.status not in (DownloadStatus.COMPLETED, DownloadStatus.ERROR):
+            return False
+        now = datetime.now()
+        try:
+            next_time = parse_recurrence(download.recurrence).next_time(download.scheduled_time or now, now)
+        except ValueError as e:
+            Logger.error(f"Could not reschedule download {download.id}: {str(e)}")
+            return False
         
-        # Create new schedule
+        if download.status == DownloadStatus.ERROR:
+            # The file on disk may be partly written, so the next run must not
+            # ask for it only if it changed
+            download.etag = download.last_modified = None
+        download.status = DownloadStatus.SCHEDULED
+        download.scheduled_time = next_time
+        download.progress = 0.0
+        download.speed = 0
+        download.downloaded_size = 0
         self.schedule_download(download)
+        Logger.info(f"Recurring download {download.id} next runs at {next_time}")
+        return True
+    
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._due.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+            self._stale = max(self._stale - 1, 0)
+    
+    def _arm(self):
+        """Set the timer for the earliest scheduled download."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        due = self.next_due()
+        if self._loop is None or due is None:
+            return
+        delay = min(max((due - datetime.now()).total_seconds(), 0), self.MAX_SLEEP)
+        self._timer = self._loop.call_later(delay, self._on_timer)
+    
+    def _on_timer(self):
+        self._timer = None
+        self._loop.create_task(self._fire())
+    
+    async def _fire(self):
+        """Start every download that is due, then wait for the next one."""
+        now = datetime.now()
+        due = []
+        while (next_due := self.next_due()) is not None and next_due <= now:
+            _, download_id = heapq.heappop(self._heap)
+            del self._due[download_id]
+            due.append(download_id)
+        
+        for download_id in due:
+            download = self.download_manager.downloads.get(download_id)
+            if download is None or download.status != DownloadStatus.SCHEDULED:
+                continue
+            Logger.info(f"Scheduled download {download_id} is due")
+            try:
+                await self.download_manager.start_download(download_id)
+            except Exception as e:
+                Logger.error(f"Could not start scheduled download {download_id}: {str(e)}")
+        if self._loop:
+            self._arm()
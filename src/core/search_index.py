@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+from itertools import compress, repeat
+from operator import contains
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+import re
+from ..models.download import Download
+
+# Fields that can be searched, and qualified as `field:value`
+FIELDS = ("name", "url", "host", "category", "status")
+
+# field:"quoted value", field:value, "quoted value" or a bare word
+QUERY_TOKEN = re.compile(r'(?:(\w+):)?(?:"([^"]*)"?|(\S*))')
+FTS_TOKEN = re.compile(r"\w+")
+
+@dataclass(frozen=True)
+class SearchTerm:
+    text: str
+    field: Optional[str] = None  # None matches any field
+
+def parse_query(query: str) -> List[SearchTerm]:
+    """Split a query like `host:cdn.example status:error movie` into terms.
+    
+    Prefixes that are not a known field are kept as part of the text, so
+    `https://example.com` is a plain term.
+    """
+    terms = []
+    for match in QUERY_TOKEN.finditer(query):
+        field, quoted, word = match.groups()
+        text = quoted if quoted is not None else word
+        if field and field.lower() not in FIELDS:
+            text = f"{field}:{text}"
+            field = None
+        text = text.strip().lower()
+        if text:
+            terms.append(SearchTerm(text, field.lower() if field else None))
+    return terms
+
+def to_fts_query(terms: List[SearchTerm]) -> Optional[str]:
+    """Build an FTS5 MATCH expression, treating each term as a phrase prefix."""
+    parts = []
+    for term in terms:
+        tokens = FTS_TOKEN.findall(term.text)
+        if not tokens:
+            continue
+        phrase = f'"{" ".join(tokens)}"*'
+        parts.append(f"{term.field} : {phrase}" if term.field else phrase)
+    return " AND ".join(parts) or None
+
+def search_fields(download: Download) -> Tuple[str, ...]:
+    """Get a download's searchable values in FIELDS order, lowercased."""
+    return (
+        download.file_name.lower(),
+        download.url.lower(),
+        (urlparse(download.url).hostname or "").lower(),
+        download.category,
+        download.status.value
+    )
+
+class SearchIndex:
+    """Substring index over the downloads loaded in memory.
+    
+    Each field is kept pre-lowercased per download, plus all fields joined
+    for unqualified terms, so a search is one `in` test per candidate and
+    term, run through map/compress to stay out of the interpreter loop.
+    When a query only extends the previous one (the user kept typing), only
+    the previous matches are scanned.
+    """
+    
+    def __init__(self):
+        self._fields: Dict[str, Dict[str, str]] = {field: {} for field in FIELDS}
+        self._text: Dict[str, str] = {}  # All fields, for unqualified terms
+        self._sources: Dict[str, Tuple] = {}  # Inputs the entry was built from
+        self._last_terms: List[SearchTerm] = []
+        self._last_matches: Optional[List[str]] = None
+    
+    def __len__(self) -> int:
+        return len(self._text)
+    
+    def __contains__(self, download_id: str) -> bool:
+        return download_id in self._text
+    
+    def add(self, downloads: Iterable[Download]):
+        """Index or re-index downloads."""
+        for download in downloads:
+            self.update(download)
+    
+    def update(self, download: Download):
+        """Re-index a download if any searchable value changed."""
+        source = (download.url, download.save_path, download.status)
+        if self._sources.get(download.id) == source:
+            return
+        self._sources[download.id] = source
+        
+        values = search_fields(download)
+        for field, value in zip(FIELDS, values):
+            self._fields[field][download.id] = value
+        self._text[download.id] = "\n".join(values)
+        
+        # The cached result may no longer be a superset of future matches
+        self._last_matches = None
+    
+    def remove(self, download_id: str):
+        """Drop a download from the index."""
+        if self._sources.pop(download_id, None) is None:
+            return
+        for values in self._fields.values():
+            del values[download_id]
+        del self._text[download_id]
+        self._last_matches = None
+    
+    def clear(self):
+        """Drop every download."""
+        for values in self._fields.values():
+            values.clear()
+        self._text.clear()
+        self._sources.clear()
+        self._last_terms = []
+        self._last_matches = None
+    
+    def search(self, query: str) -> Optional[Set[str]]:
+        """Get the IDs matching every term of the query, or None if every download matches."""
+        terms = parse_query(query)
+        if not terms:
+            self._last_terms = []
+            self._last_matches = None
+            return None
+        
+        if self._narrows(terms):
+            matches = self._last_matches
+            # Terms the previous result already satisfies need no re-check
+            pending = [term for i, term in enumerate(terms)
+                       if i >= len(self._last_terms) or term != self._last_terms[i]]
+        else:
+            matches = None
+            pending = terms
+        
+        for term in pending:
+            values = self._text if term.field is None else self._fields[term.field]
+            if matches is None:
+                matches = list(compress(values.keys(), map(contains, values.values(), repeat(term.text))))
+            else:
+                matches = list(compress(matches, map(contains, map(values.__getitem__, matches),
+                                                     repeat(term.text))))
+        
+        self._last_terms = terms
+        self._last_matches = matches
+        if len(matches) == len(self._text):
+            return None
+        return set(matches)
+    
+    def _narrows(self, terms: List[SearchTerm]) -> bool:
+        """Check whether every match of `terms` also matched the previous query."""
+        if self._last_matches is None or len(terms) < len(self._last_terms):
+            return False
+        # Looking up most of the index one by one is slower than scanning it
+        if len(self._last_matches) * 2 > len(self._text):
+            return False
+        return all(
+            term.field == last.field and last.text in term.text
+            for term, last in zip(terms, self._last_terms)
+        )
@@ -0,0 +1,511 @@
+from typing import Optional, Callable, Awaitable, List, Dict, Any
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import asyncio
+import os
+import re
+import time
+import aiohttp
+from ..models.download_part import DownloadPart, PartStatus
+from .host_limiter import HostLimiter
+from src.utils.logger import Logger
+
+BUSY_STATUSES = (429, 503)  # Responses that ask the client to come back later
+
+class DownloadError(Exception):
+    """Raised when the remote server cannot satisfy a download."""
+
+class ServerBusyError(Exception):
+    """Raised when the server asks us to slow down; the request is retried after a backoff."""
+    
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"Server returned HTTP {status}")
+        self.retry_after = retry_after
+
+def retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    """Get the seconds a Retry-After header asks for, if any."""
+    value = response.headers.get("Retry-After", "").strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+class SegmentedDownloader:
+    """Download a file over several HTTP Range requests on the running event loop.
+    
+    Each segment is fetched by its own connection coroutine and written at its
+    byte offset in a single preallocated file, so no threads are involved.
+    When a connection runs out of work it splits the largest unfinished part
+    in half and takes over the tail, so every connection stays busy until
+    the last byte; set_segments() adds or retires connections the same way
+    while the download runs. Part progress is checkpointed periodically; passing the
+    stored parts and validators back in resumes each part from its offset
+    if the server confirms the file is unchanged. A conditional run instead
+    asks for the file only if it changed since the stored validators, and
+    leaves the existing file alone when the server answers 304.
+    """
+    
+    READ_SIZE = 64 * 1024
+    MIN_SPLIT_SIZE = 1024 * 1024  # Never create parts smaller than this
+    PROGRESS_INTERVAL = 0.1
+    CHECKPOINT_INTERVAL = 2.0
+    CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+    
+    def __init__(self, url: str, save_path: str, segments: int = 4,
+                 timeout: int = 30, retries: int = 5,
+                 throttle: Optional[Callable[[int], Awaitable]] = None,
+                 session: Optional[aiohttp.ClientSession] = None,
+                 proxy: Optional[str] = None,
+                 hosts: Optional[HostLimiter] = None,
+                 parts: Optional[List[DownloadPart]] = None,
+                 etag: Optional[str] = None, last_modified: Optional[str] = None,
+                 conditional: bool = False,
+                 plan_callback: Optional[Callable[[List[DownloadPart]], Awaitable]] = None,
+                 checkpoint_callback: Optional[Callable[[List[DownloadPart]], Awaitable]] = None):
+        self.url = url
+        self.save_path = save_path
+        self.segments = max(1, segments)
+        self.timeout = timeout
+        self.retries = retries
+        self.throttle = throttle  # Awaited with each chunk size to shape bandwidth
+        self.session = session
+        self.proxy = proxy
+        self.hosts = hosts  # Shared per-host connection caps and backoff
+        self.plan_callback = plan_callback
+        self.checkpoint_callback = checkpoint_callback
+        
+        self.parts: List[DownloadPart] = list(parts or [])
+        self.total_size: Optional[int] = None
+        self.accept_ranges = False
+        self.etag = etag
+        self.last_modified = last_modified
+        self.conditional = conditional  # Send If-None-Match/If-Modified-Since with the validators
+        self.not_modified = False  # The server confirmed the existing file is current
+        self.speed = 0.0
+        self.rtt: Optional[float] = None  # Smoothed seconds from request to response headers
+        self.rtt_at: Optional[float] = None  # time.monotonic() of the last RTT sample
+        
+        self._file = None
+        self._session: Optional[aiohttp.ClientSession] = None  # Set while connections run
+        self._connection_count = 0
+        self._tasks: List[asyncio.Task] = []
+        self._resume_event = asyncio.Event()
+        self._resume_event.set()
+        self._stopped = False
+    
+    @property
+    def downloaded(self) -> int:
+        """Total bytes written to disk across all parts."""
+        return sum(part.downloaded_size for part in self.parts)
+    
+    @property
+    def progress(self) -> float:
+        """Fraction of the file downloaded, between 0 and 1."""
+        if not self.total_size:
+            return 0.0
+        return min(self.downloaded / self.total_size, 1.0)
+    
+    @property
+    def eta(self) -> float:
+        """Estimated seconds until completion, 0 when unknown."""
+        if not self.total_size or self.speed <= 0:
+            return 0
+        return (self.total_size - self.downloaded) / self.speed
+    
+    @property
+    def is_paused(self) -> bool:
+        return not self._resume_event.is_set()
+    
+    async def run(self, progress_callback: Optional[Callable] = None) -> bool:
+        """Download the file. Returns False if the download was stopped."""
+        own_session = self.session is None
+        session = self.session or aiohttp.ClientSession()
+        reporter = None
+        try:
+            # Run as a task so stop() can interrupt a backoff before the first byte
+            self._tasks = [asyncio.create_task(self._probe_with_backoff(session))]
+            await self._tasks[0]
+            if self.not_modified:
+                Logger.info(f"{self.url} is unchanged, skipping the transfer")
+                return True
+            if self.parts:
+                # Parts left mid-flight by a crash are picked up again
+                for part in self.parts:
+                    if part.status == PartStatus.DOWNLOADING:
+                        part.status = PartStatus.PENDING
+                Logger.info(f"Resuming {self.url} at {self.downloaded} bytes "
+                           f"across {len(self.parts)} parts")
+            else:
+                self._plan()
+            self._open_file()
+            await self._notify_plan()
+            
+            reporter = asyncio.create_task(self._report_progress(progress_callback))
+            self._session = session
+            self._tasks = []
+            self._add_connections(min(self.segments, len(self.parts)))
+            await self._join_connections()
+        except asyncio.CancelledError:
+            if not self._stopped:
+                raise
+        finally:
+            self._session = None
+            for task in self._tasks:
+                task.cancel()
+            if reporter:
+                reporter.cancel()
+            if self._file:
+                self._file.close()
+                self._file = None
+                await self._checkpoint()
+            if own_session:
+                await session.close()
+        
+        if self._stopped:
+            Logger.debug(f"Download stopped: {self.url}")
+            return False
+        
+        if progress_callback:
+            await progress_callback(self._progress_snapshot())
+        return True
+    
+    def set_segments(self, segments: int):
+        """Change how many connections the download uses, including while it runs.
+        
+        New connections split the largest unfinished part; surplus ones
+        finish the part they are on and close.
+        """
+        self.segments = max(1, segments)
+        if self._session is not None and not self._stopped:
+            self._add_connections(self.segments)
+    
+    def _add_connections(self, count: int):
+        while self._connection_count < count:
+            self._connection_count += 1
+            self._tasks.append(asyncio.create_task(self._connection(self._session, len(self._tasks))))
+    
+    async def _join_connections(self):
+        """Wait for every connection, including ones added meanwhile; raise the first failure."""
+        while True:
+            pending = [task for task in self._tasks if not task.done()]
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                if not task.cancelled() and task.exception():
+                    raise task.exception()
+    
+    def pause(self):
+        """Pause all connections after their current chunk."""
+        self._resume_event.clear()
+    
+    def resume(self):
+        """Resume paused connections from their current offsets."""
+        self._resume_event.set()
+    
+    def stop(self):
+        """Abort the download, keeping what has been written so far."""
+        self._stopped = True
+        self._resume_event.set()
+        for task in self._tasks:
+            task.cancel()
+    
+    @property
+    def validator(self) -> Optional[str]:
+        """Value for If-Range: the strong ETag if known, else Last-Modified."""
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+    
+    async def _probe_with_backoff(self, session: aiohttp.ClientSession):
+        """Probe the file, waiting and retrying while the server says it is busy."""
+        attempts = 0
+        while True:
+            try:
+                async with self._connection_slot():
+                    await self._probe(session)
+                return
+            except ServerBusyError as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise DownloadError(str(e)) from e
+                Logger.warning(f"Probe of {self.url} refused ({e}), retry {attempts}/{self.retries}")
+                await self._back_off(attempts, e.retry_after)
+    
+    async def _probe(self, session: aiohttp.ClientSession):
+        """Discover the file size and whether the server honours Range requests.
+        
+        When resuming, the request carries If-Range so a changed file comes
+        back as a full 200 response; the stored parts are then discarded and
+        the file is probed again to learn whether it accepts ranges. A
+        conditional probe carries If-None-Match/If-Modified-Since instead, and
+        a 304 answer sets not_modified.
+        """
+        headers = {"Range": "bytes=0-0"}
+        resuming = bool(self.parts)
+        if resuming and self.validator:
+            headers["If-Range"] = self.validator
+        elif self.conditional:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        
+        started = time.monotonic()
+        async with session.get(self.url, headers=headers, proxy=self.proxy,
+                               timeout=self._client_timeout()) as response:
+            self._record_rtt(time.monotonic() - started)
+            if response.status == 304 and self.conditional:
+                self.not_modified = True
+                return
+            if response.status == 206:
+                match = self.CONTENT_RANGE.match(response.headers.get("Content-Range", ""))
+                if match and match.group(3) != "*":
+                    self.total_size = int(match.group(3))
+                    self.accept_ranges = True
+            elif response.status == 200:
+                length = response.headers.get("Content-Length")
+                self.total_size = int(length) if length else None
+            elif response.status in BUSY_STATUSES:
+                raise ServerBusyError(response.status, retry_after(response))
+            else:
+                raise DownloadError(f"Server returned HTTP {response.status}")
+            
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+        
+        if resuming and not self._can_resume(etag, last_modified):
+            Logger.info(f"Remote file changed or cannot be validated, restarting {self.url}")
+            self.parts = []
+            if "If-Range" in headers and not self.accept_ranges:
+                # A 200 answer to If-Range means the file changed, not that
+                # ranges are unsupported; ask again so the restart is segmented
+                return await self._probe(session)
+        
+        self.etag = etag
+        self.last_modified = last_modified
+        Logger.debug(f"Probed {self.url}: size={self.total_size}, "
+                    f"ranges={self.accept_ranges}, etag={etag}")
+    
+    def _can_resume(self, etag: Optional[str], last_modified: Optional[str]) -> bool:
+        """Check that stored parts still describe the remote file."""
+        if not self.accept_ranges or not self.validator:
+            return False
+        if self.validator not in (etag, last_modified):
+            return False
+        expected_end = max(part.end_byte for part in self.parts)
+        return expected_end == self.total_size - 1
+    
+    def _plan(self):
+        """Split the file into one part per connection."""
+        if not self.accept_ranges or not self.total_size:
+            end = self.total_size - 1 if self.total_size else -1
+            self.parts = [DownloadPart(0, 0, end)]
+            return
+        
+        count = min(self.segments, self.total_size)
+        size = self.total_size // count
+        self.parts = []
+        for number in range(count):
+            start = number * size
+            end = self.total_size - 1 if number == count - 1 else start + size - 1
+            self.parts.append(DownloadPart(number, start, end))
+    
+    def _open_file(self):
+        """Create the target file at its final size so parts can write in place."""
+        os.makedirs(os.path.dirname(self.save_path) or ".", exist_ok=True)
+        self._file = open(self.save_path, "r+b" if os.path.exists(self.save_path) else "w+b")
+        if self.total_size:
+            self._file.truncate(self.total_size)
+    
+    def _next_part(self) -> Optional[DownloadPart]:
+        """Claim the next part nobody is working on."""
+        for part in self.parts:
+            if part.status == PartStatus.PENDING:
+                part.status = PartStatus.DOWNLOADING
+                return part
+        return None
+    
+    def _split_largest_part(self) -> Optional[DownloadPart]:
+        """Hand the second half of the largest in-flight part to a new part."""
+        if not self.accept_ranges:
+            return None
+        
+        active = [part for part in self.parts if part.status == PartStatus.DOWNLOADING]
+        if not active:
+            return None
+        
+        largest = max(active, key=lambda part: part.remaining)
+        if largest.remaining < 2 * self.MIN_SPLIT_SIZE:
+            return None
+        
+        # The connection streaming the original part stops at its new end
+        middle = largest.position + largest.remaining // 2
+        part = DownloadPart(
+            part_number=max(p.part_number for p in self.parts) + 1,
+            start_byte=middle,
+            end_byte=largest.end_byte,
+            status=PartStatus.DOWNLOADING
+        )
+        largest.end_byte = middle - 1
+        self.parts.append(part)
+        Logger.debug(f"Split part {largest.part_number} at byte {middle} "
+                    f"into new part {part.part_number}")
+        return part
+    
+    async def _notify_plan(self):
+        """Let the owner persist the current part layout."""
+        if self.plan_callback:
+            await self.plan_callback(self.parts)
+    
+    async def _connection(self, session: aiohttp.ClientSession, index: int):
+        """Fetch parts one after another until nothing is left to split."""
+        try:
+            while not self._stopped and self._connection_count <= self.segments:
+                part = self._next_part()
+                if part is None:
+                    # Out of work: steal the tail of the slowest remaining part
+                    part = self._split_largest_part()
+                    if part is None:
+                        return
+                    await self._notify_plan()
+                Logger.debug(f"Connection {index} fetching part {part.part_number} "
+                            f"({part.start_byte}-{part.end_byte})")
+                await self._fetch_part(session, part)
+        finally:
+            self._connection_count -= 1
+    
+    async def _fetch_part(self, session: aiohttp.ClientSession, part: DownloadPart):
+        """Fetch a single part, reconnecting on pause and transient errors."""
+        attempts = 0
+        while part.remaining != 0 and not self._stopped:
+            await self._resume_event.wait()
+            try:
+                async with self._connection_slot():
+                    finished = await self._stream_part(session, part)
+                if finished:
+                    break
+                attempts = 0
+            except (aiohttp.ClientError, asyncio.TimeoutError, ServerBusyError) as e:
+                attempts += 1
+                if attempts > self.retries:
+                    raise DownloadError(f"Part {part.part_number} failed: {e}") from e
+                Logger.warning(f"Part {part.part_number} error ({e}), "
+                              f"retry {attempts}/{self.retries}")
+                await self._back_off(attempts, getattr(e, "retry_after", None))
+        
+        if not self._stopped:
+            part.status = PartStatus.COMPLETED
+    
+    async def _stream_part(self, session: aiohttp.ClientSession, part: DownloadPart) -> bool:
+        """Stream bytes for a part. Returns True once the part is complete."""
+        headers = {}
+        if self.accept_ranges:
+            headers["Range"] = f"bytes={part.position}-{part.end_byte}"
+            if self.validator:
+                headers["If-Range"] = self.validator
+        elif part.downloaded_size:
+            # No range support: start the single part over
+            part.downloaded_size = 0
+        
+        started = time.monotonic()
+        async with session.get(self.url, headers=headers, proxy=self.proxy,
+                               timeout=self._client_timeout()) as response:
+            self._record_rtt(time.monotonic() - started)
+            expected = 206 if self.accept_ranges else 200
+            if self.accept_ranges and response.status == 200:
+                raise DownloadError("Remote file changed during download")
+            if response.status in BUSY_STATUSES:
+                raise ServerBusyError(response.status, retry_after(response))
+            if response.status != expected:
+                raise DownloadError(f"Server returned HTTP {response.status} for part "
+                                    f"{part.part_number}")
+            if self.hosts:
+                self.hosts.success(self.url)
+            
+            async for chunk in response.content.iter_chunked(self.READ_SIZE):
+                if self._stopped or self.is_paused:
+                    return False
+                
+                remaining = part.remaining
+                if remaining >= 0:
+                    chunk = chunk[:remaining]
+                self._write(part.position, chunk)
+                part.downloaded_size += len(chunk)
+                if self.throttle:
+                    await self.throttle(len(chunk))
+                
+                if part.remaining == 0:
+                    return True
+        
+        # Body ended: complete only if the size was unknown or fully received
+        return part.remaining <= 0
+    
+    def _write(self, offset: int, data: bytes):
+        """Write data at an absolute offset in the target file."""
+        self._file.seek(offset)
+        self._file.write(data)
+    
+    async def _checkpoint(self):
+        """Flush written data and let the owner persist part offsets."""
+        if not self.checkpoint_callback or not self.parts:
+            return
+        if self._file:
+            self._file.flush()
+        await self.checkpoint_callback(self.parts)
+    
+    async def _report_progress(self, progress_callback: Optional[Callable]):
+        """Periodically compute speed, report progress and checkpoint parts."""
+        last_downloaded = self.downloaded
+        last_time = time.monotonic()
+        checkpointed = last_downloaded
+        last_checkpoint = last_time
+        while True:
+            await asyncio.sleep(self.PROGRESS_INTERVAL)
+            now = time.monotonic()
+            downloaded = self.downloaded
+            instant = (downloaded - last_downloaded) / max(now - last_time, 1e-6)
+            self.speed = instant if self.speed == 0 else 0.7 * self.speed + 0.3 * instant
+            last_downloaded, last_time = downloaded, now
+            
+            if progress_callback and not self.is_paused:
+                await progress_callback(self._progress_snapshot())
+            
+            # Bound the amount of transfer lost on a crash
+            if downloaded != checkpointed and now - last_checkpoint >= self.CHECKPOINT_INTERVAL:
+                await self._checkpoint()
+                checkpointed, last_checkpoint = downloaded, now
+    
+    def _progress_snapshot(self) -> Dict[str, Any]:
+        return {
+            "downloaded": self.downloaded,
+            "total": self.total_size or 0,
+            "speed": self.speed,
+            "eta": self.eta
+        }
+    
+    def _record_rtt(self, sample: float):
+        self.rtt = sample if self.rtt is None else 0.8 * self.rtt + 0.2 * sample
+        self.rtt_at = time.monotonic()
+    
+    def _connection_slot(self):
+        """Hold one of the host's connections, waiting out its backoff first."""
+        return self.hosts.connection(self.url) if self.hosts else nullcontext()
+    
+    async def _back_off(self, attempts: int, delay: Optional[float] = None):
+        """Wait before retrying a request that failed or was refused.
+        
+        With a host limiter the backoff belongs to the host, and every
+        connection to it waits in _connection_slot before its next request.
+        """
+        if self.hosts:
+            self.hosts.failure(self.url, delay)
+        else:
+            await asyncio.sleep(delay if delay is not None else min(2 ** attempts, 30))
+    
+    def _client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(sock_connect=self.timeout, sock_read=self.timeout)
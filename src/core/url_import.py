@@ -0,0 +1,24 @@
+from typing import Iterable, List, Set
+import re
+
+URL_PATTERN = re.compile(r"https?://[^\s<>\"']+", re.IGNORECASE)
+
+def extract_urls(text: str) -> List[str]:
+    """Find every http(s) URL in free-form text such as a link list or clipboard."""
+    return [url.rstrip(".,;)") for url in URL_PATTERN.findall(text or "")]
+
+def read_url_file(path: str) -> List[str]:
+    """Read URLs from a text file, one or more per line."""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return extract_urls(f.read())
+
+def dedupe_urls(urls: Iterable[str], known: Set[str] = frozenset()) -> List[str]:
+    """Drop blanks, repeats and URLs in `known`, keeping the original order."""
+    seen = set(known)
+    unique = []
+    for url in urls:
+        url = url.strip()
+        if url and url not in seen:
+            seen.add(url)
+            unique.append(url)
+    return unique
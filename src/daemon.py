@@ -0,0 +1,71 @@
+"""Headless Pasargadae: the download engine and its control API, without Qt.
+
+Run with `python -m src.daemon`; clients talk to it through
+src.core.control_api.ControlClient or plain HTTP/JSON, sending the token
+from `control_token` next to the settings file as a bearer token.
+"""
+import argparse
+import asyncio
+import os
+import signal
+from src.core.browser_integration import BrowserIntegration
+from src.core.control_api import ControlServer
+from src.core.download_manager import DownloadManager
+from src.database.migrations import MigrationManager
+from src.settings.manager import SettingsManager, DEFAULT_SETTINGS_FILE
+from src.utils.logger import Logger
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run Pasargadae without a GUI.")
+    parser.add_argument("--settings", default=DEFAULT_SETTINGS_FILE, help="settings file")
+    parser.add_argument("--host", help="control API host (default from settings)")
+    parser.add_argument("--port", type=int, help="control API port (default from settings)")
+    parser.add_argument("--socket", help="serve the control API on this Unix socket instead")
+    return parser.parse_args(argv)
+
+async def run(args: argparse.Namespace):
+    """Serve downloads until SIGINT or SIGTERM."""
+    migration_manager = MigrationManager("downloads.db")
+    await migration_manager.apply_migrations()
+    
+    settings = SettingsManager(args.settings).get_all_settings()
+    daemon_settings = settings.get("daemon", {})
+    
+    download_manager = DownloadManager(settings)
+    await download_manager.start()
+    await download_manager.load_downloads()
+    
+    browser_integration = BrowserIntegration(settings, download_manager)
+    await browser_integration.start()
+    
+    server = ControlServer(
+        download_manager,
+        host=args.host or daemon_settings.get("host", "127.0.0.1"),
+        port=args.port or daemon_settings.get("port", 8766),
+        socket_path=args.socket or daemon_settings.get("socket_path") or None,
+        token_path=os.path.join(os.path.dirname(os.path.abspath(args.settings)), "control_token")
+    )
+    await server.start()
+    
+    stopped = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stopped.set)
+        except NotImplementedError:
+            pass  # Windows: KeyboardInterrupt ends asyncio.run instead
+    
+    Logger.info("Pasargadae daemon running")
+    try:
+        await stopped.wait()
+    finally:
+        Logger.info("Pasargadae daemon stopping")
+        await server.stop()
+        await browser_integration.stop()
+        await download_manager.shutdown()
+
+def main(argv=None):
+    asyncio.run(run(parse_args(argv)))
+
+if __name__ == "__main__":
+    main()
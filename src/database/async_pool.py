@@ -0,0 +1,92 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+import asyncio
+import aiosqlite
+from src.utils.logger import Logger
+
+# Applied to every pooled connection
+PRAGMAS = [
+    "PRAGMA journal_mode = WAL",  # Readers never block the writer
+    "PRAGMA synchronous = NORMAL",  # Safe with WAL, skips an fsync per commit
+    "PRAGMA cache_size = -16000",  # 16 MB page cache per connection
+    "PRAGMA mmap_size = 268435456",  # Map up to 256 MB of the file
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000"
+]
+
+class AsyncConnectionPool:
+    """Long-lived aiosqlite connections: one writer and a small reader pool.
+    
+    Opening a connection per query costs a thread start, a file open and a
+    cold page cache. The pooled connections stay open, keep their statement
+    caches warm and run in WAL mode so reads do not wait for writes.
+    """
+    
+    STATEMENT_CACHE = 256  # Prepared statements kept per connection
+    
+    def __init__(self, db_path: str, readers: int = 2):
+        self.db_path = db_path
+        self.reader_count = max(1, readers)
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._write_lock = asyncio.Lock()
+        self._open_lock = asyncio.Lock()
+    
+    async def open(self):
+        """Open the connections. Called automatically on first use."""
+        async with self._open_lock:
+            if self._writer is not None:
+                return
+            # The writer switches the file to WAL before readers attach
+            writer = await self._connect()
+            readers = [await self._connect() for _ in range(self.reader_count)]
+            self._idle_readers = asyncio.Queue()
+            for reader in readers:
+                self._idle_readers.put_nowait(reader)
+            self._readers = readers
+            self._writer = writer
+            Logger.debug(f"Opened connection pool for {self.db_path} "
+                        f"with {self.reader_count} readers")
+    
+    async def close(self):
+        """Close every connection."""
+        async with self._write_lock:
+            connections = ([self._writer] if self._writer else []) + self._readers
+            self._writer = None
+            self._readers = []
+            self._idle_readers = None
+            for connection in connections:
+                await connection.close()
+    
+    @asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow the writer connection; uncommitted work is rolled back on error."""
+        if self._writer is None:
+            await self.open()
+        async with self._write_lock:
+            try:
+                yield self._writer
+            except BaseException:
+                await self._writer.rollback()
+                raise
+    
+    @asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a reader connection."""
+        if self._writer is None:
+            await self.open()
+        connection = await self._idle_readers.get()
+        try:
+            yield connection
+        finally:
+            if self._idle_readers is not None:
+                self._idle_readers.put_nowait(connection)
+    
+    async def _connect(self) -> aiosqlite.Connection:
+        connection = await aiosqlite.connect(
+            self.db_path, cached_statements=self.STATEMENT_CACHE
+        )
+        for pragma in PRAGMAS:
+            await connection.execute(pragma)
+        return connection
@@ -12,13 +12,19 @@ CREATE TABLE IF NOT EXISTS downloads (
     error TEXT,
     expected_hash TEXT,
     scheduled_time TIMESTAMP,
+    recurrence TEXT,  -- Cron expression or RRULE-style interval
     created_at TIMESTAMP NOT NULL,
     completed_at TIMESTAMP,
     
+    -- Cache validators for resuming
+    etag TEXT,
+    last_modified TEXT,
+    
     -- Additional metadata
     filename TEXT,
     mime_type TEXT,
     category TEXT,
+    host TEXT,
     
     -- Settings used for this download
     chunks INTEGER,
@@ -94,4 +100,42 @@ CREATE TABLE IF NOT EXISTS download_events (
 -- Index for event lookup
 CREATE INDEX IF NOT EXISTS idx_download_events
 ON download_events(download_id, created_at);
+
+-- Indexes for compaction and retention
+CREATE INDEX IF NOT EXISTS idx_download_events_type_time
+ON download_events(event_type, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_download_events_time
+ON download_events(created_at);
+"""
+
+CREATE_DOWNLOADS_SEARCH = """
+-- Full-text index; rows share the rowid of their download
+CREATE VIRTUAL TABLE IF NOT EXISTS downloads_search USING fts5(
+    name, url, host, category, status,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS downloads_search_insert AFTER INSERT ON downloads
+BEGIN
+    INSERT INTO downloads_search (rowid, name, url, host, category, status)
+    VALUES (new.rowid, new.filename, new.url, new.host, new.category, new.status);
+END;
+
+CREATE TRIGGER IF NOT EXISTS downloads_search_update
+AFTER UPDATE OF url, filename, host, category, status ON downloads
+WHEN old.url IS NOT new.url OR old.filename IS NOT new.filename OR old.host IS NOT new.host
+    OR old.category IS NOT new.category OR old.status IS NOT new.status
+BEGIN
+    UPDATE downloads_search SET
+        name = new.filename, url = new.url, host = new.host,
+        category = new.category, status = new.status
+    WHERE rowid = new.rowid;
+END;
+
+CREATE TRIGGER IF NOT EXISTS downloads_search_delete AFTER DELETE ON downloads
+BEGIN
+    DELETE FROM downloads_search WHERE rowid = old.rowid;
+END;
 """
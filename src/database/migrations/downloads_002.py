@@ -0,0 +1,20 @@
+"""Store cache validators so partial downloads can be resumed safely"""
+
+ADD_VALIDATOR_COLUMNS = [
+    "ALTER TABLE downloads ADD COLUMN etag TEXT",
+    "ALTER TABLE downloads ADD COLUMN last_modified TEXT"
+]
+
+async def up(db):
+    """Apply the migration."""
+    for statement in ADD_VALIDATOR_COLUMNS:
+        await db.execute(statement)
+        await db.commit()
+
+async def down(db):
+    """Revert the migration."""
+    await db.execute("ALTER TABLE downloads DROP COLUMN last_modified")
+    await db.commit()
+    
+    await db.execute("ALTER TABLE downloads DROP COLUMN etag")
+    await db.commit()
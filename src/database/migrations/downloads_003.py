@@ -0,0 +1,22 @@
+"""Index download events by time for compaction and retention"""
+
+EVENT_TIME_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_download_events_type_time
+       ON download_events(event_type, created_at)""",
+    """CREATE INDEX IF NOT EXISTS idx_download_events_time
+       ON download_events(created_at)"""
+]
+
+async def up(db):
+    """Apply the migration."""
+    for index in EVENT_TIME_INDEXES:
+        await db.execute(index)
+        await db.commit()
+
+async def down(db):
+    """Revert the migration."""
+    await db.execute("DROP INDEX IF EXISTS idx_download_events_time")
+    await db.commit()
+    
+    await db.execute("DROP INDEX IF EXISTS idx_download_events_type_time")
+    await db.commit()
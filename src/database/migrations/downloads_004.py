@@ -0,0 +1,73 @@
+"""Full-text search index over downloads"""
+from urllib.parse import urlparse
+
+CREATE_DOWNLOADS_SEARCH = """
+CREATE VIRTUAL TABLE IF NOT EXISTS downloads_search USING fts5(
+    name, url, host, category, status,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)"""
+
+# Rows share the rowid of their download
+POPULATE_DOWNLOADS_SEARCH = """
+INSERT INTO downloads_search (rowid, name, url, host, category, status)
+SELECT rowid, filename, url, host, category, status FROM downloads
+"""
+
+SEARCH_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS downloads_search_insert AFTER INSERT ON downloads
+    BEGIN
+        INSERT INTO downloads_search (rowid, name, url, host, category, status)
+        VALUES (new.rowid, new.filename, new.url, new.host, new.category, new.status);
+    END""",
+    # Progress writes set status on every flush, so only react to real changes
+    """CREATE TRIGGER IF NOT EXISTS downloads_search_update
+    AFTER UPDATE OF url, filename, host, category, status ON downloads
+    WHEN old.url IS NOT new.url OR old.filename IS NOT new.filename OR old.host IS NOT new.host
+        OR old.category IS NOT new.category OR old.status IS NOT new.status
+    BEGIN
+        UPDATE downloads_search SET
+            name = new.filename, url = new.url, host = new.host,
+            category = new.category, status = new.status
+        WHERE rowid = new.rowid;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS downloads_search_delete AFTER DELETE ON downloads
+    BEGIN
+        DELETE FROM downloads_search WHERE rowid = old.rowid;
+    END"""
+]
+
+async def up(db):
+    """Apply the migration."""
+    await db.execute("ALTER TABLE downloads ADD COLUMN host TEXT")
+    await db.commit()
+    
+    async with db.execute("SELECT id, url FROM downloads") as cursor:
+        rows = await cursor.fetchall()
+    await db.executemany(
+        "UPDATE downloads SET host = ? WHERE id = ?",
+        [(urlparse(url).hostname, download_id) for download_id, url in rows]
+    )
+    await db.commit()
+    
+    await db.execute(CREATE_DOWNLOADS_SEARCH)
+    await db.commit()
+    
+    await db.execute(POPULATE_DOWNLOADS_SEARCH)
+    await db.commit()
+    
+    for trigger in SEARCH_TRIGGERS:
+        await db.execute(trigger)
+        await db.commit()
+
+async def down(db):
+    """Revert the migration."""
+    for trigger in ["downloads_search_delete", "downloads_search_update", "downloads_search_insert"]:
+        await db.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        await db.commit()
+    
+    await db.execute("DROP TABLE IF EXISTS downloads_search")
+    await db.commit()
+    
+    await db.execute("ALTER TABLE downloads DROP COLUMN host")
+    await db.commit()
@@ -0,0 +1,11 @@
+"""Recurrence rules for scheduled downloads"""
+
+async def up(db):
+    """Apply the migration."""
+    await db.execute("ALTER TABLE downloads ADD COLUMN recurrence TEXT")
+    await db.commit()
+
+async def down(db):
+    """Revert the migration."""
+    await db.execute("ALTER TABLE downloads DROP COLUMN recurrence")
+    await db.commit()
@@ -1,35 +1,70 @@
 import sys
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QApplication
-from src.components.main_window import MainWindow
-from src.database.migrations import MigrationManager
 import asyncio
 
+PROFILE_FLAG = "--profile-startup"  # Print import and first-paint timings
+
 async def init_database():
     """Initialize database with migrations."""
+    from src.database.migrations import MigrationManager
     migration_manager = MigrationManager("downloads.db")
     await migration_manager.apply_migrations()
 
+async def start_services(window, profiler=None):
+    """Bring up everything the first frame does not need."""
+    await init_database()
+    window.start_services()
+    
+    # Render the remaining icons before anyone asks for them
+    from src.utils.icon_provider import IconProvider
+    IconProvider.warm_up()
+    
+    if profiler:
+        profiler.mark("services started")
+        profiler.report()
+
 def main():
+    profiler = None
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+        from src.utils.startup_profiler import StartupProfiler
+        profiler = StartupProfiler()
+        profiler.install()
+    
+    # Qt and the window are imported here so the profiler can time them;
+    # everything heavier is imported on first use
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtWidgets import QApplication
+    from src.components.main_window import MainWindow
+    from src.utils.qt_event_loop import QtEventLoop
+    
     app = QApplication(sys.argv)
     app.setAttribute(Qt.ApplicationAttribute.AA_DontCreateNativeWidgetSiblings)
     
     # Set application style
     app.setStyle("Fusion")
     
-    # Run database migrations
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(init_database())
-    finally:
-        loop.close()
+    # One asyncio loop, driven by Qt, for the whole application
+    loop = QtEventLoop(app)
+    asyncio.set_event_loop(loop)
     
-    # Create and show main window
+    # Create and show main window; the download engine starts after it paints
     window = MainWindow()
+    if profiler:
+        profiler.mark("window created")
+        window.first_paint.connect(lambda: profiler.mark("first paint"))
+    window.first_paint.connect(lambda: window.async_helper.run_async(start_services(window, profiler)))
     window.show()
     
-    sys.exit(app.exec())
+    # Stop the loop instead of quitting Qt so shutdown can still run on it
+    app.setQuitOnLastWindowClosed(False)
+    app.lastWindowClosed.connect(loop.stop)
+    try:
+        loop.run_forever()
+        loop.run_until_complete(window.shutdown())
+    finally:
+        loop.close()
+    
+    sys.exit(0)
 
 if __name__ == "__main__":
     main()
@@ -2,6 +2,9 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 from enum import Enum
+from functools import lru_cache
+import mimetypes
+import os
 
 class DownloadStatus(Enum):
     QUEUED = "queued"
@@ -11,6 +14,29 @@ class DownloadStatus(Enum):
     ERROR = "error"
     SCHEDULED = "scheduled"
 
+def file_category(mime_type: str) -> str:
+    """Determine file category based on MIME type."""
+    if mime_type.startswith('video/'):
+        return "video"
+    elif mime_type.startswith('audio/'):
+        return "audio"
+    elif mime_type.startswith('image/'):
+        return "image"
+    elif mime_type.startswith('text/'):
+        return "documents"
+    elif mime_type in ['application/zip', 'application/x-rar-compressed', 'application/x-7z-compressed']:
+        return "documents"
+    elif mime_type in ['application/pdf', 'application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
+        return "documents"
+    else:
+        return "other"
+
+@lru_cache(maxsize=1024)
+def extension_category(extension: str) -> str:
+    """File category for a file extension such as `.mp4`."""
+    mime_type, _ = mimetypes.guess_type(f"file{extension}")
+    return file_category(mime_type or "")
+
 @dataclass
 class Download:
     url: str
@@ -21,13 +47,29 @@ class Download:
     downloaded_size: int = 0
     total_size: Optional[int] = None
     queue: str = "regular"
+    priority: int = 0  # Higher starts first
+    queue_position: Optional[int] = None  # Order within a priority, lower first
+    speed_limit: Optional[int] = None  # Per-download cap in B/s
     error: Optional[str] = None
     expected_hash: Optional[str] = None
     scheduled_time: Optional[datetime] = None
+    recurrence: Optional[str] = None  # Cron expression or RRULE-style interval
     created_at: datetime = datetime.now()
     completed_at: Optional[datetime] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
     id: Optional[str] = None
     
+    @property
+    def file_name(self) -> str:
+        """Name of the file on disk."""
+        return os.path.basename(self.save_path)
+    
+    @property
+    def category(self) -> str:
+        """File category guessed from the file name."""
+        return extension_category(os.path.splitext(self.save_path)[1].lower())
+    
     def to_dict(self) -> dict:
         """Convert download to dictionary for storage."""
         return {
@@ -40,11 +82,17 @@ class Download:
             "downloaded_size": self.downloaded_size,
             "total_size": self.total_size,
             "queue": self.queue,
+            "priority": self.priority,
+            "queue_position": self.queue_position,
+            "speed_limit": self.speed_limit,
             "error": self.error,
             "expected_hash": self.expected_hash,
             "scheduled_time": self.scheduled_time.isoformat() if self.scheduled_time else None,
+            "recurrence": self.recurrence,
             "created_at": self.created_at.isoformat(),
-            "completed_at": self.completed_at.isoformat() if self.completed_at else None
+            "completed_at": self.completed_at.isoformat() if self.completed_at else None,
+            "etag": self.etag,
+            "last_modified": self.last_modified
         }
     
     @classmethod
@@ -68,9 +116,15 @@ class Download:
             downloaded_size=data["downloaded_size"],
             total_size=data["total_size"],
             queue=data["queue"],
+            priority=data.get("priority") or 0,
+            queue_position=data.get("queue_position"),
+            speed_limit=data.get("speed_limit"),
             error=data["error"],
             expected_hash=data["expected_hash"],
             scheduled_time=scheduled_time,
+            recurrence=data.get("recurrence"),
             created_at=created_at,
-            completed_at=completed_at
+            completed_at=completed_at,
+            etag=data.get("etag"),
+            last_modified=data.get("last_modified")
         )
@@ -0,0 +1,48 @@
+from dataclasses import dataclass
+from enum import Enum
+
+class PartStatus(Enum):
+    PENDING = "pending"
+    DOWNLOADING = "downloading"
+    COMPLETED = "completed"
+
+@dataclass
+class DownloadPart:
+    part_number: int
+    start_byte: int
+    end_byte: int  # Inclusive; -1 when the file size is unknown
+    downloaded_size: int = 0
+    status: PartStatus = PartStatus.PENDING
+    
+    @property
+    def position(self) -> int:
+        """Absolute file offset of the next byte to fetch."""
+        return self.start_byte + self.downloaded_size
+    
+    @property
+    def remaining(self) -> int:
+        """Bytes left in this part, or -1 when the end is unknown."""
+        if self.end_byte < 0:
+            return -1
+        return max(self.end_byte - self.position + 1, 0)
+    
+    def to_dict(self) -> dict:
+        """Convert part to dictionary for storage."""
+        return {
+            "part_number": self.part_number,
+            "start_byte": self.start_byte,
+            "end_byte": self.end_byte,
+            "downloaded_size": self.downloaded_size,
+            "status": self.status.value
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'DownloadPart':
+        """Create part from dictionary."""
+        return cls(
+            part_number=data["part_number"],
+            start_byte=data["start_byte"],
+            end_byte=data["end_byte"],
+            downloaded_size=data["downloaded_size"],
+            status=PartStatus(data["status"])
+        )
@@ -1,65 +1,131 @@
 import json
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
+from urllib.parse import urlparse
 import uuid
-import aiosqlite
+from ..database.async_pool import AsyncConnectionPool
 from ..models.download import Download, DownloadStatus
+from ..models.download_part import DownloadPart, PartStatus
+
+DOWNLOAD_COLUMNS = [
+    "id", "url", "save_path", "status", "progress", "speed",
+    "downloaded_size", "total_size", "queue", "error",
+    "expected_hash", "scheduled_time", "created_at",
+    "completed_at", "filename", "category", "etag", "last_modified",
+    "speed_limit", "host", "priority", "queue_position", "recurrence"
+]
+SELECT_DOWNLOADS = f"SELECT {', '.join(DOWNLOAD_COLUMNS)} FROM downloads"
+SELECT_DOWNLOAD_BY_ID = f"{SELECT_DOWNLOADS} WHERE id = ?"
+SEARCH_DOWNLOADS = f"""
+    SELECT {', '.join('d.' + column for column in DOWNLOAD_COLUMNS)}
+    FROM downloads_search
+    JOIN downloads d ON d.rowid = downloads_search.rowid
+    WHERE downloads_search MATCH ?
+    ORDER BY rank
+    LIMIT ?
+"""
+INSERT_DOWNLOAD = f"""
+    INSERT INTO downloads ({', '.join(DOWNLOAD_COLUMNS)})
+    VALUES ({', '.join('?' * len(DOWNLOAD_COLUMNS))})
+"""
+UPDATE_DOWNLOAD = """
+    UPDATE downloads SET
+        status = ?, progress = ?, speed = ?,
+        downloaded_size = ?, total_size = ?,
+        queue = ?, error = ?, completed_at = ?,
+        etag = ?, last_modified = ?, speed_limit = ?,
+        priority = ?, queue_position = ?, scheduled_time = ?,
+        recurrence = ?
+    WHERE id = ?
+"""
+INSERT_EVENT = """
+    INSERT INTO download_events (
+        download_id, event_type, event_data, created_at
+    ) VALUES (?, ?, ?, ?)
+"""
 
 class DownloadRepository:
-    def __init__(self, db_path: str = "downloads.db"):
+    def __init__(self, db_path: str = "downloads.db",
+                 pool: Optional[AsyncConnectionPool] = None):
         self.db_path = db_path
+        self.pool = pool or AsyncConnectionPool(db_path)
+    
+    async def close(self):
+        """Close the repository's database connections."""
+        await self.pool.close()
     
     async def add(self, download: Download) -> str:
         """Add a new download to the database."""
-        if not download.id:
-            download.id = str(uuid.uuid4())
-        
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO downloads (
-                    id, url, save_path, status, progress, speed,
-                    downloaded_size, total_size, queue, error,
-                    expected_hash, scheduled_time, created_at,
-                    completed_at, filename, category
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                download.id, download.url, download.save_path,
-                download.status.value, download.progress, download.speed,
-                download.downloaded_size, download.total_size,
-                download.queue, download.error, download.expected_hash,
-                download.scheduled_time, download.created_at,
-                download.completed_at,
-                download.url.split('/')[-1],  # filename
-                None  # category
-            ))
+        async with self.pool.writer() as db:
+            await db.execute(INSERT_DOWNLOAD, self._insert_params(download))
             await db.commit()
         
         return download.id
     
+    async def add_many(self, downloads: List[Download]) -> List[str]:
+        """Add several downloads in a single transaction."""
+        async with self.pool.writer() as db:
+            await db.executemany(
+                INSERT_DOWNLOAD,
+                [self._insert_params(download) for download in downloads]
+            )
+            await db.commit()
+        
+        return [download.id for download in downloads]
+    
+    def _insert_params(self, download: Download) -> tuple:
+        """Get INSERT values in DOWNLOAD_COLUMNS order, assigning an ID if needed."""
+        if not download.id:
+            download.id = str(uuid.uuid4())
+        
+        return (
+            download.id, download.url, download.save_path,
+            download.status.value, download.progress, download.speed,
+            download.downloaded_size, download.total_size,
+            download.queue, download.error, download.expected_hash,
+            download.scheduled_time, download.created_at,
+            download.completed_at,
+            download.file_name, download.category,
+            download.etag, download.last_modified,
+            download.speed_limit,
+            urlparse(download.url).hostname,  # host
+            download.priority, download.queue_position, download.recurrence
+        )
+    
     async def update(self, download: Download):
         """Update an existing download."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                UPDATE downloads SET
-                    status = ?, progress = ?, speed = ?,
-                    downloaded_size = ?, total_size = ?,
-                    queue = ?, error = ?, completed_at = ?
-                WHERE id = ?
-            """, (
-                download.status.value, download.progress, download.speed,
-                download.downloaded_size, download.total_size,
-                download.queue, download.error, download.completed_at,
-                download.id
-            ))
+        async with self.pool.writer() as db:
+            await db.execute(UPDATE_DOWNLOAD, self._update_params(download))
             await db.commit()
     
+    async def save_progress(self, downloads: List[Download],
+                            events: List[Tuple[str, str, Optional[Dict[str, Any]], datetime]]):
+        """Write a batch of download updates and (download_id, type, data, time) events in one transaction."""
+        async with self.pool.writer() as db:
+            await db.executemany(
+                UPDATE_DOWNLOAD,
+                [self._update_params(download) for download in downloads]
+            )
+            await db.executemany(INSERT_EVENT, [
+                (download_id, event_type, json.dumps(event_data) if event_data else None, created_at)
+                for download_id, event_type, event_data, created_at in events
+            ])
+            await db.commit()
+    
+    def _update_params(self, download: Download) -> tuple:
+        return (
+            download.status.value, download.progress, download.speed,
+            download.downloaded_size, download.total_size,
+            download.queue, download.error, download.completed_at,
+            download.etag, download.last_modified, download.speed_limit,
+            download.priority, download.queue_position, download.scheduled_time,
+            download.recurrence, download.id
+        )
+    
     async def get(self, download_id: str) -> Optional[Download]:
         """Get a download by ID."""
-        async with aiosqlite.connect(self.db_path) as db:
-            async with db.execute(
-                "SELECT * FROM downloads WHERE id = ?",
-                (download_id,)
-            ) as cursor:
+        async with self.pool.reader() as db:
+            async with db.execute(SELECT_DOWNLOAD_BY_ID, (download_id,)) as cursor:
                 row = await cursor.fetchone()
                 if row:
                     return self._row_to_download(row)
@@ -67,29 +133,37 @@ class DownloadRepository:
     
     async def get_all(self, status: Optional[DownloadStatus] = None) -> List[Download]:
         """Get all downloads, optionally filtered by status."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.reader() as db:
             if status:
                 async with db.execute(
-                    "SELECT * FROM downloads WHERE status = ? ORDER BY created_at DESC",
+                    f"{SELECT_DOWNLOADS} WHERE status = ? ORDER BY created_at DESC",
                     (status.value,)
                 ) as cursor:
                     rows = await cursor.fetchall()
             else:
                 async with db.execute(
-                    "SELECT * FROM downloads ORDER BY created_at DESC"
+                    f"{SELECT_DOWNLOADS} ORDER BY created_at DESC"
                 ) as cursor:
                     rows = await cursor.fetchall()
             
             return [self._row_to_download(row) for row in rows]
     
+    async def search(self, match: str, limit: int = 200) -> List[Download]:
+        """Get the best downloads for an FTS5 MATCH expression, including unloaded history."""
+        async with self.pool.reader() as db:
+            async with db.execute(SEARCH_DOWNLOADS, (match, limit)) as cursor:
+                rows = await cursor.fetchall()
+            
+            return [self._row_to_download(row) for row in rows]
+    
     async def get_queue(self, queue_name: str) -> List[Download]:
         """Get all downloads in a specific queue."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.reader() as db:
             async with db.execute(
-                """
-                SELECT * FROM downloads 
+                f"""
+                {SELECT_DOWNLOADS}
                 WHERE queue = ? AND status IN ('queued', 'scheduled')
-                ORDER BY priority DESC, created_at ASC
+                ORDER BY priority DESC, queue_position ASC, created_at ASC
                 """,
                 (queue_name,)
             ) as cursor:
@@ -97,9 +171,28 @@ class DownloadRepository:
             
             return [self._row_to_download(row) for row in rows]
     
+    async def get_scheduled(self) -> List[Tuple[str, datetime]]:
+        """Get (id, scheduled_time) of every scheduled download, soonest first.
+        
+        Walks the partial idx_downloads_scheduled index, so rows come out in
+        time order without a sort and unscheduled rows are never read.
+        """
+        async with self.pool.reader() as db:
+            async with db.execute(
+                """
+                SELECT id, scheduled_time FROM downloads INDEXED BY idx_downloads_scheduled
+                WHERE scheduled_time IS NOT NULL AND status = 'scheduled'
+                ORDER BY scheduled_time
+                """
+            ) as cursor:
+                rows = await cursor.fetchall()
+            
+            return [(download_id, datetime.fromisoformat(scheduled_time))
+                    for download_id, scheduled_time in rows]
+    
     async def delete(self, download_id: str):
         """Delete a download and its related data."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.writer() as db:
             # Delete download parts
             await db.execute(
                 "DELETE FROM download_parts WHERE download_id = ?",
@@ -120,15 +213,73 @@ class DownloadRepository:
             
             await db.commit()
     
+    async def save_parts(self, download_id: str, parts: List[DownloadPart]):
+        """Replace the stored segment plan for a download."""
+        now = datetime.now()
+        async with self.pool.writer() as db:
+            await db.execute(
+                "DELETE FROM download_parts WHERE download_id = ?",
+                (download_id,)
+            )
+            await db.executemany("""
+                INSERT INTO download_parts (
+                    download_id, part_number, start_byte, end_byte,
+                    downloaded_size, status, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    download_id, part.part_number, part.start_byte,
+                    part.end_byte, part.downloaded_size, part.status.value,
+                    now, now
+                )
+                for part in parts
+            ])
+            await db.commit()
+    
+    async def get_parts(self, download_id: str) -> List[DownloadPart]:
+        """Get the stored segment plan for a download."""
+        async with self.pool.reader() as db:
+            async with db.execute(
+                """
+                SELECT part_number, start_byte, end_byte, downloaded_size, status
+                FROM download_parts
+                WHERE download_id = ?
+                ORDER BY start_byte
+                """,
+                (download_id,)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            
+            return [DownloadPart(
+                part_number=row[0],
+                start_byte=row[1],
+                end_byte=row[2],
+                downloaded_size=row[3],
+                status=PartStatus(row[4])
+            ) for row in rows]
+    
+    async def checkpoint_parts(self, download_id: str, parts: List[DownloadPart]):
+        """Record how far each segment has progressed."""
+        now = datetime.now()
+        async with self.pool.writer() as db:
+            await db.executemany("""
+                UPDATE download_parts SET
+                    end_byte = ?, downloaded_size = ?, status = ?, updated_at = ?
+                WHERE download_id = ? AND part_number = ?
+            """, [
+                (
+                    part.end_byte, part.downloaded_size, part.status.value,
+                    now, download_id, part.part_number
+                )
+                for part in parts
+            ])
+            await db.commit()
+    
     async def add_event(self, download_id: str, event_type: str, 
                        event_data: Optional[Dict[str, Any]] = None):
         """Add an event for a download."""
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute("""
-                INSERT INTO download_events (
-                    download_id, event_type, event_data, created_at
-                ) VALUES (?, ?, ?, ?)
-            """, (
+        async with self.pool.writer() as db:
+            await db.execute(INSERT_EVENT, (
                 download_id,
                 event_type,
                 json.dumps(event_data) if event_data else None,
@@ -138,7 +289,7 @@ class DownloadRepository:
     
     async def get_events(self, download_id: str) -> List[Dict[str, Any]]:
         """Get all events for a download."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.reader() as db:
             async with db.execute(
                 """
                 SELECT event_type, event_data, created_at 
@@ -156,22 +307,97 @@ class DownloadRepository:
                 "created_at": datetime.fromisoformat(row[2])
             } for row in rows]
     
-    def _row_to_download(self, row) -> Download:
-        """Convert a database row to a Download object."""
-        # Get column names from cursor description
-        columns = [
-            "id", "url", "save_path", "status", "progress", "speed",
-            "downloaded_size", "total_size", "queue", "error",
-            "expected_hash", "scheduled_time", "created_at",
-            "completed_at", "filename", "category"
-        ]
-        
-        # Create dict from row
-        data = dict(zip(columns, row))
+    async def compact_progress_events(self, before: datetime, limit: int = 500) -> int:
+        """Fold up to `limit` raw progress events older than `before` into per-minute aggregates.
         
-        # Convert timestamps
-        for field in ["scheduled_time", "created_at", "completed_at"]:
-            if data[field]:
-                data[field] = datetime.fromisoformat(data[field])
+        Returns the number of raw events removed; 0 means there is nothing left to compact.
+        """
+        async with self.pool.writer() as db:
+            async with db.execute(
+                """
+                SELECT id, download_id, event_data, created_at
+                FROM download_events
+                WHERE event_type = 'progress_update' AND created_at < ?
+                ORDER BY created_at
+                LIMIT ?
+                """,
+                (before, limit)
+            ) as cursor:
+                rows = await cursor.fetchall()
+            if not rows:
+                return 0
+            
+            buckets: Dict[Tuple[str, datetime], List[Dict[str, Any]]] = {}
+            for _, download_id, event_data, created_at in rows:
+                minute = datetime.fromisoformat(created_at).replace(second=0, microsecond=0)
+                buckets.setdefault((download_id, minute), []).append(
+                    json.loads(event_data) if event_data else {}
+                )
+            
+            for (download_id, minute), samples in buckets.items():
+                async with db.execute(
+                    """
+                    SELECT id, event_data FROM download_events
+                    WHERE download_id = ? AND created_at = ? AND event_type = 'progress_minute'
+                    """,
+                    (download_id, minute)
+                ) as cursor:
+                    existing = await cursor.fetchone()
+                
+                if existing:
+                    summary = self._summarize_progress(samples, json.loads(existing[1]))
+                    await db.execute(
+                        "UPDATE download_events SET event_data = ? WHERE id = ?",
+                        (json.dumps(summary), existing[0])
+                    )
+                else:
+                    summary = self._summarize_progress(samples)
+                    await db.execute(INSERT_EVENT, (
+                        download_id, "progress_minute", json.dumps(summary), minute
+                    ))
+            
+            await db.executemany(
+                "DELETE FROM download_events WHERE id = ?",
+                [(row[0],) for row in rows]
+            )
+            await db.commit()
         
+        return len(rows)
+    
+    async def delete_events_before(self, before: datetime, limit: int = 500) -> int:
+        """Delete up to `limit` events older than `before`. Returns the number deleted."""
+        async with self.pool.writer() as db:
+            cursor = await db.execute(
+                """
+                DELETE FROM download_events WHERE id IN (
+                    SELECT id FROM download_events WHERE created_at < ? LIMIT ?
+                )
+                """,
+                (before, limit)
+            )
+            await db.commit()
+            return cursor.rowcount
+    
+    def _summarize_progress(self, samples: List[Dict[str, Any]],
+                            summary: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Merge raw progress samples into a per-minute summary."""
+        summary = dict(summary or {"samples": 0, "downloaded": 0, "total": 0,
+                                   "speed": 0.0, "max_speed": 0.0})
+        count = summary["samples"]
+        speed_sum = summary["speed"] * count
+        for sample in samples:
+            speed = sample.get("speed") or 0
+            count += 1
+            speed_sum += speed
+            summary["downloaded"] = max(summary["downloaded"], sample.get("downloaded") or 0)
+            summary["total"] = sample.get("total") or summary["total"]
+            summary["max_speed"] = max(summary["max_speed"], speed)
+        summary["samples"] = count
+        summary["speed"] = speed_sum / count if count else 0.0
+        return summary
+    
+    def _row_to_download(self, row) -> Download:
+        """Convert a database row to a Download object."""
+        # Rows are selected in DOWNLOAD_COLUMNS order; from_dict parses timestamps
+        data = dict(zip(DOWNLOAD_COLUMNS, row))
         return Download.from_dict(data)
@@ -4,6 +4,8 @@ from typing import Optional, Any, Dict
 from .schema import Settings
 import tempfile
 
+DEFAULT_SETTINGS_FILE = os.path.join(os.path.expanduser("~"), ".pasargadae", "settings.json")
+
 class SettingsManager:
     def __init__(self, settings_file: str):
         """Initialize the settings manager with a settings file path."""
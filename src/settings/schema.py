@@ -23,13 +23,16 @@ class QueueSettings(BaseModel):
     stop_time: str = "23:59"
     limit_active_downloads: int = 2
     post_download_action: str = "none"
+    # Set when the user picks the action in the settings; until then it never runs
+    post_download_action_confirmed: bool = False
+    speed_limit: str = ""  # Queue's share of the global limit, empty for none
 
 class SchedulerQueues(BaseModel):
     high_priority: QueueSettings = Field(default_factory=lambda: QueueSettings(
         start_time="02:00",
         stop_time="06:00",
         limit_active_downloads=3,
-        post_download_action="shutdown"
+        post_download_action="none"
     ))
     regular: QueueSettings = Field(default_factory=lambda: QueueSettings(
         start_time="00:00",
@@ -41,6 +44,8 @@ class SchedulerQueues(BaseModel):
 class TimeSpecificLimiter(BaseModel):
     start_time: str = "08:00"
     end_time: str = "18:00"
+    days: List[str] = Field(default_factory=lambda: ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"])
+    max_speed: str = ""  # Empty uses the speed limiter's max_speed
 
 class URLFilter(BaseModel):
     blocked: List[str] = Field(default_factory=list)
@@ -76,6 +81,9 @@ class Settings(BaseModel):
         "connection_type": "high-speed",
         "max_simultaneous_connections": 8,
         "max_active_downloads": 4,
+        "max_downloads_per_host": 2,
+        "max_downloads_per_domain": 4,
+        "max_connections_per_domain": 16,
         "proxy_settings": ProxySettings()
     })
 
@@ -85,10 +93,11 @@ class Settings(BaseModel):
     })
 
     # Speed Limiter Settings
-    speed_limiter: Dict[str, Union[bool, str, TimeSpecificLimiter]] = Field(default_factory=lambda: {
+    speed_limiter: Dict[str, Union[bool, str, TimeSpecificLimiter, List[TimeSpecificLimiter]]] = Field(default_factory=lambda: {
         "enabled": True,
         "max_speed": "500 KB/s",
-        "time_specific_limiter": TimeSpecificLimiter()
+        "time_specific_limiter": TimeSpecificLimiter(),
+        "profiles": []  # Additional windows, each with its own days and speed
     })
 
     # Filter Settings
@@ -111,7 +120,13 @@ class Settings(BaseModel):
         "chunk_downloading": True,
         "retry_limit": 5,
         "timeout_seconds": 30,
-        "redirect_handling": "automatic"
+        "redirect_handling": "automatic",
+        "progress_flush_interval_ms": 1000,
+        "adaptive_concurrency": False,  # Tune active downloads and chunks to measured throughput
+        "adaptive_min_downloads": 1,
+        "adaptive_max_downloads": 16,
+        "adaptive_min_segments": 1,
+        "adaptive_max_segments": 16
     })
 
     # Notification Settings
@@ -137,6 +152,13 @@ class Settings(BaseModel):
         "clear_data_on_exit": False
     })
 
+    # Headless daemon control API; a socket path takes precedence over host/port
+    daemon: Dict[str, Union[str, int]] = Field(default_factory=lambda: {
+        "host": "127.0.0.1",
+        "port": 8766,
+        "socket_path": ""
+    })
+    
     # Integrity Settings
     integrity_checking: Dict[str, Union[bool, str]] = Field(default_factory=lambda: {
         "hash_verification": True,
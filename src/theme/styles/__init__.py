@@ -1,3 +1,5 @@
+from PyQt6.QtWidgets import QApplication
+from typing import Dict
 from src.theme.colors import Colors
 from .window import get_window_styles
 from .menu import get_menu_styles
@@ -7,19 +9,62 @@ from .table import get_table_styles
 from .progress import get_progress_styles
 from .disk_space import get_disk_space_styles
 from .search import get_search_styles
+from .scrollbar import get_scrollbar_styles
 
 class Styles:
+    """Theme stylesheets, built once per theme.
+    
+    Components do not style themselves with these; the sections listed in
+    APP_SECTIONS are combined into one application stylesheet, so a theme
+    switch re-polishes the widget tree once instead of once per widget.
+    """
+    
+    # Sections applied application-wide, in cascade order
+    APP_SECTIONS = ["WINDOW", "MENU", "TREE", "TABLE", "PROGRESS", "DISK_SPACE", "SEARCH"]
+    
+    _styles: Dict[bool, Dict[str, str]] = {}
+    _app_stylesheets: Dict[bool, str] = {}
+    
     @staticmethod
     def get_styles(is_dark=True):
-        colors = Colors.Dark if is_dark else Colors.Light
-        
-        return {
-            "WINDOW": get_window_styles(colors),
-            "MENU": get_menu_styles(colors),
-            "TOOLBAR": get_toolbar_styles(colors),
-            "TREE": get_tree_styles(colors),
-            "TABLE": get_table_styles(colors),
-            "PROGRESS": get_progress_styles(colors),
-            "DISK_SPACE": get_disk_space_styles(colors),
-            "SEARCH": get_search_styles(colors)
-        }
+        styles = Styles._styles.get(is_dark)
+        if styles is None:
+            colors = Colors.Dark if is_dark else Colors.Light
+            styles = {
+                "WINDOW": get_window_styles(colors),
+                "MENU": get_menu_styles(colors),
+                "TOOLBAR": get_toolbar_styles(colors),
+                "TREE": get_tree_styles(colors),
+                "TABLE": get_table_styles(colors),
+                "PROGRESS": get_progress_styles(colors),
+                "DISK_SPACE": get_disk_space_styles(colors),
+                "SEARCH": get_search_styles(colors)
+            }
+            Styles._styles[is_dark] = styles
+        return styles
+    
+    @staticmethod
+    def get_app_stylesheet(is_dark=True) -> str:
+        """Get the combined application stylesheet for a theme."""
+        stylesheet = Styles._app_stylesheets.get(is_dark)
+        if stylesheet is None:
+            styles = Styles.get_styles(is_dark)
+            # TREE and TABLE both embed the scrollbar rules; include them once
+            scrollbar = get_scrollbar_styles(Colors.Dark if is_dark else Colors.Light)
+            sections = [styles[name].replace(scrollbar, "") for name in Styles.APP_SECTIONS]
+            stylesheet = "\n".join(sections + [scrollbar])
+            Styles._app_stylesheets[is_dark] = stylesheet
+        return stylesheet
+    
+    @staticmethod
+    def apply(is_dark=True):
+        """Style the whole application for a theme in a single pass."""
+        app = QApplication.instance()
+        if app is not None:
+            app.setStyleSheet(Styles.get_app_stylesheet(is_dark))
+    
+    @staticmethod
+    def invalidate():
+        """Forget built stylesheets, e.g. after the theme colors change."""
+        Styles._styles.clear()
+        Styles._app_stylesheets.clear()
@@ -4,19 +4,19 @@ def get_table_styles(colors):
     scrollbar_style = get_scrollbar_styles(colors)
     
     return f"""
-        QTableWidget {{
+        QTableView {{
             background-color: {colors.SURFACE};
             border: none;
             border-radius: 8px;
             gridline-color: transparent;
             color: {colors.TEXT_PRIMARY};
         }}
-        QTableWidget::item {{
+        QTableView::item {{
             padding: 8px;
             border-radius: 4px;
             color: {colors.TEXT_PRIMARY};
         }}
-        QTableWidget::item:selected {{
+        QTableView::item:selected {{
             background: rgba(128, 128, 128, 0.05);
         }}
         QHeaderView::section {{
@@ -45,16 +45,16 @@ def get_table_styles(colors):
             subcontrol-position: right;
             subcontrol-origin: margin;
         }}
-        QTableWidget QCheckBox {{
+        QTableView QCheckBox {{
             padding: 6px;
         }}
-        QTableWidget QProgressBar {{
+        QTableView QProgressBar {{
             border: none;
             background-color: rgba(128, 128, 128, 0.1);
             height: 4px;
             border-radius: 2px;
         }}
-        QTableWidget QProgressBar::chunk {{
+        QTableView QProgressBar::chunk {{
             background: {colors.GRADIENT_PRIMARY};
             border-radius: 2px;
         }}
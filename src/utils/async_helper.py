@@ -1,6 +1,5 @@
 import asyncio
-from functools import partial
-from PyQt6.QtCore import QObject, pyqtSignal, QTimer
+from PyQt6.QtCore import QObject, pyqtSignal
 from src.utils.logger import Logger
 
 class AsyncHelper(QObject):
@@ -11,19 +10,13 @@ class AsyncHelper(QObject):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._loop = None
         self._task = None
-        self._timer = None
+        self._tasks = set()  # The loop only keeps weak references to tasks
     
     def run_async(self, coro):
-        """Run an async coroutine in Qt's event loop."""
+        """Schedule a coroutine on the application's event loop without blocking the UI."""
         Logger.debug(f"Running async coroutine: {coro.__qualname__}")
         
-        if self._loop is None:
-            self._loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._loop)
-            Logger.debug("Created new event loop")
-        
         async def _wrapped_coro():
             try:
                 Logger.debug("Starting coroutine execution")
@@ -34,26 +27,10 @@ class AsyncHelper(QObject):
                 Logger.exception("Coroutine failed with error")
                 self.error.emit(e)
         
-        self._task = self._loop.create_task(_wrapped_coro())
+        # The QtEventLoop installed by main() runs for the app's lifetime
+        self._task = asyncio.get_event_loop().create_task(_wrapped_coro())
+        self._tasks.add(self._task)
+        self._task.add_done_callback(self._tasks.discard)
         Logger.debug("Created async task")
         
-        if self._timer is not None:
-            self._timer.stop()
-        
-        def _process_events():
-            if not self._loop.is_running():
-                Logger.debug("Processing events in event loop")
-                self._loop.run_until_complete(self._task)
-        
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(_process_events)
-        self._timer.start(10)  # Process every 10ms
-        Logger.debug("Started event processing timer")
-        
         return self._task
-    
-    def __del__(self):
-        if self._timer is not None:
-            self._timer.stop()
-        if self._loop is not None:
-            self._loop.close()
@@ -1,44 +1,159 @@
 from PyQt6.QtGui import QIcon, QPainter, QPixmap, QColor
-from PyQt6.QtCore import Qt, QSize, QByteArray
+from PyQt6.QtCore import Qt, QSize, QByteArray, QRect
 from PyQt6.QtSvg import QSvgRenderer
+from typing import Dict, Iterable, Optional, Tuple
+import json
+import os
 from src.theme.colors import Colors
+from src.utils.logger import Logger
+
+ICON_DIR = "src/assets/icons"
+ATLAS_DIR = os.path.join(ICON_DIR, "atlas")  # Optional icons_dark.png/.json, icons_light.png/.json
 
 class IconProvider:
+    """Themed icons rendered from the SVGs in ICON_DIR.
+    
+    Rendered pixmaps are cached by (name, theme, size) and icons by
+    (name, theme), so repeated lookups cost a dict access. The cache is
+    warmed at startup, either by rendering every icon or from a
+    prerasterized atlas, and a theme's entries are dropped when the
+    application switches away from it.
+    """
+    
+    SIZES = (16, 24, 32)
+    
+    _svgs: Dict[str, str] = {}
+    _pixmaps: Dict[Tuple[str, bool, int], QPixmap] = {}
+    _icons: Dict[Tuple[str, bool], QIcon] = {}
+    
     @staticmethod
     def get_icon(name: str, is_dark: bool = True) -> QIcon:
+        key = (name, is_dark)
+        icon = IconProvider._icons.get(key)
+        if icon is None:
+            icon = QIcon()
+            for size in IconProvider.SIZES:
+                icon.addPixmap(IconProvider.get_pixmap(name, is_dark, size))
+            IconProvider._icons[key] = icon
+        return icon
+    
+    @staticmethod
+    def get_pixmap(name: str, is_dark: bool = True, size: int = 16) -> QPixmap:
+        """Get an icon rendered at a square size."""
+        key = (name, is_dark, size)
+        pixmap = IconProvider._pixmaps.get(key)
+        if pixmap is None:
+            pixmap = IconProvider._render(name, is_dark, size)
+            IconProvider._pixmaps[key] = pixmap
+        return pixmap
+    
+    @staticmethod
+    def _render(name: str, is_dark: bool, size: int) -> QPixmap:
         # Get color from theme
         colors = Colors.Dark if is_dark else Colors.Light
         color = QColor(colors.ICON_COLOR)
         
-        # Read the SVG file
-        with open(f"src/assets/icons/{name}.svg", 'r') as f:
-            svg_content = f.read()
+        # Read the SVG file once
+        svg_content = IconProvider._svgs.get(name)
+        if svg_content is None:
+            with open(os.path.join(ICON_DIR, f"{name}.svg"), 'r') as f:
+                svg_content = f.read()
+            IconProvider._svgs[name] = svg_content
         
         # Replace the currentColor with our desired color
-        svg_content = svg_content.replace('currentColor', color.name())
-        
-        # Convert string to QByteArray
-        svg_bytes = QByteArray(svg_content.encode())
-        
-        # Create icon from modified SVG
-        colored_icon = QIcon()
-        sizes = [(16, 16), (24, 24), (32, 32)]
-        
-        # Create SVG renderer
-        renderer = QSvgRenderer(svg_bytes)
-        
-        for size in sizes:
-            pixmap = QPixmap(*size)
-            pixmap.fill(Qt.GlobalColor.transparent)
-            
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
-            
-            # Render SVG with the correct color
-            renderer.render(painter)
-            painter.end()
-            
-            colored_icon.addPixmap(pixmap)
-        
-        return colored_icon
+        renderer = QSvgRenderer(QByteArray(svg_content.replace('currentColor', color.name()).encode()))
+        
+        pixmap = QPixmap(size, size)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform)
+        
+        # Render SVG with the correct color
+        renderer.render(painter)
+        painter.end()
+        return pixmap
+    
+    @staticmethod
+    def icon_names() -> list:
+        """Get the names of every icon in ICON_DIR."""
+        return sorted(f[:-4] for f in os.listdir(ICON_DIR) if f.endswith(".svg"))
+    
+    @staticmethod
+    def warm_up(is_dark: bool = True, names: Optional[Iterable[str]] = None):
+        """Fill the cache for a theme, from its atlas if there is one."""
+        if names is None and IconProvider.load_atlas(IconProvider.atlas_path(is_dark), is_dark):
+            return
+        for name in names if names is not None else IconProvider.icon_names():
+            IconProvider.get_icon(name, is_dark)
+    
+    @staticmethod
+    def invalidate(is_dark: Optional[bool] = None):
+        """Drop cached icons for a theme, or for both themes."""
+        if is_dark is None:
+            IconProvider._pixmaps.clear()
+            IconProvider._icons.clear()
+            return
+        IconProvider._pixmaps = {key: pixmap for key, pixmap in IconProvider._pixmaps.items()
+                                 if key[1] != is_dark}
+        IconProvider._icons = {key: icon for key, icon in IconProvider._icons.items()
+                               if key[1] != is_dark}
+    
+    @staticmethod
+    def set_theme(is_dark: bool):
+        """Switch the warm theme: drop the other theme's icons and fill this one's."""
+        IconProvider.invalidate(not is_dark)
+        IconProvider.warm_up(is_dark)
+    
+    @staticmethod
+    def atlas_path(is_dark: bool) -> str:
+        """Get the image path of a theme's atlas; the index sits next to it as .json."""
+        return os.path.join(ATLAS_DIR, f"icons_{'dark' if is_dark else 'light'}.png")
+    
+    @staticmethod
+    def save_atlas(path: str, is_dark: bool = True, names: Optional[Iterable[str]] = None):
+        """Render icons into a single image plus a JSON index of their cells."""
+        names = list(names if names is not None else IconProvider.icon_names())
+        row_height = max(IconProvider.SIZES)
+        atlas = QPixmap(sum(IconProvider.SIZES), row_height * len(names))
+        atlas.fill(Qt.GlobalColor.transparent)
+        
+        cells = {}
+        painter = QPainter(atlas)
+        for row, name in enumerate(names):
+            x = 0
+            for size in IconProvider.SIZES:
+                painter.drawPixmap(x, row * row_height, IconProvider.get_pixmap(name, is_dark, size))
+                cells[f"{name}@{size}"] = [x, row * row_height, size, size]
+                x += size
+        painter.end()
+        
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        atlas.save(path, "PNG")
+        with open(os.path.splitext(path)[0] + ".json", 'w') as f:
+            json.dump(cells, f)
+    
+    @staticmethod
+    def load_atlas(path: str, is_dark: bool = True) -> bool:
+        """Fill missing pixmap cache entries from an atlas made by save_atlas.
+        
+        Returns False if the atlas is missing or unreadable.
+        """
+        index_path = os.path.splitext(path)[0] + ".json"
+        if not (os.path.exists(path) and os.path.exists(index_path)):
+            return False
+        
+        atlas = QPixmap(path)
+        if atlas.isNull():
+            Logger.warning(f"Could not load icon atlas {path}")
+            return False
+        with open(index_path, 'r') as f:
+            cells = json.load(f)
+        
+        for key, (x, y, width, height) in cells.items():
+            name, size = key.rsplit("@", 1)
+            if (name, is_dark, int(size)) not in IconProvider._pixmaps:
+                IconProvider._pixmaps[(name, is_dark, int(size))] = atlas.copy(QRect(x, y, width, height))
+        Logger.debug(f"Loaded {len(cells)} icons from atlas {path}")
+        return True
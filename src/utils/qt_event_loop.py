@@ -0,0 +1,149 @@
+from PyQt6.QtCore import Qt, QCoreApplication, QEventLoop, QSocketNotifier, QThread, QTimer
+from asyncio import events
+from typing import Callable, Optional
+import asyncio
+import math
+import selectors
+import sys
+import threading
+
+MAX_TIMER_MS = 2 ** 31 - 1  # QTimer intervals are a signed 32-bit int
+POLL_INTERVAL_MS = 10  # Only used where the selector has no pollable fd
+
+class _NonBlockingSelector(selectors.DefaultSelector):
+    """Selector that never waits; Qt's event dispatcher does the waiting."""
+    
+    def select(self, timeout=None):
+        return super().select(0)
+
+class QtEventLoop(asyncio.SelectorEventLoop):
+    """asyncio event loop driven by Qt's event dispatcher.
+    
+    The selector's own fd (epoll/kqueue) is watched by a QSocketNotifier,
+    and a single-shot QTimer is armed for the next scheduled callback, so
+    one loop iteration runs exactly when there is I/O or a callback is due
+    and the loop costs nothing while idle. `run_forever` runs a Qt event
+    loop, so widgets, sockets, timers and tasks all share the GUI thread.
+    """
+    
+    def __init__(self, app: Optional[QCoreApplication] = None):
+        super().__init__(_NonBlockingSelector())
+        self._app = app or QCoreApplication.instance()
+        self._qt_thread = threading.get_ident()
+        self._exit_qt_loop: Optional[Callable[[], None]] = None
+        self._processing = False
+        
+        self._wakeup = QTimer()
+        self._wakeup.setSingleShot(True)
+        self._wakeup.setTimerType(Qt.TimerType.PreciseTimer)
+        self._wakeup.timeout.connect(self._process)
+        
+        self._notifier: Optional[QSocketNotifier] = None
+        self._poll_timer: Optional[QTimer] = None
+        try:
+            fd = self._selector.fileno()
+        except AttributeError:
+            fd = None
+        if fd is not None:
+            self._notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read)
+            self._notifier.activated.connect(self._process)
+        else:
+            # select()-based platforms have nothing for Qt to watch
+            self._poll_timer = QTimer()
+            self._poll_timer.setInterval(POLL_INTERVAL_MS)
+            self._poll_timer.timeout.connect(self._process)
+    
+    def run_forever(self):
+        """Run Qt's event loop, with this loop running, until stop() is called."""
+        self._check_closed()
+        self._check_running()
+        self._set_coroutine_origin_tracking(self._debug)
+        old_agen_hooks = sys.get_asyncgen_hooks()
+        self._thread_id = threading.get_ident()
+        sys.set_asyncgen_hooks(firstiter=self._asyncgen_firstiter_hook,
+                               finalizer=self._asyncgen_finalizer_hook)
+        try:
+            events._set_running_loop(self)
+            if self._poll_timer is not None:
+                self._poll_timer.start()
+            self._schedule_wakeup()
+            # Signals such as lastWindowClosed are only emitted from the
+            # application's exec(), which must be the outermost Qt loop
+            if self._app is not None and QThread.currentThread().loopLevel() == 0:
+                self._exit_qt_loop = self._app.exit
+                self._app.exec()
+            else:
+                qt_loop = QEventLoop()
+                self._exit_qt_loop = qt_loop.exit
+                qt_loop.exec()
+        finally:
+            if self._poll_timer is not None:
+                self._poll_timer.stop()
+            self._wakeup.stop()
+            self._exit_qt_loop = None
+            self._stopping = False
+            self._thread_id = None
+            events._set_running_loop(None)
+            self._set_coroutine_origin_tracking(False)
+            sys.set_asyncgen_hooks(*old_agen_hooks)
+    
+    def stop(self):
+        super().stop()
+        if threading.get_ident() == self._qt_thread:
+            self._wakeup.start(0)
+        else:
+            self._write_to_self()
+    
+    def close(self):
+        if self.is_running():
+            raise RuntimeError("Cannot close a running event loop")
+        # Stop watching the selector before it is closed
+        if self._notifier is not None:
+            self._notifier.setEnabled(False)
+            self._notifier = None
+        if self._poll_timer is not None:
+            self._poll_timer.stop()
+            self._poll_timer = None
+        self._wakeup.stop()
+        super().close()
+    
+    def _call_soon(self, callback, args, context):
+        handle = super()._call_soon(callback, args, context)
+        # Callbacks added from Qt slots need a wakeup; inside an iteration
+        # _schedule_wakeup runs anyway, and other threads use the self-pipe
+        if not self._processing and threading.get_ident() == self._qt_thread:
+            self._wakeup.start(0)
+        return handle
+    
+    def call_at(self, when, callback, *args, context=None):
+        handle = super().call_at(when, callback, *args, context=context)
+        if not self._processing and threading.get_ident() == self._qt_thread:
+            self._schedule_wakeup()
+        return handle
+    
+    def _process(self, *args):
+        """Run one loop iteration; called by Qt when there is work."""
+        # Nested Qt loops (modal dialogs) opened from a callback must not
+        # re-enter the iteration that is still on the stack
+        if self._processing or not self.is_running():
+            return
+        self._processing = True
+        try:
+            self._run_once()
+        finally:
+            self._processing = False
+        
+        if self._stopping:
+            self._exit_qt_loop()
+        else:
+            self._schedule_wakeup()
+    
+    def _schedule_wakeup(self):
+        """Arm the timer for ready callbacks or the earliest scheduled one."""
+        if self._ready or self._stopping:
+            self._wakeup.start(0)
+        elif self._scheduled:
+            delay = math.ceil((self._scheduled[0].when() - self.time()) * 1000)
+            self._wakeup.start(min(max(delay, 0), MAX_TIMER_MS))
+        else:
+            self._wakeup.stop()
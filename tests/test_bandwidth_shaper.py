@@ -0,0 +1,92 @@
+import pytest
+from src.core import bandwidth_shaper
+from src.core.bandwidth_shaper import BandwidthShaper, TokenBucket, parse_speed
+
+class Clock:
+    """Stand-in for the time module whose monotonic clock only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(bandwidth_shaper, "time", clock)
+    return clock
+
+@pytest.mark.parametrize("text, expected", [
+    ("500 KB/s", 500 * 1024),
+    ("1.5 MB/s", 1536 * 1024),
+    ("200", 200 * 1024),  # KB/s when no unit is given
+    ("64 b/s", 64),
+    ("", 0),
+    (None, 0),
+    ("fast", 0),
+])
+def test_parse_speed(text, expected):
+    assert parse_speed(text) == expected
+
+def test_bucket_refills_at_its_rate_up_to_capacity(clock):
+    bucket = TokenBucket(100 * 1024)
+    bucket.tokens = 0
+    bucket.refill(clock.now + 0.5)
+    assert bucket.tokens == 50 * 1024
+    bucket.refill(clock.now + 10)
+    assert bucket.tokens == bucket.capacity == 100 * 1024
+
+def test_bucket_in_debt_waits_until_paid_off(clock):
+    bucket = TokenBucket(100 * 1024)
+    bucket.tokens = -50 * 1024
+    assert bucket.wait_time() == pytest.approx(0.5, abs=1e-3)
+    assert TokenBucket(0).wait_time() == 0  # Unlimited
+
+def test_set_rate_keeps_balance_within_new_capacity(clock):
+    bucket = TokenBucket(1024 * 1024)
+    bucket.set_rate(100 * 1024)
+    assert bucket.tokens == 100 * 1024
+
+def test_download_cap_lets_chunk_through_then_charges_debt(clock):
+    shaper = BandwidthShaper()
+    shaper.set_download_rate("a", 100 * 1024)
+    # A chunk larger than the bucket passes while the balance is positive...
+    assert shaper._try_consume("a", "regular", 300 * 1024) == 0
+    # ...and the next one waits until the debt is paid off
+    assert shaper._try_consume("a", "regular", 1024) == pytest.approx(2.0, abs=1e-3)
+    clock.now += 2.01
+    assert shaper._try_consume("a", "regular", 1024) == 0
+
+def test_global_cap_is_shared_by_all_downloads(clock):
+    shaper = BandwidthShaper(100 * 1024)
+    assert shaper._try_consume("a", "regular", 100 * 1024) == 0
+    assert shaper._try_consume("b", "regular", 1024) > 0
+
+def test_spent_queue_borrows_from_idle_sibling(clock):
+    shaper = BandwidthShaper()
+    shaper.set_queue_rate("regular", 100 * 1024)
+    shaper.set_queue_rate("high_priority", 100 * 1024)
+    clock.now += shaper.IDLE_AFTER
+    assert shaper._try_consume("a", "regular", 100 * 1024) == 0
+    # The regular share is spent; the idle high_priority queue lends its tokens
+    assert shaper._try_consume("a", "regular", 50 * 1024) == 0
+    assert shaper.queue_buckets["regular"].tokens == 0
+    assert shaper.queue_buckets["high_priority"].tokens == 50 * 1024
+
+def test_busy_sibling_does_not_lend(clock):
+    shaper = BandwidthShaper()
+    shaper.set_queue_rate("regular", 100 * 1024)
+    shaper.set_queue_rate("high_priority", 100 * 1024)
+    assert shaper._try_consume("b", "high_priority", 1024) == 0  # Demand just now
+    assert shaper._try_consume("a", "regular", 100 * 1024) == 0
+    assert shaper._try_consume("a", "regular", 1024) > 0
+
+def test_download_cap_still_applies_when_borrowing(clock):
+    shaper = BandwidthShaper()
+    shaper.set_queue_rate("regular", 100 * 1024)
+    shaper.set_queue_rate("high_priority", 100 * 1024)
+    shaper.set_download_rate("a", 100 * 1024)
+    clock.now += shaper.IDLE_AFTER
+    assert shaper._try_consume("a", "regular", 100 * 1024) == 0
+    assert shaper._try_consume("a", "regular", 1024) > 0
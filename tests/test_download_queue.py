@@ -0,0 +1,84 @@
+from src.core.download_queue import COMPACT_MIN, POSITION_STEP, DownloadQueue
+from src.models.download import Download
+
+def make(name: str, priority: int = 0, position: int = None, host: str = "example.com") -> Download:
+    return Download(url=f"http://{host}/{name}", save_path=f"/tmp/{name}", id=name,
+                    priority=priority, queue_position=position)
+
+def ids(queue: DownloadQueue):
+    return [download.id for download in queue.ordered()]
+
+def test_orders_by_priority_then_position():
+    queue = DownloadQueue([make("a"), make("b"), make("c", priority=1), make("d")])
+    assert ids(queue) == ["c", "a", "b", "d"]
+    assert [queue.pop().id for _ in range(4)] == ["c", "a", "b", "d"]
+    assert queue.pop() is None
+
+def test_remove_and_update():
+    downloads = [make(name) for name in "abcd"]
+    queue = DownloadQueue(downloads)
+    assert queue.remove("b").id == "b"
+    assert queue.remove("b") is None
+    downloads[3].priority = 5
+    queue.update(downloads[3])
+    assert ids(queue) == ["d", "a", "c"]
+    assert len(queue) == 3 and "b" not in queue
+
+def test_move_to_an_index():
+    queue = DownloadQueue([make(name) for name in "abcde"])
+    queue.move("e", 0)
+    assert ids(queue) == ["e", "a", "b", "c", "d"]
+    queue.move("e", 2)
+    assert ids(queue) == ["a", "b", "e", "c", "d"]
+    queue.move("a", 10)  # Clamped to the end
+    assert ids(queue) == ["b", "e", "c", "d", "a"]
+
+def test_move_between_takes_only_the_moved_download():
+    queue = DownloadQueue([make(name) for name in "abcd"])
+    changed = queue.move_between("d", "a", "b")
+    assert [download.id for download in changed] == ["d"]
+    assert ids(queue) == ["a", "d", "b", "c"]
+    assert queue.move_between("a", None, None) == []  # Already at the front
+
+def test_move_adopts_the_neighbours_priority():
+    queue = DownloadQueue([make("a", priority=2), make("b", priority=2), make("c")])
+    queue.move_between("c", "a", "b")
+    assert ids(queue) == ["a", "c", "b"]
+    assert queue.get("c").priority == 2
+
+def test_renumbers_when_positions_run_out():
+    queue = DownloadQueue([make("a", position=1), make("b", position=2), make("c", position=3)])
+    changed = queue.move_between("c", "a", "b")
+    assert ids(queue) == ["a", "c", "b"]
+    assert {download.id for download in changed} == {"a", "b", "c"}
+    positions = [download.queue_position for download in queue.ordered()]
+    assert positions == sorted(positions)
+    assert queue.next_position() == 4 * POSITION_STEP
+
+def test_compaction_keeps_order():
+    queue = DownloadQueue([make(f"a{index:03}") for index in range(COMPACT_MIN * 2)])
+    for index in range(COMPACT_MIN + 10):
+        queue.remove(f"a{index:03}")
+    assert queue._removed < COMPACT_MIN
+    assert ids(queue)[0] == f"a{COMPACT_MIN + 10:03}"
+    assert len(queue) == COMPACT_MIN - 10
+
+def test_host_head_skips_popped_and_removed_downloads():
+    queue = DownloadQueue([make("a1", host="a.example"), make("b1", host="b.example"),
+                           make("a2", host="a.example")])
+    assert sorted(queue.hosts()) == ["a.example", "b.example"]
+    queue.pop()
+    assert queue.host_head("a.example").id == "a2"
+    queue.remove("b1")
+    assert queue.host_head("b.example") is None
+    assert queue.hosts() == ["a.example"]
+
+def test_host_heads_survive_compaction_and_renumbering():
+    queue = DownloadQueue([make(f"a{index:03}", host="a.example") for index in range(COMPACT_MIN * 2)]
+                          + [make("b", host="b.example")])
+    for index in range(COMPACT_MIN + 10):
+        queue.remove(f"a{index:03}")
+    assert queue.host_head("a.example").id == f"a{COMPACT_MIN + 10:03}"
+    queue._renumber()
+    assert queue.host_head("a.example").id == f"a{COMPACT_MIN + 10:03}"
+    assert queue.host_head("b.example").id == "b"
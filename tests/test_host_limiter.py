@@ -0,0 +1,146 @@
+from collections import Counter
+from types import SimpleNamespace
+import asyncio
+import pytest
+from src.core import host_limiter
+from src.core.download_queue import DownloadQueue
+from src.core.host_limiter import HostLimiter, registered_domain
+from src.core.queue_manager import QueueManager
+from src.models.download import Download
+
+class Clock:
+    """Stand-in for the time module whose monotonic clock only moves when told to."""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(host_limiter, "time", clock)
+    return clock
+
+def make(name: str, host: str, priority: int = 0) -> Download:
+    return Download(url=f"http://{host}/{name}", save_path=f"/tmp/{name}", id=name, priority=priority)
+
+@pytest.mark.parametrize("host, expected", [
+    ("cdn.example.co.uk", "example.co.uk"),
+    ("a.b.example.com", "example.com"),
+    ("example.com", "example.com"),
+    ("10.0.0.1", "10.0.0.1"),
+    ("localhost", "localhost"),
+])
+def test_registered_domain(host, expected):
+    assert registered_domain(host) == expected
+
+def test_download_caps_per_host_and_domain(clock):
+    limiter = HostLimiter(downloads_per_host=2, downloads_per_domain=3)
+    hosts, domains = limiter.download_counts(["http://a.example.com/1", "http://a.example.com/2",
+                                              "http://b.example.com/1"])
+    assert not limiter.can_start("http://a.example.com/3", hosts, domains)
+    assert limiter.can_start("http://c.example.org/1", hosts, domains)
+    assert not limiter.can_start("http://c.example.com/1", hosts, domains)  # Domain is full
+
+def test_configure_reads_connection_settings():
+    limiter = HostLimiter.from_settings({"connection": {
+        "max_simultaneous_connections": 4,
+        "max_connections_per_domain": 6,
+        "max_downloads_per_host": 1,
+        "max_downloads_per_domain": 2
+    }})
+    assert (limiter.connections_per_host, limiter.connections_per_domain,
+            limiter.downloads_per_host, limiter.downloads_per_domain) == (4, 6, 1, 2)
+
+def test_backoff_is_shared_by_the_host(clock):
+    limiter = HostLimiter()
+    assert limiter.failure("http://example.com/a") == 1.0
+    # Another connection failing in the same burst does not stretch the delay
+    assert limiter.failure("http://example.com/b") == 1.0
+    assert not limiter.can_start("http://example.com/c", Counter(), Counter())
+    assert limiter.can_start("http://other.org/c", Counter(), Counter())
+    
+    clock.now += 1.0
+    assert limiter.failure("http://example.com/a") == 2.0  # Exponential once the burst is over
+    clock.now += 2.0
+    assert limiter.failure("http://example.com/a", retry_after=30) == 30
+    limiter.success("http://example.com/a")
+    assert limiter.backoff_remaining("example.com") == 0
+
+def test_backoff_is_capped(clock):
+    limiter = HostLimiter()
+    for _ in range(10):
+        delay = limiter.failure("http://example.com/a")
+        clock.now += delay
+    assert delay == limiter.BACKOFF_MAX
+
+def test_connections_wait_for_a_free_slot():
+    async def run():
+        limiter = HostLimiter(connections_per_host=2)
+        opened, release = [], asyncio.Event()
+        
+        async def connect(name):
+            async with limiter.connection("http://example.com/file"):
+                opened.append(name)
+                await release.wait()
+        
+        tasks = [asyncio.create_task(connect(name)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        assert opened == ["a", "b"]
+        release.set()
+        await asyncio.gather(*tasks)
+        assert opened == ["a", "b", "c"]
+    
+    asyncio.run(run())
+
+def test_raised_cap_wakes_waiting_connections():
+    async def run():
+        limiter = HostLimiter(connections_per_host=1)
+        opened, release = [], asyncio.Event()
+        
+        async def connect(name):
+            async with limiter.connection("http://example.com/file"):
+                opened.append(name)
+                await release.wait()
+        
+        tasks = [asyncio.create_task(connect(name)) for name in "abc"]
+        await asyncio.sleep(0.01)
+        assert opened == ["a"]
+        limiter.configure({"connection": {"max_simultaneous_connections": 3}})
+        await asyncio.sleep(0.01)
+        assert opened == ["a", "b", "c"]
+        release.set()
+        await asyncio.gather(*tasks)
+    
+    asyncio.run(run())
+
+def test_pick_round_robins_host_heads(clock):
+    limiter = HostLimiter(downloads_per_host=1)
+    manager = QueueManager(SimpleNamespace(host_limiter=limiter))
+    # Far more downloads of a capped host than any scan would look at
+    queue = DownloadQueue([make(f"a{index}", "a.example") for index in range(1000)]
+                          + [make("b1", "b.example"), make("c1", "c.example")])
+    hosts, domains = limiter.download_counts(["http://a.example/running"])
+    
+    picked = manager._pick(queue, hosts, domains)
+    assert picked.id == "b1"
+    queue.remove(picked.id)
+    limiter.started(picked.url)
+    hosts["b.example"] += 1
+    assert manager._pick(queue, hosts, domains).id == "c1"
+
+def test_pick_prefers_priority_then_least_recently_served(clock):
+    limiter = HostLimiter()
+    manager = QueueManager(SimpleNamespace(host_limiter=limiter))
+    queue = DownloadQueue([make("a1", "a.example"), make("b1", "b.example"), make("c1", "c.example")])
+    limiter.started("http://a.example/")
+    limiter.started("http://b.example/")
+    assert manager._pick(queue, Counter(), Counter()).id == "c1"
+    
+    queue.push(make("b2", "b.example", priority=1))
+    assert manager._pick(queue, Counter(), Counter()).id == "b2"
+    
+    limiter.failure("http://b.example/b2")
+    assert manager._pick(queue, Counter(), Counter()).id == "c1"
@@ -0,0 +1,83 @@
+import asyncio
+from src.core.progress_writer import ProgressWriter
+from src.models.download import Download
+
+class Repository:
+    """Records save_progress calls; fails while `failing` is set."""
+    
+    def __init__(self):
+        self.saves = []
+        self.failing = False
+    
+    async def save_progress(self, downloads, events):
+        if self.failing:
+            raise OSError("database is locked")
+        self.saves.append((list(downloads), list(events)))
+
+def make(name: str) -> Download:
+    return Download(url=f"http://example.com/{name}", save_path=f"/tmp/{name}", id=name)
+
+def test_ticks_coalesce_into_one_write():
+    repository = Repository()
+    writer = ProgressWriter(repository)
+    download = make("a")
+    for downloaded in range(0, 1000, 100):
+        download.downloaded_size = downloaded
+        writer.mark_dirty(download)
+        writer.record_event("a", "progress_update", {"downloaded": downloaded})
+    writer.record_event("a", "completed")
+    asyncio.run(writer.flush())
+    
+    [(downloads, events)] = repository.saves
+    assert downloads == [download]
+    assert [(event[1], event[2]) for event in events] == [
+        ("completed", None),
+        ("progress_update", {"downloaded": 900}),  # Only the latest progress event is kept
+    ]
+    asyncio.run(writer.flush())
+    assert len(repository.saves) == 1  # Nothing left to write
+
+def test_failed_flush_is_retried_with_newer_state():
+    repository = Repository()
+    writer = ProgressWriter(repository)
+    first, second = make("a"), make("b")
+    writer.mark_dirty(first)
+    writer.record_event("a", "started")
+    repository.failing = True
+    asyncio.run(writer.flush())
+    assert repository.saves == []
+    
+    writer.mark_dirty(second)
+    writer.record_event("b", "started")
+    repository.failing = False
+    asyncio.run(writer.flush())
+    [(downloads, events)] = repository.saves
+    assert {download.id for download in downloads} == {"a", "b"}
+    assert [event[0] for event in events] == ["a", "b"]  # Events keep their order
+
+def test_discard_drops_pending_writes():
+    repository = Repository()
+    writer = ProgressWriter(repository)
+    writer.mark_dirty(make("a"))
+    writer.mark_dirty(make("b"))
+    writer.record_event("a", "progress_update", {"downloaded": 1})
+    writer.record_event("a", "paused")
+    writer.discard("a")
+    asyncio.run(writer.flush())
+    [(downloads, events)] = repository.saves
+    assert [download.id for download in downloads] == ["b"]
+    assert events == []
+
+def test_periodic_flush_and_stop():
+    async def run():
+        repository = Repository()
+        writer = ProgressWriter(repository, interval=0.01)
+        writer.start()
+        writer.mark_dirty(make("a"))
+        await asyncio.sleep(0.05)
+        assert len(repository.saves) == 1
+        writer.mark_dirty(make("b"))
+        await writer.stop()
+        assert [download.id for download in repository.saves[-1][0]] == ["b"]
+    
+    asyncio.run(run())
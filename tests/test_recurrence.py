@@ -0,0 +1,83 @@
+from datetime import datetime
+import pytest
+from src.core.recurrence import CronRule, IntervalRule, parse_recurrence
+
+# Sunday 2026-10-18, 14:37
+NOW = datetime(2026, 10, 18, 14, 37, 12)
+
+def next_runs(rule: str, previous: datetime, count: int):
+    recurrence = parse_recurrence(rule)
+    runs = []
+    for _ in range(count):
+        previous = recurrence.next_time(previous, previous)
+        runs.append(previous)
+    return runs
+
+def test_parse_picks_rule_type():
+    assert isinstance(parse_recurrence("0 3 * * *"), CronRule)
+    assert isinstance(parse_recurrence("@daily"), CronRule)
+    assert isinstance(parse_recurrence("RRULE:FREQ=DAILY"), IntervalRule)
+
+@pytest.mark.parametrize("rule, expected", [
+    ("0 3 * * *", datetime(2026, 10, 19, 3, 0)),
+    ("*/15 * * * *", datetime(2026, 10, 18, 14, 45)),
+    ("0 9 * * mon-fri", datetime(2026, 10, 19, 9, 0)),
+    ("30 2 1,15 * *", datetime(2026, 11, 1, 2, 30)),
+    ("0 0 13 * 5", datetime(2026, 10, 23, 0, 0)),  # Either day field matches
+    ("0 0 29 2 *", datetime(2028, 2, 29, 0, 0)),
+    ("@weekly", datetime(2026, 10, 25, 0, 0)),
+])
+def test_cron_next_time(rule, expected):
+    assert parse_recurrence(rule).next_time(NOW, NOW) == expected
+
+def test_interval_keeps_time_of_day_and_skips_missed_runs():
+    previous = datetime(2026, 10, 10, 3, 0)
+    assert parse_recurrence("FREQ=DAILY").next_time(previous, NOW) == datetime(2026, 10, 19, 3, 0)
+    assert parse_recurrence("FREQ=HOURLY;INTERVAL=6").next_time(previous, NOW) == datetime(2026, 10, 18, 15, 0)
+
+def test_daily_byday_filters_days():
+    previous = datetime(2026, 10, 16, 3, 0)  # Friday
+    assert next_runs("FREQ=DAILY;BYDAY=MO,FR", previous, 3) == [
+        datetime(2026, 10, 19, 3, 0),
+        datetime(2026, 10, 23, 3, 0),
+        datetime(2026, 10, 26, 3, 0),
+    ]
+
+def test_weekly_byday_runs_on_every_listed_day():
+    previous = datetime(2026, 10, 19, 3, 0)  # Monday
+    assert next_runs("FREQ=WEEKLY;BYDAY=MO,WE,FR", previous, 4) == [
+        datetime(2026, 10, 21, 3, 0),
+        datetime(2026, 10, 23, 3, 0),
+        datetime(2026, 10, 26, 3, 0),
+        datetime(2026, 10, 28, 3, 0),
+    ]
+
+def test_weekly_byday_with_interval_skips_weeks():
+    previous = datetime(2026, 10, 23, 3, 0)  # Friday
+    assert next_runs("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR", previous, 3) == [
+        datetime(2026, 11, 2, 3, 0),
+        datetime(2026, 11, 6, 3, 0),
+        datetime(2026, 11, 16, 3, 0),
+    ]
+    # Catching up after a long pause stays on the same fortnightly weeks
+    rule = parse_recurrence("FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR")
+    assert rule.next_time(previous, datetime(2026, 11, 10, 12, 0)) == datetime(2026, 11, 16, 3, 0)
+
+@pytest.mark.parametrize("rule", [
+    "",
+    "* * *",
+    "61 * * * *",
+    "*/0 * * * *",
+    "1-x * * * *",
+    "FREQ=YEARLY",
+    "FREQ=DAILY;INTERVAL=0",
+    "FREQ=DAILY;BYHOUR=3",
+    "FREQ=WEEKLY;BYDAY=XX",
+])
+def test_invalid_rules_are_rejected(rule):
+    with pytest.raises(ValueError):
+        parse_recurrence(rule)
+
+def test_rule_that_never_fires_is_rejected():
+    with pytest.raises(ValueError):
+        parse_recurrence("0 0 30 2 *").next_time(NOW, NOW)